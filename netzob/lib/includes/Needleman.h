@@ -43,13 +43,26 @@
 //+---------------------------------------------------------------------------+
 //|  alignMessages : align a group of messages and get their common regex
 //+---------------------------------------------------------------------------+
-void alignMessages(t_message * resMessage, Bool doInternalSlick, unsigned int nbMessages, t_message * messages, Bool debugMode);
+void alignMessages(t_message * resMessage, Bool doInternalSlick, unsigned int nbMessages, t_message * messages, int bandWidth, Bool debugMode);
+
+//+---------------------------------------------------------------------------+
+//|  alignMessagesWithGuideTree : align a group of messages following a guide tree
+//+---------------------------------------------------------------------------+
+void alignMessagesWithGuideTree(t_message * resMessage, Bool doInternalSlick, unsigned int nbMessages, t_message * messages, unsigned int * tree, int nbThreads, int bandWidth, Bool debugMode);
 
 //+---------------------------------------------------------------------------+
 //| alignTwoMessages : align 2 messages and get common regex
 //+---------------------------------------------------------------------------+
 char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message * message1, t_message * message2, Bool debugMode);
 
+//+---------------------------------------------------------------------------+
+//| alignTwoMessagesInBand : align 2 messages in a band of diagonals
+//|  bandWidth : number of diagonals around the difference of length (-1: no band)
+//|  abandonScore : the alignment stops (with null scores and no regex) as soon
+//|                 as its distance can not reach it (0: never stops)
+//+---------------------------------------------------------------------------+
+char* alignTwoMessagesInBand(t_message * resMessage, Bool doInternalSlick, t_message * message1, t_message * message2, int bandWidth, float abandonScore, Bool debugMode);
+
 /*!
  * @function getSimilarityScore
  * @abstract Computes the similarity score of (message1[i], message2[j])
@@ -41,6 +41,11 @@
 //+---------------------------------------------------------------------------+
 PyObject* py_computeSimilarityMatrix(PyObject* self, PyObject* args);
 
+//+---------------------------------------------------------------------------+
+//| py_computeSimilarityScores : Python wrapper for computeSimilarityScores
+//+---------------------------------------------------------------------------+
+PyObject* py_computeSimilarityScores(PyObject* self, PyObject* args);
+
 //+---------------------------------------------------------------------------+
 //| initLibNeedleman : Python will use this function to init the module
 //+---------------------------------------------------------------------------+
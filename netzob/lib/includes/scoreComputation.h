@@ -41,6 +41,7 @@
 
 #include "Needleman.h"
 
-void computeSimilarityMatrix(int nbMessage, t_message* messages, Bool debugMode, float** scoreMatrix);
+void computeSimilarityMatrix(int nbMessage, t_message* messages, Bool debugMode, float** scoreMatrix, int nbThreads, int bandWidth, float abandonScore);
+void computeSimilarityScores(int nbMessage, t_message* messages, Bool debugMode, long nbPairs, unsigned int* pairs, float* scores, int nbThreads, int bandWidth, float abandonScore);
 
 #endif
@@ -38,7 +38,43 @@
 #include <malloc.h>
 #endif
 
-void alignMessages(t_message *resMessage, Bool doInternalSlick, unsigned int nbMessages, t_message * messages, Bool debugMode) {
+#include <limits.h>
+
+#ifndef _WIN32
+#include <pthread.h>
+#endif
+
+/**
+   t_alignmentJob:
+
+   The state shared by the threads aligning the nodes of a guide tree.
+   Nodes 0 to nbMessages-1 are the messages (leaves), node nbMessages+k
+   is the alignment of the two children of the k-th internal node. An
+   internal node is ready once its two children are aligned.
+*/
+typedef struct {
+  unsigned int nbMessages;
+  unsigned int nbInternalNodes;
+  t_message * nodes;
+  t_score * scores;
+  unsigned int * tree;
+  unsigned int * parents;
+  unsigned int * nbPendingChildren;
+  unsigned int * readyNodes;
+  unsigned int nbReadyNodes;
+  unsigned int nextReadyNode;
+  unsigned int nbAlignedNodes;
+  Bool doInternalSlick;
+  int bandWidth;
+  Bool debugMode;
+  volatile int stop;
+#ifndef _WIN32
+  pthread_mutex_t lock;
+  pthread_cond_t nodeReady;
+#endif
+} t_alignmentJob;
+
+void alignMessages(t_message *resMessage, Bool doInternalSlick, unsigned int nbMessages, t_message * messages, int bandWidth, Bool debugMode) {
   // local variable
   unsigned int numberOfOperations = 0;
   double costOfOperation;
@@ -109,7 +145,7 @@ void alignMessages(t_message *resMessage, Bool doInternalSlick, unsigned int nbM
     memset(new_message.mask, 0, messages[i_message].len);
 
     // Align current_message with new_message
-    regex = alignTwoMessages(resMessage, doInternalSlick, &current_message, &new_message, debugMode);
+    regex = alignTwoMessagesInBand(resMessage, doInternalSlick, &current_message, &new_message, bandWidth, 0, debugMode);
     // regex is malloced by the function alignTwoMessages() and we don't need it here
     if(regex)
       free(regex);
@@ -135,19 +171,304 @@ void alignMessages(t_message *resMessage, Bool doInternalSlick, unsigned int nbM
 }
 
 
+/**
+   initializeLeafMessage:
+
+   This functions prepares a copy of a message so that it can be aligned
+   (the message has no mask and its semantic tags are owned by the copy).
+*/
+static void initializeLeafMessage(t_message * leaf, t_message * message, t_score * score) {
+  leaf->len = message->len;
+  leaf->alignment = message->alignment;
+  leaf->mask = malloc(message->len * sizeof(unsigned char));
+  leaf->semanticTags = malloc(message->len * sizeof(t_semanticTag*));
+  for (unsigned int j=0; j<message->len; j++) {
+    leaf->semanticTags[j] = malloc(sizeof(t_semanticTag));
+    leaf->semanticTags[j]->name = malloc((strlen(message->semanticTags[j]->name)+1) * sizeof(char));
+    strcpy(leaf->semanticTags[j]->name, message->semanticTags[j]->name);
+  }
+  memset(leaf->mask, 0, message->len);
+  leaf->score = score;
+}
+
+/**
+   releaseAlignedNode:
+
+   This functions releases the memory of a node once it has been aligned
+   with its sibling. Names of semantic tags are shared with the leaves and
+   the alignment of a leaf belongs to the caller, so they are kept.
+*/
+static void releaseAlignedNode(t_alignmentJob * job, unsigned int node) {
+  t_message * message = &job->nodes[node];
+  free(message->mask);
+  message->mask = NULL;
+  if (node >= job->nbMessages) {
+    for (unsigned int j=0; j<message->len; j++) {
+      free(message->semanticTags[j]);
+    }
+    free(message->semanticTags);
+    free(message->alignment);
+    message->semanticTags = NULL;
+    message->alignment = NULL;
+  }
+}
+
+/**
+   alignNextNode:
+
+   This functions takes the next ready internal node, waiting for another
+   thread to make one ready if required, and aligns its two children.
+   @return the number of aligned internal nodes (including this one), 0 if all the nodes are handled
+*/
+static unsigned int alignNextNode(t_alignmentJob * job) {
+  unsigned int k = 0;
+  unsigned int node = 0;
+  unsigned int nbAlignedNodes = 0;
+  char * regex = NULL;
+
+#ifndef _WIN32
+  pthread_mutex_lock(&job->lock);
+  while (!job->stop && job->nextReadyNode == job->nbReadyNodes && job->nextReadyNode < job->nbInternalNodes) {
+    pthread_cond_wait(&job->nodeReady, &job->lock);
+  }
+#endif
+  if (job->stop || job->nextReadyNode >= job->nbInternalNodes) {
+#ifndef _WIN32
+    pthread_mutex_unlock(&job->lock);
+#endif
+    return 0;
+  }
+  k = job->readyNodes[job->nextReadyNode++];
+#ifndef _WIN32
+  pthread_mutex_unlock(&job->lock);
+#endif
+
+  // Align the two children, they are not used by any other node
+  node = job->nbMessages + k;
+  job->nodes[node].score = &job->scores[k];
+  regex = alignTwoMessagesInBand(&job->nodes[node], job->doInternalSlick, &job->nodes[job->tree[2 * k]], &job->nodes[job->tree[2 * k + 1]], job->bandWidth, 0, job->debugMode);
+  if (regex) {
+    free(regex);
+  }
+  releaseAlignedNode(job, job->tree[2 * k]);
+  releaseAlignedNode(job, job->tree[2 * k + 1]);
+
+#ifndef _WIN32
+  pthread_mutex_lock(&job->lock);
+#endif
+  nbAlignedNodes = ++job->nbAlignedNodes;
+  if (job->parents[node] < job->nbInternalNodes) {
+    if (--job->nbPendingChildren[job->parents[node]] == 0) {
+      job->readyNodes[job->nbReadyNodes++] = job->parents[node];
+    }
+  }
+#ifndef _WIN32
+  pthread_cond_broadcast(&job->nodeReady);
+  pthread_mutex_unlock(&job->lock);
+#endif
+  return nbAlignedNodes;
+}
+
+#ifndef _WIN32
+/**
+   alignmentWorker:
+
+   Entry point of the threads which align nodes of the guide tree (they
+   never call python).
+*/
+static void * alignmentWorker(void * arg) {
+  t_alignmentJob * job = (t_alignmentJob *) arg;
+  while (alignNextNode(job) > 0) {
+  }
+  return NULL;
+}
+#endif
+
+/**
+   alignMessagesWithGuideTree:
+
+   This functions aligns a group of messages following a guide tree: each
+   internal node of the tree is the alignment of its two children, the last
+   node is the alignment of all the messages. Nodes are aligned as soon as
+   their children are, by nbThreads threads (including the calling one,
+   which is the only one to execute the callbacks). The alignment of a node
+   only depends on its children, so the result does not depend on the
+   number of threads.
+   @param tree: the children of each internal node (2 * (nbMessages - 1) values),
+                children are provided before their parent.
+*/
+void alignMessagesWithGuideTree(t_message *resMessage, Bool doInternalSlick, unsigned int nbMessages, t_message * messages, unsigned int * tree, int nbThreads, int bandWidth, Bool debugMode) {
+  t_alignmentJob job;
+  unsigned int k = 0;
+  unsigned int nbAlignedNodes = 0;
+  unsigned int root = 0;
+#ifndef _WIN32
+  pthread_t * threads = NULL;
+  int nbStartedThreads = 0;
+  int t = 0;
+#endif
+
+  job.nbMessages = nbMessages;
+  job.nbInternalNodes = nbMessages - 1;
+  job.tree = tree;
+  job.doInternalSlick = doInternalSlick;
+  job.bandWidth = bandWidth;
+  job.debugMode = debugMode;
+  job.stop = 0;
+  job.nbReadyNodes = 0;
+  job.nextReadyNode = 0;
+  job.nbAlignedNodes = 0;
+  job.nodes = calloc(2 * nbMessages - 1, sizeof(t_message));
+  job.scores = calloc(nbMessages, sizeof(t_score));
+  job.parents = malloc((2 * nbMessages - 1) * sizeof(unsigned int));
+  job.nbPendingChildren = malloc(nbMessages * sizeof(unsigned int));
+  job.readyNodes = malloc(nbMessages * sizeof(unsigned int));
+
+  for (k = 0; k < nbMessages; k++) {
+    initializeLeafMessage(&job.nodes[k], &messages[k], &job.scores[nbMessages - 1]);
+  }
+
+  // The root has no parent
+  for (k = 0; k < 2 * nbMessages - 1; k++) {
+    job.parents[k] = job.nbInternalNodes;
+  }
+  for (k = 0; k < job.nbInternalNodes; k++) {
+    job.parents[tree[2 * k]] = k;
+    job.parents[tree[2 * k + 1]] = k;
+    job.nbPendingChildren[k] = (tree[2 * k] >= nbMessages) + (tree[2 * k + 1] >= nbMessages);
+    if (job.nbPendingChildren[k] == 0) {
+      job.readyNodes[job.nbReadyNodes++] = k;
+    }
+  }
+
+#ifndef _WIN32
+  pthread_mutex_init(&job.lock, NULL);
+  pthread_cond_init(&job.nodeReady, NULL);
+  if (nbThreads > (int) job.nbReadyNodes) {
+    nbThreads = job.nbReadyNodes;
+  }
+  if (nbThreads > 1) {
+    threads = malloc((nbThreads - 1) * sizeof(pthread_t));
+    for (t = 0; t < nbThreads - 1; t++) {
+      if (pthread_create(&threads[nbStartedThreads], NULL, alignmentWorker, &job) == 0) {
+        nbStartedThreads++;
+      }
+    }
+  }
+#endif
+
+  while (job.nbInternalNodes > 0) {
+    /**
+       Stops the execution if user requested so
+    */
+    if (callbackIsFinish() == 1) {
+#ifndef _WIN32
+      pthread_mutex_lock(&job.lock);
+      job.stop = 1;
+      pthread_cond_broadcast(&job.nodeReady);
+      pthread_mutex_unlock(&job.lock);
+#else
+      job.stop = 1;
+#endif
+      break;
+    }
+
+    nbAlignedNodes = alignNextNode(&job);
+    if (nbAlignedNodes == 0) {
+      break;
+    }
+
+    // Update the execution status
+    if (callbackStatus(0, 100.0 * nbAlignedNodes / job.nbInternalNodes, "Align node %d of the guide tree", nbAlignedNodes) == -1) {
+      printf("Error, error while executing C callback.\n");
+    }
+  }
+
+#ifndef _WIN32
+  for (t = 0; t < nbStartedThreads; t++) {
+    pthread_join(threads[t], NULL);
+  }
+  free(threads);
+  pthread_cond_destroy(&job.nodeReady);
+  pthread_mutex_destroy(&job.lock);
+#endif
+
+  // The root is the last aligned node
+  if (!job.stop) {
+    root = 2 * nbMessages - 2;
+    resMessage->len = job.nodes[root].len;
+    resMessage->alignment = job.nodes[root].alignment;
+    resMessage->mask = job.nodes[root].mask;
+    resMessage->semanticTags = job.nodes[root].semanticTags;
+    if (job.nbInternalNodes > 0) {
+      *resMessage->score = job.scores[job.nbInternalNodes - 1];
+    }
+    if (callbackStatus(0, 100.0, "The %d messages have sucessfully been aligned.", nbMessages) == -1) {
+      printf("Error, error while executing C callback.\n");
+    }
+  }
+
+  free(job.nodes);
+  free(job.scores);
+  free(job.parents);
+  free(job.nbPendingChildren);
+  free(job.readyNodes);
+  free(messages);
+}
+
+
+/**
+   t_bandedMatrix:
+
+   The dynamic programming matrix of an alignment, restricted to a band of
+   diagonals: the cell (i, j) is stored only if lowDiag <= j - i <= highDiag.
+   Each row stores width cells, starting at the column bandStart(i).
+*/
+typedef struct {
+  int * cells;
+  unsigned int len2;
+  long lowDiag;
+  long highDiag;
+  unsigned int width;
+} t_bandedMatrix;
+
+// Value of the cells outside of the band (they can not be reached)
+#define OUT_OF_BAND (INT_MIN / 4)
+
+static inline unsigned int bandStart(t_bandedMatrix * matrix, unsigned int i) {
+  long start = (long) i + matrix->lowDiag;
+  return start > 0 ? (unsigned int) start : 0;
+}
+
+static inline unsigned int bandEnd(t_bandedMatrix * matrix, unsigned int i) {
+  long end = (long) i + matrix->highDiag;
+  return end < (long) matrix->len2 ? (unsigned int) end : matrix->len2;
+}
+
+static inline int getCell(t_bandedMatrix * matrix, unsigned int i, unsigned int j) {
+  unsigned int start = bandStart(matrix, i);
+  if (j < start || j > bandEnd(matrix, i)) {
+    return OUT_OF_BAND;
+  }
+  return matrix->cells[(size_t) i * matrix->width + (j - start)];
+}
+
 char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message * message1, t_message * message2, Bool debugMode){
+  return alignTwoMessagesInBand(resMessage, doInternalSlick, message1, message2, -1, 0, debugMode);
+}
+
+char* alignTwoMessagesInBand(t_message * resMessage, Bool doInternalSlick, t_message * message1, t_message * message2, int bandWidth, float abandonScore, Bool debugMode){
   // local variables
-  short int ** matrix = NULL;
+  t_bandedMatrix matrix;
   unsigned int i = 0;
   unsigned int j = 0;
 
   // Construction of the matrix
-  short int elt1, elt2, elt3, max, eltL, eltD, eltT;
+  int elt1, elt2, elt3, max, eltL, eltD, eltT;
   // Levenshtein distance
   //  float levenshtein = 0.0;
   float scoreAlignment = 0;
 
-  unsigned int maxLen = 0;
   // Traceback
   unsigned char * contentMessage1 = NULL;
   unsigned int * mapMessage1 = NULL;
@@ -180,92 +501,87 @@ char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message *
   //+------------------------------------------------------------------------+
   // Create and initialize the matrix
   //+------------------------------------------------------------------------+
-  matrix = (short int**) malloc( sizeof(short int*) * (message1->len + 1) );
-  for (i = 0; i < (message1->len + 1); i++) {
-    matrix[i] = (short int*) calloc( (message2->len + 1), sizeof(short int) );
+  // Without band, all the diagonals are stored. Otherwise the band covers
+  // the difference of length of the messages plus bandWidth diagonals on
+  // each side.
+  long lenDiff = (long) message2->len - (long) message1->len;
+  matrix.len2 = message2->len;
+  matrix.lowDiag = -(long) message1->len;
+  matrix.highDiag = message2->len;
+  if (bandWidth >= 0) {
+    if ((lenDiff < 0 ? lenDiff : 0) - bandWidth > matrix.lowDiag) {
+      matrix.lowDiag = (lenDiff < 0 ? lenDiff : 0) - bandWidth;
+    }
+    if ((lenDiff > 0 ? lenDiff : 0) + bandWidth < matrix.highDiag) {
+      matrix.highDiag = (lenDiff > 0 ? lenDiff : 0) + bandWidth;
+    }
+  }
+  matrix.width = message2->len + 1;
+  if (matrix.highDiag - matrix.lowDiag + 1 < (long) matrix.width) {
+    matrix.width = matrix.highDiag - matrix.lowDiag + 1;
+  }
+  matrix.cells = (int*) calloc((size_t) (message1->len + 1) * matrix.width, sizeof(int));
+  if (matrix.cells == NULL) {
+    printf("Error while trying to allocate memory for variable : matrix.\n");
+    goto end;
   }
 
   //+------------------------------------------------------------------------+
   // Fullfill the matrix given the two messages
   //+------------------------------------------------------------------------+
-  // Parralelization:
-  unsigned int nbDiag = 0;
-  unsigned int nbBlock = 0; // Depends on which diagonal we are on
-  unsigned int minLen = 0;
-  unsigned int firsti = 0;
-  unsigned int firstj = 0;
-  unsigned int diagloop = 0;
-  unsigned int blockLoop = 0;
-  unsigned int iblock = 0;
-  unsigned int jblock = 0;
-  unsigned int maxLoopi = 0;
-  unsigned int maxLoopj = 0;
-  unsigned int lastRow = 0;
-  unsigned int lastColumn = 0;
+  // Cells of the first row and of the first column are null
   int maxScoreMatrix = 0;
+  unsigned int lenLongestPayload = message1->len > message2->len ? message1->len : message2->len;
+  // Highest score gained by aligning two half-bytes
+  int maxSimilarity = MATCH;
+  for (i = 0; i < message1->len; i++) {
+    if (message1->semanticTags != NULL && message1->semanticTags[i] != NULL && message1->semanticTags[i]->name != NULL && strcmp(message1->semanticTags[i]->name, "None") != 0) {
+      maxSimilarity = MATCH + SEMANTIC_MATCH;
+      break;
+    }
+  }
 
-  lastRow = ((message1->len+1)/BLEN) * BLEN;
-  lastColumn = ((message2->len+1)/BLEN) * BLEN;
-
-  nbDiag  = (message1->len+1)/BLEN + (message2->len+1)/BLEN + ((message1->len+1)%BLEN!=0); // reminder: BLEN = blocklength
-
-  minLen = message1->len+1 <= message2->len+1 ? message1->len+1 : message2->len+1;
-  maxLen = message1->len+1 > message2->len+1 ? message1->len+1 : message2->len+1;
-
-  // Begin loop over diagonals
-  for (diagloop = 0; diagloop < nbDiag; diagloop++){
-  	//printf("Diag n %d\n",diagloop);
-    for (blockLoop = 0;blockLoop <= nbBlock; blockLoop++){
-	  //printf("Block n %d\n",blockLoop);
-	  //(iblock,jblock are moving from the bottom left of the current diagonal to the top right)
-      iblock = firsti - blockLoop * BLEN;
-      jblock = firstj + blockLoop * BLEN;
-      maxLoopi = iblock + BLEN <= message1->len + 1? iblock + BLEN:message1->len + 1;
-      maxLoopj = jblock + BLEN <= message2->len + 1? jblock + BLEN:message2->len + 1;
-
-      for(i = iblock;i < maxLoopi; i++){
-
-        for(j = jblock; j < maxLoopj; j++){
-          if (i > 0 && j > 0){
-            elt1 = matrix[i - 1][j - 1];
-
-	    elt1 += getSimilarityScore(message1, message2, i, j);
-            elt2 = matrix[i][j - 1] + GAP;
-            elt3 = matrix[i - 1][j] + GAP;
-            max = elt1 > elt2 ? elt1 : elt2;
-            max = max > elt3 ? max : elt3;
-	    matrix[i][j] = max;
-	    if (max > maxScoreMatrix) {
-	      maxScoreMatrix = max;
-	    }
-
-	  }//printf("%d,\t",matrix[i][j]);
-       }
-       //printf("\n");
-     }//End for iblock
-    }//End for blockLoop
-
-   //Actualize the number of block for the next time
-   if (diagloop < minLen/BLEN){
-      nbBlock++;
-   }
-   else if (diagloop > maxLen/BLEN){
-      nbBlock--;
-   }
-
-   //Actualise the first position of the cursor (bottom left of the next diagonal)
-   if (firsti != lastRow) // If we are not at the last row
-        firsti = firsti + BLEN ;
-
-   else if (firstj != lastColumn) // Else If we are not at the last column
-        firstj += BLEN;
-
+  for (i = 1; i < message1->len + 1; i++) {
+    int maxScoreRow = OUT_OF_BAND;
+    unsigned int start = bandStart(&matrix, i);
+    int * row = matrix.cells + (size_t) i * matrix.width - start;
+    for (j = start > 1 ? start : 1; j <= bandEnd(&matrix, i); j++) {
+      elt1 = getCell(&matrix, i - 1, j - 1) + getSimilarityScore(message1, message2, i, j);
+      elt2 = (j > start ? row[j - 1] : OUT_OF_BAND) + GAP;
+      elt3 = getCell(&matrix, i - 1, j) + GAP;
+      max = elt1 > elt2 ? elt1 : elt2;
+      max = max > elt3 ? max : elt3;
+      row[j] = max;
+      if (max > maxScoreRow) {
+        maxScoreRow = max;
+      }
+    }
+    if (maxScoreRow > maxScoreMatrix) {
+      maxScoreMatrix = maxScoreRow;
+    }
 
-  }//End for diagloop
+    // Stops if the scores can not reach abandonScore anymore: the
+    // remaining rows can at most add maxSimilarity each to the best
+    // score of this row, and the other scores are at most 100.
+    if (abandonScore > 0 && lenLongestPayload > 0) {
+      float bestScore = maxScoreRow + (float) maxSimilarity * (message1->len - i);
+      float bestAlignment = (100.0f / (lenLongestPayload * MATCH)) * (bestScore > maxScoreMatrix ? bestScore : maxScoreMatrix);
+      t_score bestScores;
+      bestScores.s1 = 100.0f;
+      bestScores.s2 = 100.0f;
+      bestScores.s3 = bestAlignment < 100.0f ? bestAlignment : 100.0f;
+      if (computeDistance(&bestScores) < abandonScore) {
+        resMessage->len = 0;
+        resMessage->score->s1 = 0;
+        resMessage->score->s2 = 0;
+        resMessage->score->s3 = 0;
+        goto end;
+      }
+    }
+  }
 
   // Compute score of the alignment (ratio regarding the max score these two payloads could have get if they were equals)
-  unsigned int lenSmallestPayload = message1->len > message2->len ? message1->len : message2->len;
-  float maxScore = lenSmallestPayload * MATCH;
+  float maxScore = lenLongestPayload * MATCH;
   scoreAlignment = (100.0f / maxScore) * (float) maxScoreMatrix;
   if (scoreAlignment > 100.0f) {
     scoreAlignment = 100.0f;
@@ -316,9 +632,9 @@ char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message *
 
   // DIAGONAL (almost) TRACEBACK
   while ((i > 0) && (j > 0)) {
-    eltL = matrix[i][j - 1];
-    eltD = matrix[i - 1][j - 1];
-    eltT = matrix[i - 1][j];
+    eltL = getCell(&matrix, i, j - 1);
+    eltD = getCell(&matrix, i - 1, j - 1);
+    eltT = getCell(&matrix, i - 1, j);
 
     if ((eltL > eltD) && (eltL > eltT)) {
       --j;
@@ -650,13 +966,8 @@ char* alignTwoMessages(t_message * resMessage, Bool doInternalSlick, t_message *
 
 end:
   // Room service
-  if(matrix) {
-    for (i = 0; i < (message1->len + 1); i++) {
-      if(matrix[i]) {
-	free(matrix[i]);
-      }
-    }
-    free(matrix);
+  if(matrix.cells) {
+    free(matrix.cells);
   }
   if(contentMessage1) {
     free(contentMessage1);
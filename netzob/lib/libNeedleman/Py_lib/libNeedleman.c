@@ -78,6 +78,9 @@ PyObject* py_alignMessages(__attribute__((unused))PyObject* self, PyObject* args
   PyObject *temp_cb;
   unsigned int doInternalSlick = 0;
   unsigned int debugMode = 0;
+  Py_buffer treeBuffer;
+  int nbThreads = 1;
+  int bandWidth = -1;
 
   // local variables
   t_message * resMessage;
@@ -86,17 +89,31 @@ PyObject* py_alignMessages(__attribute__((unused))PyObject* self, PyObject* args
   Bool bool_doInternalSlick;
   int parseRet;
   t_score score;
-
-  // Converts the arguments
-  if (!PyArg_ParseTuple(args, "hOhO", &doInternalSlick, &temp_cb, &debugMode, &wrapperFactory)) {
+  unsigned int * tree = NULL;
+  unsigned int nbInternalNodes = 0;
+  unsigned int * nbUses = NULL;
+  unsigned int k = 0;
+
+  // Converts the arguments (the guide tree is optional, it may be None)
+  treeBuffer.buf = NULL;
+  treeBuffer.len = 0;
+  treeBuffer.obj = NULL;
+  if (!PyArg_ParseTuple(args, "hOhO|z*ii", &doInternalSlick, &temp_cb, &debugMode, &wrapperFactory, &treeBuffer, &nbThreads, &bandWidth)) {
     PyErr_SetString(PyExc_TypeError, "Error while parsing the arguments provided to py_alignMessages");
     return NULL;
   }
+  if (treeBuffer.obj != NULL) {
+    tree = (unsigned int*) treeBuffer.buf;
+    nbInternalNodes = treeBuffer.len / (2 * sizeof(unsigned int));
+  }
 
   //+------------------------------------------------------------------------+
   // Verify the callback parameter
   //+------------------------------------------------------------------------+
   if (!PyCallable_Check(temp_cb)) {
+    if (treeBuffer.obj != NULL) {
+      PyBuffer_Release(&treeBuffer);
+    }
     PyErr_SetString(PyExc_TypeError, "The provided 2nd parameter should be a callback.");
     return NULL;
   }
@@ -115,9 +132,28 @@ PyObject* py_alignMessages(__attribute__((unused))PyObject* self, PyObject* args
   parseRet = parseArgs(wrapperFactory,&nbMessages,&messages);
   //Parsing error: PyErr allready set in parseArgs
   if(parseRet){
+    if (treeBuffer.obj != NULL) {
+      PyBuffer_Release(&treeBuffer);
+    }
     return NULL;
   }
 
+  // The guide tree must join all the messages, children being provided before their parent
+  if (treeBuffer.obj != NULL) {
+    nbUses = calloc(2 * nbMessages, sizeof(unsigned int));
+    parseRet = (nbMessages == 0 || nbInternalNodes != nbMessages - 1);
+    for (k = 0; !parseRet && k < 2 * nbInternalNodes; k++) {
+      parseRet = tree[k] >= nbMessages + k / 2 || nbUses[tree[k]]++ > 0;
+    }
+    free(nbUses);
+    if (parseRet) {
+      PyBuffer_Release(&treeBuffer);
+      free(messages);
+      PyErr_SetString(PyExc_ValueError, "The guide tree is not a valid binary tree over the messages");
+      return NULL;
+    }
+  }
+
   // Convert debugMode parameter in a BOOL
   if (debugMode) {
     bool_debugMode = TRUE;
@@ -152,7 +188,12 @@ PyObject* py_alignMessages(__attribute__((unused))PyObject* self, PyObject* args
   // Execute the alignment process
   //+------------------------------------------------------------------------+
   int t=clock();
-  alignMessages(resMessage, bool_doInternalSlick, nbMessages, messages, bool_debugMode);
+  if (treeBuffer.obj != NULL) {
+    alignMessagesWithGuideTree(resMessage, bool_doInternalSlick, nbMessages, messages, tree, nbThreads, bandWidth, bool_debugMode);
+    PyBuffer_Release(&treeBuffer);
+  } else {
+    alignMessages(resMessage, bool_doInternalSlick, nbMessages, messages, bandWidth, bool_debugMode);
+  }
   int t1=clock();
 
   if (debugMode == 1) {
@@ -44,6 +44,7 @@ extern PyObject *python_callback_isFinish;
 static PyMethodDef libScoreComputation_methods[] = {
   {"getBID", py_getBID, METH_NOARGS, NULL},
   {"computeSimilarityMatrix", py_computeSimilarityMatrix, METH_VARARGS, NULL},
+  {"computeSimilarityScores", py_computeSimilarityScores, METH_VARARGS, NULL},
   {NULL, NULL, 0, NULL}
 };
 
@@ -81,10 +82,13 @@ PyObject* py_computeSimilarityMatrix(__attribute__((unused))PyObject* self, PyOb
   float **scoreMatrix = NULL;
   t_message *mesmessages;
   long nbmessage = 0;
+  int nbThreads = 1;
+  int bandWidth = -1;
+  float abandonScore = 0;
 
 
   // Converts the arguments
-  if (!PyArg_ParseTuple(args, "hOOhO", &doInternalSlick, &temp_cb, &temp2_cb, &debugMode,&wrapperFactory)) {
+  if (!PyArg_ParseTuple(args, "hOOhO|iif", &doInternalSlick, &temp_cb, &temp2_cb, &debugMode,&wrapperFactory, &nbThreads, &bandWidth, &abandonScore)) {
     PyErr_SetString(PyExc_TypeError, "Error while parsing the arguments provided to py_getHighestEquivalentGroup");
     return NULL;
   }
@@ -129,7 +133,7 @@ PyObject* py_computeSimilarityMatrix(__attribute__((unused))PyObject* self, PyOb
     bool_debugMode = FALSE;
   }
 
-  computeSimilarityMatrix(nbmessage, mesmessages, bool_debugMode, scoreMatrix);
+  computeSimilarityMatrix(nbmessage, mesmessages, bool_debugMode, scoreMatrix, nbThreads, bandWidth, abandonScore);
 
   //Compute the scores recorded in a python list://TODO Return Factory
   PyObject *recordedScores = PyList_New((nbmessage*(nbmessage-1))/2);
@@ -173,5 +177,103 @@ PyObject* py_computeSimilarityMatrix(__attribute__((unused))PyObject* self, PyOb
   return Py_BuildValue("S", recordedScores);
 }
 
+//+---------------------------------------------------------------------------+
+//| py_computeSimilarityScores : Python wrapper for computeSimilarityScores
+//+---------------------------------------------------------------------------+
+PyObject* py_computeSimilarityScores(__attribute__((unused))PyObject* self, PyObject* args) {
+  unsigned int doInternalSlick = 0;
+  unsigned int debugMode = 0;
+  long i = 0;
+  unsigned int j = 0;
+  PyObject *temp_cb;
+  PyObject *temp2_cb;
+  Bool bool_debugMode;
+  PyObject* wrapperFactory;
+  Py_buffer pairsBuffer;
+  float *scores = NULL;
+  t_message *mesmessages;
+  long nbmessage = 0;
+  long nbPairs = 0;
+  int nbThreads = 1;
+  int bandWidth = -1;
+  float abandonScore = 0;
+  unsigned int *pairs = NULL;
+
+  // Converts the arguments
+  if (!PyArg_ParseTuple(args, "hOOhOiy*|if", &doInternalSlick, &temp_cb, &temp2_cb, &debugMode, &wrapperFactory, &nbThreads, &pairsBuffer, &bandWidth, &abandonScore)) {
+    PyErr_SetString(PyExc_TypeError, "Error while parsing the arguments provided to py_computeSimilarityScores");
+    return NULL;
+  }
+  if (!PyCallable_Check(temp_cb) || !PyCallable_Check(temp2_cb)) {
+      PyBuffer_Release(&pairsBuffer);
+      PyErr_SetString(PyExc_TypeError, "The provided arguments (status and is finish) should be callbacks");
+      return NULL;
+  }
+
+  // Parse the callbacks
+  Py_XINCREF(temp_cb);
+  Py_XDECREF(python_callback);
+  python_callback = temp_cb;
+  Py_XINCREF(temp2_cb);
+  Py_XDECREF(python_callback_isFinish);
+  python_callback_isFinish = temp2_cb;
+
+  int parseRet;
+  parseRet = parseArgs(wrapperFactory, &nbmessage, &mesmessages);
+  //Parsing error: PyErr allready set in parseArgs
+  if(parseRet){
+    PyBuffer_Release(&pairsBuffer);
+    return NULL;
+  }
 
+  // Pairs are provided as couples of unsigned 32 bits indexes
+  nbPairs = pairsBuffer.len / (2 * sizeof(unsigned int));
+  pairs = (unsigned int*) pairsBuffer.buf;
+  for (i = 0; i < 2 * nbPairs; i++) {
+    if ((long) pairs[i] >= nbmessage) {
+      PyBuffer_Release(&pairsBuffer);
+      PyErr_SetString(PyExc_ValueError, "A pair refers to an unknown message");
+      return NULL;
+    }
+  }
+  scores = calloc(nbPairs > 0 ? nbPairs : 1, sizeof(float));
 
+  // Convert debugMode parameter in a BOOL
+  if (debugMode) {
+    bool_debugMode = TRUE;
+    printf("Compute Similarity Scores for %ld pairs of messages\n", nbPairs);
+  } else {
+    bool_debugMode = FALSE;
+  }
+
+  computeSimilarityScores(nbmessage, mesmessages, bool_debugMode, nbPairs, pairs, scores, nbThreads, bandWidth, abandonScore);
+  PyBuffer_Release(&pairsBuffer);
+
+  // The scores are returned in the order of the pairs
+  PyObject *recordedScores = PyList_New(nbPairs);
+  if (recordedScores) {
+    for (i = 0; i < nbPairs; i++) {
+      PyObject *s = PyFloat_FromDouble((double)scores[i]);
+      if (!s) {
+        Py_DECREF(recordedScores);
+        recordedScores = NULL;
+        break;
+      }
+      PyList_SET_ITEM(recordedScores, i, s);
+    }
+  }
+
+  //Free all
+  for(i=0; i<nbmessage; i++) {
+    for (j=0; j<mesmessages[i].len; j++) {
+      free(mesmessages[i].semanticTags[j]);
+    }
+    free(mesmessages[i].semanticTags);
+
+    free(mesmessages[i].mask);
+  }
+  free(scores);
+  free(mesmessages);
+
+  return recordedScores;
+}
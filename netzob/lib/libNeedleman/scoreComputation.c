@@ -37,24 +37,151 @@
 #include <malloc.h>
 #endif
 
+#ifndef _WIN32
+#include <pthread.h>
+#endif
+
 /**
-   computeSimilarityMatrix:
+   Number of pairs of messages computed by a thread at once when only
+   some pairs are requested
+*/
+#define SIMILARITY_PAIRS_BLOCK 256
 
-   This functions computes a matrix which contains the similarity scores
-   between the provided messages
-   @param nbMessage: the number of provided messages in the param messages
-   @param messages: a list containing messages to work with
-   @param debug: activate or deactive debug messages
-   @param scoreMatrix: a double-dimension array where the matrix score will be stored
+/**
+   t_similarityJob:
+
+   The state shared by the threads computing similarity scores. Work is
+   dispatched by units to the threads: a unit is a row of the matrix, or
+   a block of pairs if only some pairs of messages are requested.
 */
-void computeSimilarityMatrix(int nbMessage, t_message* messages, Bool debugMode, float** scoreMatrix) {
-  int i;
+typedef struct {
+  int nbMessage;
+  t_message * messages;
+  int bandWidth;
+  float abandonScore;
+  Bool debugMode;
+  float ** scoreMatrix;
+  long nbPairs;
+  unsigned int * pairs;
+  float * scores;
+  long nbUnits;
+  long nextUnit;
+  long nbComputedUnits;
+  volatile int stop;
+} t_similarityJob;
+
+/**
+   computeSimilarityScore:
+
+   This functions computes the similarity score between the messages i and p
+*/
+static float computeSimilarityScore(t_similarityJob * job, unsigned int i, unsigned int p) {
   t_message tmpResultMessage;
   t_score score;
 
-  // local variable
+  /**
+     Computes the NeedlemanScore between messages i and p
+  */
+  tmpResultMessage.len = 0;
+  tmpResultMessage.alignment = NULL;
+  tmpResultMessage.mask = NULL;
+  tmpResultMessage.semanticTags = NULL;
+  score.s1 = 0;
+  score.s2 = 0;
+  score.s3 = 0;
+  tmpResultMessage.score = &score;
+
+  if (job->debugMode) {
+    printf("Align two messages (%d, %d)\n", i, p);
+  }
+
+  char * regex = alignTwoMessagesInBand(&tmpResultMessage, FALSE, &job->messages[i], &job->messages[p], job->bandWidth, job->abandonScore, job->debugMode);
+  if (job->debugMode && regex != NULL) {
+    printf("Regex = %s\n", regex);
+  }
+  free(regex);
+
+  // Only the score of the alignment is kept (names of the tags belong to the messages)
+  if (tmpResultMessage.semanticTags != NULL) {
+    for (unsigned int j = 0; j < tmpResultMessage.len; j++) {
+      free(tmpResultMessage.semanticTags[j]);
+    }
+    free(tmpResultMessage.semanticTags);
+  }
+  free(tmpResultMessage.alignment);
+  free(tmpResultMessage.mask);
+  return computeDistance(tmpResultMessage.score);
+}
+
+/**
+   computeSimilarityUnit:
+
+   This functions computes the scores of a unit of work: the scores
+   between the message u and the following ones (scoreMatrix[u][p] with
+   u < p), or the scores of the u-th block of pairs.
+*/
+static void computeSimilarityUnit(t_similarityJob * job, long u) {
+  long k = 0;
   int p = 0;
 
+  if (job->pairs == NULL) {
+    for (p = u + 1; p < job->nbMessage; p++) {
+      job->scoreMatrix[u][p] = computeSimilarityScore(job, u, p);
+    }
+  } else {
+    for (k = u * SIMILARITY_PAIRS_BLOCK; k < job->nbPairs && k < (u + 1) * SIMILARITY_PAIRS_BLOCK; k++) {
+      job->scores[k] = computeSimilarityScore(job, job->pairs[2 * k], job->pairs[2 * k + 1]);
+    }
+  }
+}
+
+/**
+   computeNextSimilarityUnit:
+
+   This functions computes the next unit of work which is not handled
+   by another thread.
+   @return the number of computed units (including this one), 0 if all the units are handled
+*/
+static long computeNextSimilarityUnit(t_similarityJob * job) {
+  long u = __sync_fetch_and_add(&job->nextUnit, 1);
+  if (u >= job->nbUnits) {
+    return 0;
+  }
+  computeSimilarityUnit(job, u);
+  return __sync_add_and_fetch(&job->nbComputedUnits, 1);
+}
+
+#ifndef _WIN32
+/**
+   similarityWorker:
+
+   Entry point of the threads which compute units of work (they never
+   call python).
+*/
+static void * similarityWorker(void * arg) {
+  t_similarityJob * job = (t_similarityJob *) arg;
+  while (!job->stop && computeNextSimilarityUnit(job) > 0) {
+  }
+  return NULL;
+}
+#endif
+
+/**
+   runSimilarityJob:
+
+   This functions computes all the units of work of the job with
+   nbThreads threads (including the calling one, which is the only one
+   to execute the callbacks). Each score only depends on its two
+   messages, so the result does not depend on the number of threads.
+*/
+static void runSimilarityJob(t_similarityJob * job, int nbThreads) {
+  long nbComputedUnits = 0;
+#ifndef _WIN32
+  pthread_t * threads = NULL;
+  int nbStartedThreads = 0;
+  int t = 0;
+#endif
+
   /**
      Stops the execution if user requested so
   */
@@ -62,48 +189,119 @@ void computeSimilarityMatrix(int nbMessage, t_message* messages, Bool debugMode,
     return;
   }
 
-  /**
-     We loop over each different couple of messages
-     messages[i] and messages [p] with i < p
-     (diag. superior matrix)
-  */
-  for (i = 0; i < nbMessage; i++) {
+  job->nextUnit = 0;
+  job->nbComputedUnits = 0;
+  job->stop = 0;
+
+#ifndef _WIN32
+  if (nbThreads > job->nbUnits) {
+    nbThreads = job->nbUnits;
+  }
+  if (nbThreads > 1) {
+    threads = malloc((nbThreads - 1) * sizeof(pthread_t));
+    for (t = 0; t < nbThreads - 1; t++) {
+      if (pthread_create(&threads[nbStartedThreads], NULL, similarityWorker, job) == 0) {
+        nbStartedThreads++;
+      }
+    }
+  }
+#endif
+
+  while (TRUE) {
     /**
      Stops the execution if user requested so
     */
     if (callbackIsFinish() == 1) {
-      return;
+      job->stop = 1;
+      break;
     }
 
-    for (p = i + 1; p < nbMessage; p++) {
-      /**
-	 Computes the NeedlemanScore between messages i and p
-	 result is stored in the matrix[i][p]
-      */
-      tmpResultMessage.len = 0;
-      score.s1 = 0;
-      score.s2 = 0;
-      score.s3 = 0;
-      tmpResultMessage.score = &score;
-
-      if (debugMode) {
-	printf("Align two messages (%d, %d)\n", i, p);
-      }
-
-      char * regex = alignTwoMessages(&tmpResultMessage, FALSE, &messages[i], &messages[p], debugMode);
-      if (debugMode) {
-	printf("Regex = %s\n", regex);
-      }
-      free(regex);
-      scoreMatrix[i][p] = computeDistance(tmpResultMessage.score);
+    nbComputedUnits = computeNextSimilarityUnit(job);
+    if (nbComputedUnits == 0) {
+      break;
     }
 
     /**
        Update the current status
     */
-    double val = (double) 100.0 * (i * nbMessage + nbMessage - 1) / ((nbMessage - 1) * (nbMessage + 1));
+    double val = (double) 100.0 * nbComputedUnits / job->nbUnits;
     if (callbackStatus(0,val,"Building Status (%.2lf %%)",(float) val) == -1) {
       printf("Error, error while executing C callback.\n");
     }
   }
+
+#ifndef _WIN32
+  for (t = 0; t < nbStartedThreads; t++) {
+    pthread_join(threads[t], NULL);
+  }
+  free(threads);
+#endif
+}
+
+/**
+   computeSimilarityMatrix:
+
+   This functions computes a matrix which contains the similarity scores
+   between the provided messages. Rows of the matrix are computed in
+   parallel by nbThreads threads.
+   @param nbMessage: the number of provided messages in the param messages
+   @param messages: a list containing messages to work with
+   @param debug: activate or deactive debug messages
+   @param scoreMatrix: a double-dimension array where the matrix score will be stored
+   @param nbThreads: the number of threads to use
+   @param bandWidth: the band of the alignments (see alignTwoMessagesInBand)
+   @param abandonScore: the score under which alignments are abandoned (see alignTwoMessagesInBand)
+*/
+void computeSimilarityMatrix(int nbMessage, t_message* messages, Bool debugMode, float** scoreMatrix, int nbThreads, int bandWidth, float abandonScore) {
+  t_similarityJob job;
+
+  /**
+     We loop over each different couple of messages
+     messages[i] and messages [p] with i < p
+     (diag. superior matrix)
+  */
+  job.nbMessage = nbMessage;
+  job.messages = messages;
+  job.bandWidth = bandWidth;
+  job.abandonScore = abandonScore;
+  job.debugMode = debugMode;
+  job.scoreMatrix = scoreMatrix;
+  job.nbPairs = 0;
+  job.pairs = NULL;
+  job.scores = NULL;
+  job.nbUnits = nbMessage;
+
+  runSimilarityJob(&job, nbThreads);
+}
+
+/**
+   computeSimilarityScores:
+
+   This functions computes the similarity scores of the requested pairs
+   of messages, in parallel by nbThreads threads.
+   @param nbMessage: the number of provided messages in the param messages
+   @param messages: a list containing messages to work with
+   @param debug: activate or deactive debug messages
+   @param nbPairs: the number of pairs
+   @param pairs: the indexes of the messages of each pair (2 * nbPairs values)
+   @param scores: an array where the score of each pair will be stored
+   @param nbThreads: the number of threads to use
+   @param bandWidth: the band of the alignments (see alignTwoMessagesInBand)
+   @param abandonScore: the score under which alignments are abandoned (see alignTwoMessagesInBand)
+*/
+void computeSimilarityScores(int nbMessage, t_message* messages, Bool debugMode, long nbPairs, unsigned int* pairs, float* scores, int nbThreads, int bandWidth, float abandonScore) {
+  t_similarityJob job;
+
+  job.nbMessage = nbMessage;
+  job.messages = messages;
+  job.bandWidth = bandWidth;
+  job.abandonScore = abandonScore;
+  job.debugMode = debugMode;
+  job.scoreMatrix = NULL;
+  job.nbPairs = nbPairs;
+  job.pairs = pairs;
+  job.scores = scores;
+  job.nbUnits = (nbPairs + SIMILARITY_PAIRS_BLOCK - 1) / SIMILARITY_PAIRS_BLOCK;
+
+  runSimilarityJob(&job, nbThreads);
 }
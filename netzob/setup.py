@@ -141,7 +141,8 @@ moduleLibNeedleman = Extension('netzob._libNeedleman',
                                         opj(argsFactoriesPath, "factory.c"),
                                         opj(toolsPath, "getBID.c")],
                                define_macros=macros,
-                               include_dirs=includes)
+                               include_dirs=includes,
+                               libraries=["pthread"])
 
 # Module ScoreComputation
 moduleLibScoreComputation = Extension('netzob._libScoreComputation',
@@ -154,7 +155,8 @@ moduleLibScoreComputation = Extension('netzob._libScoreComputation',
                                                opj(argsFactoriesPath, "factory.c"),
                                                opj(toolsPath, "getBID.c")],
                                       define_macros=macros,
-                                      include_dirs=includes)
+                                      include_dirs=includes,
+                                      libraries=["pthread"])
 
 # Module Interface
 moduleLibInterface = Extension('netzob._libInterface',
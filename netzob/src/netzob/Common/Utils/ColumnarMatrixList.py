@@ -0,0 +1,393 @@
+#-*- coding: utf-8 -*-
+
+#+---------------------------------------------------------------------------+
+#|          01001110 01100101 01110100 01111010 01101111 01100010            |
+#|                                                                           |
+#|               Netzob : Inferring communication protocols                  |
+#+---------------------------------------------------------------------------+
+#| Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+#| This program is free software: you can redistribute it and/or modify      |
+#| it under the terms of the GNU General Public License as published by      |
+#| the Free Software Foundation, either version 3 of the License, or         |
+#| (at your option) any later version.                                       |
+#|                                                                           |
+#| This program is distributed in the hope that it will be useful,           |
+#| but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+#| MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+#| GNU General Public License for more details.                              |
+#|                                                                           |
+#| You should have received a copy of the GNU General Public License         |
+#| along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+#+---------------------------------------------------------------------------+
+#| @url      : http://www.netzob.org                                         |
+#| @contact  : contact@netzob.org                                            |
+#| @sponsors : Amossys, http://www.amossys.fr                                |
+#|             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| File contributors :                                                       |
+#|       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+#|       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Standard library imports                                                  |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Related third party imports                                               |
+#+---------------------------------------------------------------------------+
+import numpy
+from bitarray import bitarray
+
+#+---------------------------------------------------------------------------+
+#| Local application imports                                                 |
+#+---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import NetzobLogger
+from netzob.Common.Utils.MatrixList import MatrixList
+
+
+@NetzobLogger
+class ColumnarMatrixList(object):
+    """This class represents aligned messages organized per field
+    (i.e. a transposed :class:`MatrixList`) without storing each cell.
+
+    All the messages are stored in a single contiguous buffer. For each
+    field and each message, the position of the cell in the buffer is
+    kept in two NumPy arrays (bit offsets and bit lengths) of shape
+    (number of fields, number of messages). Cells are only materialized
+    when a column is requested.
+
+    >>> from netzob.Common.Utils.ColumnarMatrixList import ColumnarMatrixList
+    >>> from bitarray import bitarray
+    >>> data = [b"hello netzob", b"hello zoby"]
+    >>> aligned = [[bitarray(48), bitarray(48)], [bitarray(48), bitarray(32)]]
+    >>> m = ColumnarMatrixList.fromAlignment(data, aligned, headers=["f1", "f2"])
+    >>> print(len(m), m.nbMessages)
+    2 2
+    >>> print(m[1])
+    [b'netzob', b'zoby']
+    >>> print(m.offsets)
+    [[  0  96]
+     [ 48 144]]
+    >>> print(m.lengths)
+    [[48 48]
+     [48 32]]
+    >>> print(m)
+    f1       | f2      
+    -------- | --------
+    'hello ' | 'netzob'
+    'hello ' | 'zoby'  
+    -------- | --------
+
+    Values of a set of consecutive fields can be retrieved per message
+
+    >>> print(m.joinColumns())
+    [b'hello netzob', b'hello zoby']
+    >>> print(m.subMatrix(1, 2).joinColumns())
+    [b'netzob', b'zoby']
+
+    Fields of constant size can be scanned as a 2D array of bytes
+
+    >>> print(m.getFixedSizeColumn(0))
+    [[104 101 108 108 111  32]
+     [104 101 108 108 111  32]]
+
+    Cells that are not aligned on a byte are padded as a :class:`Raw` conversion would do
+
+    >>> m = ColumnarMatrixList.fromAlignment([b"\\xf0"], [[bitarray(3), bitarray(5)]])
+    >>> print(m.getColumn(0), m.getColumn(1))
+    [b'\\xe0'] [b'\\x80']
+    >>> print(m.joinColumns())
+    [b'\\xe0\\x80']
+
+    """
+
+    def __init__(self,
+                 buffer,
+                 messageOffsets,
+                 offsets,
+                 lengths,
+                 headers=None,
+                 encodedColumns=None):
+        """Constructor.
+
+        :param buffer: the concatenation of all the messages
+        :type buffer: :class:`bytes`
+        :param messageOffsets: the offset (in bytes) of each message in the buffer
+        :type messageOffsets: :class:`numpy.ndarray`
+        :param offsets: the offset (in bits) in the buffer of each cell, one line per field
+        :type offsets: :class:`numpy.ndarray`
+        :param lengths: the length (in bits) of each cell, one line per field
+        :type lengths: :class:`numpy.ndarray`
+        :keyword headers: the name of each field
+        :type headers: a :class:`list` of :class:`str`
+        :keyword encodedColumns: values that replace the raw cells of some fields, indexed by field position
+        :type encodedColumns: :class:`dict`
+        """
+        if offsets.shape != lengths.shape:
+            raise ValueError("Offsets and lengths must have the same shape")
+        self.__buffer = buffer
+        self.__bitBuffer = None
+        self.__messageOffsets = messageOffsets
+        self.__offsets = offsets
+        self.__lengths = lengths
+        if headers is None:
+            headers = ["Field"] * len(offsets)
+        self.headers = headers
+        if encodedColumns is None:
+            encodedColumns = dict()
+        self.encodedColumns = encodedColumns
+
+    @staticmethod
+    def fromAlignment(data, alignedMessages, headers=None):
+        """Creates a columnar matrix from the result of the parsing of
+        messages, i.e. for each message, the list of bitarrays assigned to
+        each field. Only the length of these bitarrays is kept.
+
+        :param data: the messages that were parsed
+        :type data: a :class:`list` of :class:`bytes`
+        :param alignedMessages: for each message, the values assigned to the fields
+        :type alignedMessages: an iterable of :class:`list` of :class:`bitarray`
+        :keyword headers: the name of each field
+        :type headers: a :class:`list` of :class:`str`
+        :rtype: :class:`ColumnarMatrixList`
+        """
+        lengths = [[len(value) for value in alignedMessage]
+                   for alignedMessage in alignedMessages]
+        return ColumnarMatrixList.fromSizes(data, lengths, headers=headers)
+
+    @staticmethod
+    def fromSizes(data, sizes, headers=None):
+        """Creates a columnar matrix from the size (in bits) of the cells
+        of each message, the cells of a message being consecutive.
+
+        >>> from netzob.Common.Utils.ColumnarMatrixList import ColumnarMatrixList
+        >>> m = ColumnarMatrixList.fromSizes([b"hello netzob", b"hello zoby"], [[48, 48], [48, 32]])
+        >>> print(m[1])
+        [b'netzob', b'zoby']
+
+        :param data: the messages
+        :type data: a :class:`list` of :class:`bytes`
+        :param sizes: for each message, the size of each cell
+        :type sizes: a :class:`list` of :class:`list` of :class:`int` (or a :class:`numpy.ndarray`)
+        :keyword headers: the name of each field
+        :type headers: a :class:`list` of :class:`str`
+        :rtype: :class:`ColumnarMatrixList`
+        """
+        data = list(data)
+        if len(sizes) != len(data):
+            raise ValueError("An alignment must be provided for each message")
+
+        nbFields = len(headers) if headers is not None else 0
+        if len(sizes) > 0:
+            nbFields = len(sizes[0])
+        lengths = numpy.array(
+            sizes, dtype=numpy.int64).reshape((len(data), nbFields)).T
+
+        messageOffsets = numpy.zeros(len(data), dtype=numpy.int64)
+        if len(data) > 0:
+            numpy.cumsum(
+                [len(d) for d in data[:-1]], out=messageOffsets[1:])
+
+        # cells of a message are consecutive, a cell starts where the previous one stops
+        offsets = numpy.cumsum(lengths, axis=0) - lengths + messageOffsets * 8
+
+        return ColumnarMatrixList(
+            b''.join(data), messageOffsets, offsets, lengths, headers=headers)
+
+    def subMatrix(self, start, stop):
+        """Returns a columnar matrix restricted to the fields
+        between start (included) and stop (excluded). The buffer and the
+        offsets are shared with the current matrix.
+
+        :rtype: :class:`ColumnarMatrixList`
+        """
+        start, stop, step = slice(start, stop).indices(len(self))
+        encodedColumns = dict((iField - start, column)
+                              for iField, column in self.encodedColumns.items()
+                              if start <= iField < stop)
+        return ColumnarMatrixList(
+            self.__buffer,
+            self.__messageOffsets,
+            self.__offsets[start:stop],
+            self.__lengths[start:stop],
+            headers=self.headers[start:stop],
+            encodedColumns=encodedColumns)
+
+    def __len__(self):
+        return len(self.__offsets)
+
+    def __getitem__(self, iField):
+        if iField < 0:
+            iField += len(self)
+        if not 0 <= iField < len(self):
+            raise IndexError("Field index out of range")
+        return self.getColumn(iField)
+
+    def __iter__(self):
+        for iField in range(len(self)):
+            yield self.getColumn(iField)
+
+    def getColumn(self, iField):
+        """Returns the cells of the specified field for all the messages.
+
+        :param iField: the position of the field
+        :type iField: :class:`int`
+        :rtype: a :class:`list` of :class:`bytes`
+        """
+        if iField in self.encodedColumns:
+            return self.encodedColumns[iField]
+
+        offsets = self.__offsets[iField]
+        lengths = self.__lengths[iField]
+        if self.__isByteAligned(offsets, lengths):
+            return self.__sliceBytes(offsets // 8, (offsets + lengths) // 8)
+
+        bits = self.__getBitBuffer()
+        return [
+            bits[offset:offset + length].tobytes()
+            for offset, length in zip(offsets.tolist(), lengths.tolist())
+        ]
+
+    def getRow(self, iMessage):
+        """Returns the cells of the specified message.
+
+        :rtype: a :class:`list` of :class:`bytes`
+        """
+        return [column[iMessage] for column in self]
+
+    def getBitArray(self, iField, iMessage):
+        """Returns the bits of a cell.
+
+        :rtype: :class:`bitarray`
+        """
+        offset = int(self.__offsets[iField, iMessage])
+        return self.__getBitBuffer()[offset:offset + int(self.__lengths[
+            iField, iMessage])]
+
+    def joinColumns(self):
+        """Returns, for each message, the concatenation of its cells, i.e. the
+        value taken by the fields of the matrix. If all the cells are
+        aligned on bytes, each value is a single slice of the buffer.
+
+        :rtype: a :class:`list` of :class:`bytes`
+        """
+        if len(self) == 0:
+            return [b''] * self.nbMessages
+
+        if len(self.encodedColumns) == 0 and self.__isByteAligned(
+                self.__offsets, self.__lengths):
+            starts = self.__offsets[0]
+            stops = self.__offsets[-1] + self.__lengths[-1]
+            return self.__sliceBytes(starts // 8, stops // 8)
+
+        return [b''.join(line) for line in zip(*self)]
+
+    def getFixedSizeColumn(self, iField):
+        """Returns the cells of a field as a 2D NumPy array of bytes (one
+        line per message). All the cells of the field must be aligned
+        on bytes and have the same size.
+
+        :rtype: :class:`numpy.ndarray`
+        """
+        offsets = self.__offsets[iField]
+        lengths = self.__lengths[iField]
+        if not self.__isByteAligned(offsets, lengths):
+            raise ValueError("Cells of the field are not aligned on bytes")
+        if len(lengths) > 0 and (lengths != lengths[0]).any():
+            raise ValueError("Cells of the field do not have a constant size")
+
+        size = int(lengths[0]) // 8 if len(lengths) > 0 else 0
+        positions = (offsets // 8)[:, numpy.newaxis] + numpy.arange(size)
+        return self.asArray()[positions]
+
+    def asArray(self):
+        """Returns the buffer as a NumPy array of bytes (without copy).
+
+        :rtype: :class:`numpy.ndarray`
+        """
+        return numpy.frombuffer(self.__buffer, dtype=numpy.uint8)
+
+    def toMatrixList(self):
+        """Converts the columnar matrix into a :class:`MatrixList` with a
+        line for each message.
+
+        :rtype: :class:`netzob.Common.Utils.MatrixList.MatrixList`
+        """
+        result = MatrixList()
+        result.headers = self.headers
+        for line in zip(*self):
+            result.append(list(line))
+        return result
+
+    def __repr__(self):
+        return repr(self.toMatrixList())
+
+    def __isByteAligned(self, offsets, lengths):
+        return not ((offsets % 8).any() or (lengths % 8).any())
+
+    def __sliceBytes(self, starts, stops):
+        buf = self.__buffer
+        return [
+            buf[start:stop]
+            for start, stop in zip(starts.tolist(), stops.tolist())
+        ]
+
+    def __getBitBuffer(self):
+        if self.__bitBuffer is None:
+            self.__bitBuffer = bitarray(endian='big')
+            self.__bitBuffer.frombytes(self.__buffer)
+        return self.__bitBuffer
+
+    # Properties
+
+    @property
+    def headers(self):
+        """The name of each field"""
+        return self.__headers
+
+    @headers.setter
+    def headers(self, headers):
+        self.__headers = [str(h) for h in headers]
+
+    @property
+    def buffer(self):
+        """The concatenation of all the messages
+
+        :type: :class:`bytes`
+        """
+        return self.__buffer
+
+    @property
+    def messageOffsets(self):
+        """The offset (in bytes) of each message in the buffer
+
+        :type: :class:`numpy.ndarray`
+        """
+        return self.__messageOffsets
+
+    @property
+    def offsets(self):
+        """The offset (in bits) in the buffer of each cell, one line per field
+
+        :type: :class:`numpy.ndarray`
+        """
+        return self.__offsets
+
+    @property
+    def lengths(self):
+        """The length (in bits) of each cell, one line per field
+
+        :type: :class:`numpy.ndarray`
+        """
+        return self.__lengths
+
+    @property
+    def nbMessages(self):
+        """The number of aligned messages
+
+        :type: :class:`int`
+        """
+        return len(self.__messageOffsets)
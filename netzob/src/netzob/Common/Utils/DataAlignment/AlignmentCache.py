@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+
+# +---------------------------------------------------------------------------+
+# |          01001110 01100101 01110100 01111010 01101111 01100010            |
+# |                                                                           |
+# |               Netzob : Inferring communication protocols                  |
+# +---------------------------------------------------------------------------+
+# | Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+# | This program is free software: you can redistribute it and/or modify      |
+# | it under the terms of the GNU General Public License as published by      |
+# | the Free Software Foundation, either version 3 of the License, or         |
+# | (at your option) any later version.                                       |
+# |                                                                           |
+# | This program is distributed in the hope that it will be useful,           |
+# | but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+# | MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+# | GNU General Public License for more details.                              |
+# |                                                                           |
+# | You should have received a copy of the GNU General Public License         |
+# | along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+# +---------------------------------------------------------------------------+
+# | @url      : http://www.netzob.org                                         |
+# | @contact  : contact@netzob.org                                            |
+# | @sponsors : Amossys, http://www.amossys.fr                                |
+# |             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+# |             ANSSI,   https://www.ssi.gouv.fr                              |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | File contributors :                                                       |
+# |       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+# |       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | Standard library imports                                                  |
+# +---------------------------------------------------------------------------+
+import multiprocessing
+
+# +---------------------------------------------------------------------------+
+# | Related third party imports                                               |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | Local application imports                                                 |
+# +---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import NetzobLogger
+from netzob.Common.Utils.MatrixList import MatrixList
+from netzob.Common.Utils.DataAlignment.DataAlignment import DataAlignment
+
+
+@NetzobLogger
+class AlignmentCache(object):
+    """This class stores the alignment of the messages of a symbol so
+    that the cells and values of each of its fields can be computed
+    without parsing all the messages again.
+
+    Messages are parsed once with all the leaf fields of the symbol and
+    the resulting alignment is kept as a
+    :class:`netzob.Common.Utils.ColumnarMatrixList.ColumnarMatrixList`,
+    only encoded values are stored cell by cell. The cache is automatically
+    invalidated if the messages, the fields, their domains or their
+    encoding functions are modified.
+
+    >>> from netzob.all import *
+    >>> from netzob.Common.Utils.DataAlignment.AlignmentCache import AlignmentCache
+    >>> messages = [RawMessage("hello {0}".format(name)) for name in ["netzob", "zoby"]]
+    >>> f1 = Field("hello ", name="f1")
+    >>> f2 = Field(ASCII(nbChars=(1, 10)), name="f2")
+    >>> symbol = Symbol([f1, f2], messages=messages)
+    >>> cache = AlignmentCache()
+    >>> print(cache.getCells(f2, encoded=False))
+    Field   
+    --------
+    'netzob'
+    'zoby'  
+    --------
+    >>> print(cache.nbParsedMessages)
+    2
+    >>> print(cache.getCells(f1, encoded=False))
+    Field   
+    --------
+    'hello '
+    'hello '
+    --------
+    >>> print(cache.nbParsedMessages)
+    2
+
+    Changing the messages or the definition of a field invalidates the cache
+
+    >>> symbol.messages.append(RawMessage("hello lapy"))
+    >>> print(cache.getCells(symbol, encoded=False))
+    f1       | f2      
+    -------- | --------
+    'hello ' | 'netzob'
+    'hello ' | 'zoby'  
+    'hello ' | 'lapy'  
+    -------- | --------
+    >>> print(cache.nbParsedMessages)
+    5
+    >>> f1.domain = Alt(["hello ", "hi "])
+    >>> symbol.messages.append(RawMessage("hi zoby"))
+    >>> print(cache.getCells(symbol, encoded=False))
+    f1       | f2      
+    -------- | --------
+    'hello ' | 'netzob'
+    'hello ' | 'zoby'  
+    'hello ' | 'lapy'  
+    'hi '    | 'zoby'  
+    -------- | --------
+    >>> print(cache.nbParsedMessages)
+    9
+
+    Adding an encoding function does not trigger a new parsing of the messages
+
+    >>> f2.addEncodingFunction(TypeEncodingFunction(HexaString))
+    >>> print(cache.getCells(symbol))
+    f1       | f2            
+    -------- | --------------
+    'hello ' | '6e65747a6f62'
+    'hello ' | '7a6f6279'    
+    'hello ' | '6c617079'    
+    'hi '    | '7a6f6279'    
+    -------- | --------------
+    >>> print(cache.nbParsedMessages)
+    9
+
+    The alignment of a field can be retrieved per column
+
+    >>> columns = cache.getColumnar(symbol)
+    >>> print(columns.headers)
+    ['f1', 'f2']
+    >>> print(columns[1])
+    [b'6e65747a6f62', b'7a6f6279', b'6c617079', b'7a6f6279']
+    >>> print(cache.getColumnar(f2, encoded=False).joinColumns())
+    [b'netzob', b'zoby', b'lapy', b'zoby']
+
+    """
+
+    def __init__(self):
+        self.nbParsedMessages = 0
+        self.invalidate()
+
+    def invalidate(self):
+        """Drop any alignment stored in the cache."""
+        self.__signature = None
+        self.__leafFields = []
+        self.__leafIndexes = dict()
+        self.__columnar = None
+        self.__encodedColumns = dict()
+
+    def __getstate__(self):
+        # The cached alignment is never serialized, it is recomputed when needed
+        return dict()
+
+    def __setstate__(self, state):
+        self.__init__()
+
+    def getCells(self, field, encoded=True, styled=True, nbThread=1):
+        """Returns the cells of the specified field following the alignment of
+        the messages of its symbol, as :meth:`DataAlignment.align` would do.
+
+        :param field: the field (or symbol) for which cells are requested
+        :type field: :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        :keyword encoded: if set to True, encoding functions are applied on returned cells
+        :type encoded: :class:`bool`
+        :keyword styled: if set to True, visualization functions are applied on returned cells
+        :type styled: :class:`bool`
+        :keyword nbThread: the number of processes used if messages have to be parsed
+        :type nbThread: :class:`int`
+        :return: the aligned cells of the field
+        :rtype: a :class:`netzob.Common.Utils.MatrixList.MatrixList`
+        """
+        columns = self.getColumns(field, encoded=encoded, nbThread=nbThread)
+
+        result = MatrixList()
+        result.headers = [str(leafField.name) for leafField in self.__leafFields]
+        for line in zip(*columns):
+            result.append(list(line))
+        return result
+
+    def getColumns(self, field, encoded=True, nbThread=1):
+        """Returns the aligned values of the specified field
+        organized with one list per leaf field.
+
+        :param field: the field (or symbol) for which columns are requested
+        :type field: :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        :keyword encoded: if set to True, encoding functions are applied on returned values
+        :type encoded: :class:`bool`
+        :keyword nbThread: the number of processes used if messages have to be parsed
+        :type nbThread: :class:`int`
+        :return: a list containing a list of values for each leaf field
+        :rtype: a :class:`list` of :class:`list`
+        """
+        self.__update(field.getSymbol(), nbThread)
+
+        return [
+            self.__getEncodedColumn(leafField, encoded)
+            for leafField in field.getLeafFields()
+        ]
+
+    def getColumnar(self, field, encoded=True, nbThread=1):
+        """Returns the alignment of the specified field organized
+        per leaf field. Raw cells are not copied, they share the buffer of
+        the cached alignment.
+
+        :param field: the field (or symbol) for which columns are requested
+        :type field: :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        :keyword encoded: if set to True, encoding functions are applied on returned values
+        :type encoded: :class:`bool`
+        :keyword nbThread: the number of processes used if messages have to be parsed
+        :type nbThread: :class:`int`
+        :rtype: :class:`netzob.Common.Utils.ColumnarMatrixList.ColumnarMatrixList`
+        """
+        self.__update(field.getSymbol(), nbThread)
+
+        fieldLeafFields = field.getLeafFields()
+        start = self.__getLeafIndex(fieldLeafFields[0])
+        result = self.__columnar.subMatrix(start,
+                                           start + len(fieldLeafFields))
+
+        if encoded:
+            for iField, leafField in enumerate(fieldLeafFields):
+                if len(leafField.encodingFunctions) > 0:
+                    result.encodedColumns[iField] = self.__getEncodedColumn(
+                        leafField, encoded)
+        return result
+
+    def __update(self, symbol, nbThread=1):
+        """Parses the messages of the symbol if the cached
+        alignment does not match anymore its definition."""
+
+        data = tuple(message.data for message in symbol.messages)
+        leafFields = symbol.getLeafFields()
+        signature = (data, tuple(
+            AlignmentCache._fieldSignature(leafField)
+            for leafField in leafFields))
+
+        if signature == self.__signature:
+            return
+
+        self.invalidate()
+
+        self._logger.debug("Aligning {0} messages of symbol '{1}'".format(
+            len(data), symbol.name))
+
+        # the pool of processes is not kept by the cache, as nothing
+        # would stop it once the symbol is dropped
+        pAlignment = self.__createParallelAlignment(symbol, nbThread)
+        try:
+            dAlignment = DataAlignment(
+                data, symbol, encoded=False, parallelAlignment=pAlignment)
+            self.__columnar = dAlignment.executeColumnar()
+        finally:
+            if pAlignment is not None:
+                pAlignment.close()
+        self.nbParsedMessages += len(data)
+
+        self.__leafIndexes = dict((leafField.id, iField)
+                                  for iField, leafField in enumerate(leafFields))
+        self.__leafFields = leafFields
+        self.__signature = signature
+
+    def __createParallelAlignment(self, symbol, nbThread):
+        """Returns the parallel alignment used to parse the messages with
+        the requested number of processes (None if parsing is sequential)."""
+
+        if nbThread == 1:
+            return None
+
+        from netzob.Common.Utils.DataAlignment.ParallelDataAlignment import ParallelDataAlignment
+        if nbThread is None:
+            nbThread = multiprocessing.cpu_count()
+        return ParallelDataAlignment(symbol, nbThread=nbThread)
+
+    def __getEncodedColumn(self, leafField, encoded):
+        """Returns the values of the leaf field once encoded."""
+
+        iField = self.__getLeafIndex(leafField)
+        if not encoded or len(leafField.encodingFunctions) == 0:
+            return self.__columnar.getColumn(iField)
+
+        key = leafField.id
+        signature = AlignmentCache._encodingSignature(leafField)
+        if key in self.__encodedColumns:
+            (cachedSignature, column) = self.__encodedColumns[key]
+            if cachedSignature == signature:
+                return column
+
+        column = [
+            DataAlignment.encodeFieldValue(
+                leafField, self.__columnar.getBitArray(iField, iMessage))
+            for iMessage in range(self.__columnar.nbMessages)
+        ]
+        self.__encodedColumns[key] = (signature, column)
+        return column
+
+    def __getLeafIndex(self, leafField):
+        """Returns the position of the leaf field in the cached alignment."""
+        if leafField.id not in self.__leafIndexes:
+            raise ValueError("Field '{0}' is not a leaf field of the symbol".
+                             format(leafField.name))
+        return self.__leafIndexes[leafField.id]
+
+    @staticmethod
+    def _fieldSignature(field):
+        """Computes a value that changes whenever the parsing of the field may change."""
+        return (field.id, AlignmentCache._variableSignature(field.domain))
+
+    @staticmethod
+    def _variableSignature(variable):
+        """Computes a value that changes whenever the definition of the variable
+        (or of one of its children) is modified."""
+
+        signature = [id(variable), str(variable), variable.svas]
+
+        dataType = getattr(variable, "dataType", None)
+        if dataType is not None:
+            signature.extend(
+                [dataType.unitSize, dataType.endianness, dataType.sign])
+
+        currentValue = getattr(variable, "currentValue", None)
+        if currentValue is not None:
+            signature.append(currentValue.to01())
+
+        for attribute in ["nbRepeat", "delimitor"]:
+            value = getattr(variable, attribute, None)
+            if value is not None:
+                signature.append(str(value))
+
+        for child in getattr(variable, "children", []):
+            signature.append(AlignmentCache._variableSignature(child))
+
+        return tuple(signature)
+
+    @staticmethod
+    def _encodingSignature(field):
+        """Computes a value that changes whenever the encoding functions of the field are modified."""
+        return tuple((id(encodingFunction), repr(
+            sorted(vars(encodingFunction).items())))
+                     for encodingFunction in field.encodingFunctions.values())
@@ -46,6 +46,8 @@
 from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
 from netzob.Model.Vocabulary.AbstractField import AbstractField
 from netzob.Common.Utils.MatrixList import MatrixList
+from netzob.Common.Utils.ColumnarMatrixList import ColumnarMatrixList
+from netzob.Common.Utils.Deduplicator import Deduplicator
 from netzob.Model.Vocabulary.Types.TypeConverter import TypeConverter
 from netzob.Model.Vocabulary.Types.BitArray import BitArray
 from netzob.Model.Vocabulary.Types.Raw import Raw
@@ -113,9 +115,22 @@ class DataAlignment(object):
     'hello' | 'PUT' | 'totototo' | 'PA' | 'dqs4qsd33'
     ------- | ----- | ---------- | ---- | -----------
 
+    >>> # The alignment can also be organized per field without copying each cell
+    >>> columns = DataAlignment.align(messages, symbol, transposed=True)
+    >>> print(columns[4])
+    [b'343', b'', b'dqs4qsd33']
+    >>> print(columns.lengths[2])
+    [32 48 64]
+
     """
 
-    def __init__(self, data, field, depth=None, encoded=True, styled=False):
+    def __init__(self,
+                 data,
+                 field,
+                 depth=None,
+                 encoded=True,
+                 styled=False,
+                 parallelAlignment=None):
         """Constructor.
 
         :param data: the list of data that will be aligned, data must be encoded in HexaString
@@ -128,6 +143,8 @@ class DataAlignment(object):
         :type encoded: :class:`bool`
         :keyword styled: indicated if the result visualization filter should be applied
         :type styled: :class:`bool`
+        :keyword parallelAlignment: if specified, the parallel alignment whose processes are used to parse data
+        :type parallelAlignment: :class:`netzob.Common.Utils.DataAlignment.ParallelDataAlignment.ParallelDataAlignment`
 
         """
         self.data = data
@@ -135,6 +152,7 @@ class DataAlignment(object):
         self.depth = depth
         self.encoded = encoded
         self.styled = styled
+        self.parallelAlignment = parallelAlignment
 
     def execute(self):
         """Execute the alignment of data following specified field
@@ -156,34 +174,125 @@ class DataAlignment(object):
         targetedFieldLeafFields = rootLeafFields
 
         result.headers = [str(field.name) for field in targetedFieldLeafFields]
-        from netzob.Model.Vocabulary.Domain.Parser.MessageParser import MessageParser
-        for d in self.data:
-            mp = MessageParser()
-            # alignedMsg = mp.parseRaw(TypeConverter.convert(d, HexaString, Raw), targetedFieldLeafFields)
-            alignedMsg = next(mp.parseRaw(d, targetedFieldLeafFields))
+
+        # Leaf fields of the targeted field, used to filter the columns of the result
+        fieldLeafFields = self.field.getLeafFields(depth=self.depth)
+
+        for alignedMsg in self.parseData(targetedFieldLeafFields):
 
             alignedEncodedMsg = []
             for ifield, currentField in enumerate(targetedFieldLeafFields):
+                if currentField in fieldLeafFields:
+                    alignedEncodedMsg.append(
+                        DataAlignment.encodeFieldValue(
+                            currentField, alignedMsg[ifield], self.encoded))
 
-                # now we apply encoding and mathematic functions
-                fieldValue = alignedMsg[ifield]
+            result.append(alignedEncodedMsg)
 
-                if self.encoded and len(
-                        list(currentField.encodingFunctions.values())) > 0:
-                    for encodingFunction in list(
-                            currentField.encodingFunctions.values()):
-                        fieldValue = encodingFunction.encode(fieldValue)
-                else:
-                    fieldValue = TypeConverter.convert(fieldValue, BitArray,
-                                                       Raw)
+        return result
 
-                if currentField in self.field.getLeafFields(depth=self.depth):
-                    alignedEncodedMsg.append(fieldValue)
+    def executeColumnar(self):
+        """Execute the alignment of data following specified field and
+        returns it organized per field.
 
-            result.append(alignedEncodedMsg)
+        :rtype: :class:`netzob.Common.Utils.ColumnarMatrixList.ColumnarMatrixList`
+        """
+        if self.data is None:
+            raise TypeError("Data cannot be None")
+        if self.field is None:
+            raise TypeError("Field cannot be None")
+
+        rootLeafFields = self.__root.getLeafFields(depth=self.depth)
+        fieldLeafFields = self.field.getLeafFields(depth=self.depth)
+
+        result = ColumnarMatrixList.fromAlignment(
+            self.data,
+            self.parseData(rootLeafFields),
+            headers=[field.name for field in rootLeafFields])
+
+        # Leaf fields of the targeted field are consecutive in the leaf fields of the root
+        start = rootLeafFields.index(fieldLeafFields[0])
+        result = result.subMatrix(start, start + len(fieldLeafFields))
+
+        if self.encoded:
+            for iField, field in enumerate(fieldLeafFields):
+                if len(field.encodingFunctions) > 0:
+                    result.encodedColumns[iField] = DataAlignment.encodeFieldValues(
+                        field, [
+                            result.getBitArray(iField, iMessage)
+                            for iMessage in range(result.nbMessages)
+                        ])
 
         return result
 
+    def parseData(self, fields):
+        """Parse each data with the specified leaf fields and yield,
+        for each of them, the list of bitarrays assigned to the fields.
+        Identical data are only parsed once and share the same bitarrays.
+
+        :param fields: the leaf fields to use to parse the data
+        :type fields: a :class:`list` of :class:`netzob.Model.Vocabulary.Field.Field`
+        :return: an iterator over the parsed data
+        :rtype: a generator of :class:`list` of :class:`bitarray.bitarray`
+        """
+        # identical data are parsed once, their alignment is shared
+        dedup = Deduplicator(self.data)
+
+        if self.parallelAlignment is not None:
+            uniqueAlignments = self.parallelAlignment.parseData(
+                dedup.uniqueValues)
+        else:
+            uniqueAlignments = self.__parseUniqueData(dedup.uniqueValues,
+                                                      fields)
+
+        for alignedMsg in dedup.iterExpand(uniqueAlignments):
+            yield alignedMsg
+
+    def __parseUniqueData(self, data, fields):
+        from netzob.Model.Vocabulary.Domain.Parser.MessageParser import MessageParser
+        for d in data:
+            mp = MessageParser()
+            yield next(mp.parseRaw(d, fields))
+
+    @staticmethod
+    def encodeFieldValue(field, fieldValue, encoded=True):
+        """Apply the encoding functions of the field on a parsed value.
+
+        :param field: the leaf field that produced the value
+        :type field: :class:`netzob.Model.Vocabulary.Field.Field`
+        :param fieldValue: the value parsed by the field
+        :type fieldValue: :class:`bitarray.bitarray`
+        :keyword encoded: if False, encoding functions are ignored and a Raw value is returned
+        :type encoded: :class:`bool`
+        """
+        encodingFunctions = list(field.encodingFunctions.values())
+        if encoded and len(encodingFunctions) > 0:
+            for encodingFunction in encodingFunctions:
+                fieldValue = encodingFunction.encode(fieldValue)
+            return fieldValue
+
+        return TypeConverter.convert(fieldValue, BitArray, Raw)
+
+    @staticmethod
+    def encodeFieldValues(field, fieldValues, encoded=True):
+        """Apply the encoding functions of the field on all the values it
+        parsed, each function encoding the whole list at once.
+
+        :param field: the leaf field that produced the values
+        :type field: :class:`netzob.Model.Vocabulary.Field.Field`
+        :param fieldValues: the values parsed by the field
+        :type fieldValues: a :class:`list` of :class:`bitarray.bitarray`
+        :keyword encoded: if False, encoding functions are ignored and Raw values are returned
+        :type encoded: :class:`bool`
+        """
+        encodingFunctions = list(field.encodingFunctions.values())
+        if encoded and len(encodingFunctions) > 0:
+            for encodingFunction in encodingFunctions:
+                fieldValues = encodingFunction.encodeMany(fieldValues)
+            return fieldValues
+
+        return TypeConverter.convertMany(fieldValues, BitArray, Raw)
+
     # @typeCheck(str)
     # def __splitDataWithRegex(self, data, fields):
     #     """Split the specified data in possible field following
@@ -240,7 +349,12 @@ class DataAlignment(object):
     # Static method
     @staticmethod
     @typeCheck(str, AbstractField, int)
-    def align(data, field, depth=None, encoded=True):
+    def align(data,
+              field,
+              depth=None,
+              encoded=True,
+              transposed=False,
+              nbThread=1):
         """Execute an alignment of specified data with provided field.
         Data must be provided as a list of hexastring.
 
@@ -252,11 +366,27 @@ class DataAlignment(object):
         :type depth: :class:`int`.
         :keyword encoded: set to True if you want the returned result to follow the encoding functions
         :type encoded: :class:`boolean`
+        :keyword transposed: set to True if you want the result to be organized per field
+        :type transposed: :class:`boolean`
+        :keyword nbThread: the number of processes used to parse the data (use None for the number of cpu)
+        :type nbThread: :class:`int`
         :return: the aligned data
-        :rtype: :class:`netzob.Common.Utils.MatrixList.MatrixList`
+        :rtype: :class:`netzob.Common.Utils.MatrixList.MatrixList` (or :class:`netzob.Common.Utils.ColumnarMatrixList.ColumnarMatrixList` if transposed)
         """
 
+        if nbThread != 1:
+            from netzob.Common.Utils.DataAlignment.ParallelDataAlignment import ParallelDataAlignment
+            return ParallelDataAlignment.align(
+                list(data),
+                field,
+                depth,
+                nbThread=nbThread,
+                encoded=encoded,
+                transposed=transposed)
+
         dAlignment = DataAlignment(data, field, depth, encoded=encoded)
+        if transposed:
+            return dAlignment.executeColumnar()
         return dAlignment.execute()
 
     # Properties
@@ -354,3 +484,16 @@ class DataAlignment(object):
             raise ValueError("Styled cannot be None")
 
         self.__styled = styled
+
+    @property
+    def parallelAlignment(self):
+        """The parallel alignment whose pool of processes is used to parse
+        the data. If set to None, data are parsed in the current process.
+
+        :type: :class:`netzob.Common.Utils.DataAlignment.ParallelDataAlignment.ParallelDataAlignment`
+        """
+        return self.__parallelAlignment
+
+    @parallelAlignment.setter
+    def parallelAlignment(self, parallelAlignment):
+        self.__parallelAlignment = parallelAlignment
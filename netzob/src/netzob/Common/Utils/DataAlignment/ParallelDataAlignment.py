@@ -34,9 +34,9 @@
 # +---------------------------------------------------------------------------+
 # | Standard library imports
 # +---------------------------------------------------------------------------+
+import math
 import multiprocessing
 import time
-from collections import OrderedDict
 
 # +---------------------------------------------------------------------------+
 # | Local application imports
@@ -44,18 +44,37 @@ from collections import OrderedDict
 from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
 from netzob.Model.Vocabulary.AbstractField import AbstractField
 from netzob.Common.Utils.DataAlignment.DataAlignment import DataAlignment
-from netzob.Common.Utils.MatrixList import MatrixList
+from netzob.Common.Utils.DataAlignment.AlignmentCache import AlignmentCache
+from netzob.Model.Vocabulary.Types.TypeConverter import TypeConverter
+from netzob.Model.Vocabulary.Types.BitArray import BitArray
+from netzob.Model.Vocabulary.Types.Raw import Raw
 
+# Leaf fields used by the current worker process to parse data. They are
+# set once, when the worker starts, by _initializeWorker.
+_workerFields = None
 
-def _executeDataAlignment(arg, **kwargs):
-    """Wrapper used to parallelize the DataAlignment using
-    a pool of threads.
+
+def _initializeWorker(root, depth):
+    """Initializer of the worker processes: the format definition is
+    received once per worker and kept for all the data it will align.
+    """
+    global _workerFields
+    _workerFields = root.getLeafFields(depth=depth)
+
+
+def _parseChunk(chunk):
+    """Wrapper used to parallelize the parsing of data in the worker
+    processes. For each data of the chunk, the size (in bits) of the value
+    assigned to each field is returned.
     """
-    data = arg[0]
-    field = arg[1]
-    encoded = arg[2]
-    alignedData = DataAlignment.align([data], field, encoded=encoded)
-    return (data, alignedData)
+    from netzob.Model.Vocabulary.Domain.Parser.MessageParser import MessageParser
+
+    result = []
+    for data in chunk:
+        mp = MessageParser()
+        alignedMsg = next(mp.parseRaw(data, _workerFields))
+        result.append([len(value) for value in alignedMsg])
+    return result
 
 
 @NetzobLogger
@@ -63,6 +82,13 @@ class ParallelDataAlignment(object):
     """Allows to align specified datas given a common field definition
     in parallel way.
 
+    The alignment relies on a pool of processes which is kept alive
+    between executions. The format definition is sent only once to each
+    worker, when the pool starts, and data are then dispatched to the
+    workers by chunks. Results are collected in the order of the data. The
+    pool is restarted if the format definition is modified and can be
+    released with :meth:`close` (or using the alignment as a context manager).
+
     >>> from netzob.all import *
     >>> import random
     >>> import time
@@ -85,6 +111,7 @@ class ParallelDataAlignment(object):
     >>> start = time.time()
     >>> alignedData = pAlignment.execute(data)
     >>> end = time.time()
+    >>> pAlignment.close()
     >>> oneThreadDuration = end-start
     >>> print(len(alignedData))
     1000
@@ -98,10 +125,28 @@ class ParallelDataAlignment(object):
     >>> if ('NETZOB_TEST_NO_PERFORMANCE' not in os.environ.keys() or os.environ['NETZOB_TEST_NO_PERFORMANCE'] != "yes") and autoThreadDuration >= oneThreadDuration:
     ...     print("Error, multi-thread version slower ({}) than single threaded execution ({})".format(autoThreadDuration, oneThreadDuration))
 
+    >>> # The pool of processes is reused by the following executions
+    >>> columns = pAlignment.executeColumnar(data[:3])
+    >>> print(columns.nbMessages)
+    3
+    >>> alignedData == DataAlignment.align(data, symbol, encoded=False)
+    True
+    >>> pAlignment.close()
+
     >>> # Reset log level of certain impacting loggers on alignment process
     >>> logging.getLogger(Data.__name__).setLevel(old_logging_level)
     >>> logging.getLogger(DataAlignment.__name__).setLevel(old_logging_level)
 
+    Parallel alignment can also be requested from :meth:`DataAlignment.align`
+    or when retrieving the cells of a field, by specifying the number of
+    processes to use
+
+    >>> messages = [RawMessage(d) for d in data[:10]]
+    >>> symbol = Symbol(fields=fields, messages=messages)
+    >>> print(DataAlignment.align(data[:2], fields[1], nbThread=2) == DataAlignment.align(data[:2], fields[1]))
+    True
+    >>> print(symbol.getCells(nbThread=2) == symbol.getCells())
+    True
 
     """
 
@@ -110,7 +155,8 @@ class ParallelDataAlignment(object):
                  depth=None,
                  nbThread=None,
                  encoded=False,
-                 styled=False):
+                 styled=False,
+                 chunkSize=None):
         """Constructor.
 
         :param field: the format definition that will be user
@@ -123,36 +169,36 @@ class ParallelDataAlignment(object):
         :type encoded: :class:`bool`
         :keyword styled: indicated if the result visualization filter should be applied
         :type styled: :class:`bool`
+        :keyword chunkSize: the number of data sent at once to a worker (use None for automatic)
+        :type chunkSize: :class:`int`
 
         """
 
+        self.__pool = None
+        self.__poolSignature = None
+
         self.field = field
 
         self.depth = depth
         self.nbThread = nbThread
         self.encoded = encoded
         self.styled = styled
+        self.chunkSize = chunkSize
 
-    def __collectResults_cb(self, tupple_result):
-        """This callback is executed by each thread when it finishes
-        to align data. Every thread submit its results using these callback.
-        :param data: the data to align
-        :type data: :class:`str`
-        :param result: the result of an alignment
-        :type result: :class:`list`
-        :raise Exception: if the parameter is not valid
-        """
-        if tupple_result is None:
-            raise TypeError("parameter cannot be none")
-
-        for (data, result) in tupple_result:
-            if data is None:
-                raise TypeError("data cannot be None")
+    def __enter__(self):
+        return self
 
-            if result is None:
-                raise TypeError("result cannot be none")
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
-            self.asyncResult[data] = result
+    def close(self):
+        """Stops the pool of processes used to align data. A new one
+        is started if another execution is requested."""
+        if self.__pool is not None:
+            self.__pool.terminate()
+            self.__pool.join()
+        self.__pool = None
+        self.__poolSignature = None
 
     @typeCheck(list)
     def execute(self, data):
@@ -163,57 +209,92 @@ class ParallelDataAlignment(object):
         :return: a list of aligned data sorted in order to respect the provided order of data.
         :rtype: a :class:`netzob.Common.Utils.MatrixList.MatrixList`
         """
-
-        # Create a list of data removed from duplicate entry
-        noDuplicateData = list(set(data))
-
-        # Async result host just aligned data under form [(data, alignedData)]
-        self.asyncResult = OrderedDict()
-
-        # Measure start time
         start = time.time()
 
-        # Create a pool of 'nbThead' threads (process)
-        pool = multiprocessing.Pool(self.nbThread)
-
-        # Execute Data Alignment
-        pool.map_async(
-            _executeDataAlignment,
-            list(
-                zip(noDuplicateData, [self.field] * len(noDuplicateData),
-                    [self.encoded] * len(noDuplicateData), [self.styled] * len(
-                        noDuplicateData))),
-            callback=self.__collectResults_cb)
-
-        # Waits all alignment tasks finish
-        pool.close()
-        pool.join()
-
-        # Measure end time
-        end = time.time()
-
-        # create a Matrix List based on aligned data and requested data
-        result = MatrixList()
-        if len(data) > 0:
-            result.headers = self.asyncResult[data[0]].headers
-
-        for d in data:
-            if d not in list(self.asyncResult.keys()):
-                raise Exception(
-                    "At least one data ({0}) has not been successfully computed by the alignment".
-                    format(repr(d)))
-            result.extend(self.asyncResult[d])
-
-        # check the number of computed alignment
-        if len(result) != len(data):
-            raise Exception(
-                "There are not the same number of alignment ({0}) than the number of data ({1})".
-                format(len(result), len(data)))
+        result = self.__createDataAlignment(data).execute()
 
         self._logger.debug("Alignment of {0} data took {1}s with {2} threads.".
-                           format(len(data), end - start, self.nbThread))
+                           format(len(data), time.time() - start, self.nbThread))
         return result
 
+    @typeCheck(list)
+    def executeColumnar(self, data):
+        """Execute the parallel alignment on the specified list of data
+        and returns it organized per field.
+
+        :param data: the list of data that will be aligned
+        :type data: a :class:`list` of data to align
+        :rtype: :class:`netzob.Common.Utils.ColumnarMatrixList.ColumnarMatrixList`
+        """
+        return self.__createDataAlignment(data).executeColumnar()
+
+    def __createDataAlignment(self, data):
+        return DataAlignment(
+            data,
+            self.field,
+            depth=self.depth,
+            encoded=self.encoded,
+            parallelAlignment=self)
+
+    def parseData(self, data):
+        """Parse each data with the leaf fields of the root of the field
+        and yield, in the order of the data, the list of bitarrays assigned to the
+        fields (see :meth:`DataAlignment.parseData`).
+
+        :param data: the data to parse
+        :type data: a :class:`list` of :class:`bytes`
+        :return: an iterator over the parsed data
+        :rtype: a generator of :class:`list` of :class:`bitarray.bitarray`
+        """
+        data = list(data)
+        if len(data) == 0:
+            return
+
+        chunkSize = self.chunkSize
+        if chunkSize is None:
+            # a few chunks per worker balance the load without too many exchanges
+            chunkSize = int(math.ceil(len(data) / (self.nbThread * 4)))
+        chunks = [
+            data[i:i + chunkSize] for i in range(0, len(data), chunkSize)
+        ]
+
+        pool = self.__getPool()
+        for (chunk, chunkResult) in zip(chunks,
+                                        pool.imap(_parseChunk, chunks)):
+            for (d, sizes) in zip(chunk, chunkResult):
+                # only sizes are sent back by workers, values are sliced from the data
+                bitArrayData = TypeConverter.convert(d, Raw, BitArray)
+                alignedMsg = []
+                offset = 0
+                for size in sizes:
+                    alignedMsg.append(bitArrayData[offset:offset + size])
+                    offset += size
+                yield alignedMsg
+
+    def __getPool(self):
+        """Returns the pool of processes, it is (re)started if the
+        format definition changed since its creation."""
+
+        root = self.field
+        while root.hasParent():
+            root = root.parent
+
+        signature = (self.nbThread, id(root), tuple(
+            AlignmentCache._fieldSignature(leafField)
+            for leafField in root.getLeafFields(depth=self.depth)))
+
+        if self.__pool is None or signature != self.__poolSignature:
+            self.close()
+            self._logger.debug("Starting a pool of {0} processes".format(
+                self.nbThread))
+            self.__pool = multiprocessing.Pool(
+                self.nbThread,
+                initializer=_initializeWorker,
+                initargs=(root, self.depth))
+            self.__poolSignature = signature
+
+        return self.__pool
+
     # Static method
     @staticmethod
     def align(data,
@@ -221,7 +302,8 @@ class ParallelDataAlignment(object):
               depth=None,
               nbThread=None,
               encoded=False,
-              styled=False):
+              styled=False,
+              transposed=False):
         """Execute an alignment of specified data with provided field.
         The alignment will be perfomed in parallel
         Data must be provided as a list of hexastring.
@@ -238,13 +320,17 @@ class ParallelDataAlignment(object):
         :type encoded: :class:`bool`
         :keyword styled: indicated if the result visualization filter should be applied
         :type styled: :class:`bool`
+        :keyword transposed: set to True if you want the result to be organized per field
+        :type transposed: :class:`bool`
 
         :return: the aligned data
-        :rtype: :class:`netzob.Common.Utils.MatrixList.MatrixList`
+        :rtype: :class:`netzob.Common.Utils.MatrixList.MatrixList` (or :class:`netzob.Common.Utils.ColumnarMatrixList.ColumnarMatrixList` if transposed)
         """
-        pAlignment = ParallelDataAlignment(field, depth, nbThread, encoded,
-                                           styled)
-        return pAlignment.execute(data)
+        with ParallelDataAlignment(field, depth, nbThread, encoded,
+                                   styled) as pAlignment:
+            if transposed:
+                return pAlignment.executeColumnar(list(data))
+            return pAlignment.execute(list(data))
 
     # Properties
 
@@ -302,9 +388,9 @@ class ParallelDataAlignment(object):
         if nbThread is None:
             nbThread = multiprocessing.cpu_count()
 
-        if nbThread < 0:
+        if nbThread < 1:
             raise ValueError(
-                "NbThread cannot be <0, use None to specify you don't know.")
+                "NbThread cannot be <1, use None to specify you don't know.")
 
         self.__nbThread = nbThread
 
@@ -339,3 +425,22 @@ class ParallelDataAlignment(object):
             raise ValueError("Styled cannot be None")
 
         self.__styled = styled
+
+    @property
+    def chunkSize(self):
+        """The number of data sent at once to a worker process.
+
+        If set to None, data are split in about four chunks per worker.
+
+        :type: :class:`int`
+        """
+        return self.__chunkSize
+
+    @chunkSize.setter
+    @typeCheck(int)
+    def chunkSize(self, chunkSize):
+        if chunkSize is not None and chunkSize < 1:
+            raise ValueError(
+                "ChunkSize cannot be <1, use None to specify automatic chunks")
+
+        self.__chunkSize = chunkSize
@@ -166,21 +166,23 @@ def typeCheck(*types):
 
     """
 
+    # positions of the "SELF" types, computed once per decorated function
+    selfIndexes = [i for i, type in enumerate(types) if type == "SELF"]
+
     def _typeCheck_(func):
         def wrapped_f(*args, **kwargs):
             arguments = args[1:]
             if len(arguments) == len(types):
                 # Replace "SELF" with args[0] type
-                final_types = []
-                for type in types:
-                    if type == "SELF":
-                        final_types.append(args[0].__class__)
-                    else:
-                        final_types.append(type)
-
-                for i, argument in enumerate(arguments):
+                final_types = types
+                if len(selfIndexes) > 0:
+                    final_types = list(types)
+                    for i in selfIndexes:
+                        final_types[i] = args[0].__class__
+
+                for (argument, final_type) in zip(arguments, final_types):
                     if argument is not None and not isinstance(argument,
-                                                               final_types[i]):
+                                                               final_type):
                         raise TypeError(
                             "Invalid type for arguments, expecting: {0} and received {1}".
                             format(', '.join([t.__name__ for t in final_types
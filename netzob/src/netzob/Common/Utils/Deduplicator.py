@@ -0,0 +1,210 @@
+#-*- coding: utf-8 -*-
+
+#+---------------------------------------------------------------------------+
+#|          01001110 01100101 01110100 01111010 01101111 01100010            |
+#|                                                                           |
+#|               Netzob : Inferring communication protocols                  |
+#+---------------------------------------------------------------------------+
+#| Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+#| This program is free software: you can redistribute it and/or modify      |
+#| it under the terms of the GNU General Public License as published by      |
+#| the Free Software Foundation, either version 3 of the License, or         |
+#| (at your option) any later version.                                       |
+#|                                                                           |
+#| This program is distributed in the hope that it will be useful,           |
+#| but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+#| MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+#| GNU General Public License for more details.                              |
+#|                                                                           |
+#| You should have received a copy of the GNU General Public License         |
+#| along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+#+---------------------------------------------------------------------------+
+#| @url      : http://www.netzob.org                                         |
+#| @contact  : contact@netzob.org                                            |
+#| @sponsors : Amossys, http://www.amossys.fr                                |
+#|             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| File contributors :                                                       |
+#|       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+#|       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Standard library imports                                                  |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Related third party imports                                               |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Local application imports                                                 |
+#+---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import NetzobLogger
+
+
+@NetzobLogger
+class Deduplicator(object):
+    """This class indexes a list of values by their content so that
+    identical values are only processed once.
+
+    Distinct values are kept in the order of their first occurrence.
+    For each value, the index of its distinct value is stored, as well as
+    the multiplicity of each distinct value. The results computed on
+    distinct values can then be expanded back to all the values.
+
+    >>> from netzob.Common.Utils.Deduplicator import Deduplicator
+    >>> dedup = Deduplicator([b"poll", b"ack", b"poll", b"data", b"poll"])
+    >>> print(len(dedup), dedup.nbUniqueValues)
+    5 3
+    >>> print(dedup.uniqueValues)
+    [b'poll', b'ack', b'data']
+    >>> print(dedup.indexes)
+    [0, 1, 0, 2, 0]
+    >>> print(dedup.counts)
+    [3, 1, 1]
+    >>> print(dedup.groups)
+    [[0, 2, 4], [1], [3]]
+    >>> print(dedup.expand([len(v) for v in dedup.uniqueValues]))
+    [4, 3, 4, 4, 4]
+
+    Results can also be expanded while they are computed, a distinct value
+    is only requested when it is first needed
+
+    >>> def compute(values):
+    ...     for v in values:
+    ...         print("compute {}".format(v))
+    ...         yield v.upper()
+    >>> for result in dedup.iterExpand(compute(dedup.uniqueValues)):
+    ...     print(result)
+    compute b'poll'
+    b'POLL'
+    compute b'ack'
+    b'ACK'
+    b'POLL'
+    compute b'data'
+    b'DATA'
+    b'POLL'
+
+    A key function can be used to deduplicate values that are not hashable
+    or that must be compared on one of their attributes
+
+    >>> from netzob.all import *
+    >>> messages = [RawMessage(b"poll"), RawMessage(b"ack"), RawMessage(b"poll")]
+    >>> dedup = Deduplicator(messages, key=lambda m: m.data)
+    >>> print([m.data for m in dedup.uniqueValues])
+    [b'poll', b'ack']
+    >>> print([[m.data for m in group] for group in dedup.getGroupsValues()])
+    [[b'poll', b'poll'], [b'ack']]
+
+    """
+
+    def __init__(self, values, key=None):
+        """Constructor.
+
+        :param values: the values to deduplicate
+        :type values: an iterable
+        :keyword key: a function returning the hashable content of a value (the value itself by default)
+        :type key: a callable
+        """
+        self.__values = list(values)
+        self.__uniqueValues = []
+        self.__indexes = []
+        self.__groups = []
+
+        positions = dict()
+        for iValue, value in enumerate(self.__values):
+            content = key(value) if key is not None else value
+            index = positions.get(content)
+            if index is None:
+                index = len(self.__uniqueValues)
+                positions[content] = index
+                self.__uniqueValues.append(value)
+                self.__groups.append([])
+            self.__indexes.append(index)
+            self.__groups[index].append(iValue)
+
+    def expand(self, uniqueResults):
+        """Returns, for each value, the result computed on its distinct value.
+
+        :param uniqueResults: a result per distinct value
+        :type uniqueResults: an iterable
+        :rtype: a :class:`list`
+        """
+        uniqueResults = list(uniqueResults)
+        if len(uniqueResults) != len(self.__uniqueValues):
+            raise ValueError(
+                "A result must be provided for each distinct value")
+        return [uniqueResults[index] for index in self.__indexes]
+
+    def iterExpand(self, uniqueResults):
+        """Yields, for each value, the result computed on its distinct value.
+        Results are consumed lazily, in the order of the distinct values.
+
+        :param uniqueResults: a result per distinct value
+        :type uniqueResults: an iterable
+        :rtype: a generator
+        """
+        uniqueResults = iter(uniqueResults)
+        results = []
+        for index in self.__indexes:
+            if index == len(results):
+                try:
+                    results.append(next(uniqueResults))
+                except StopIteration:
+                    raise ValueError(
+                        "A result must be provided for each distinct value")
+            yield results[index]
+
+    def getGroupsValues(self):
+        """Returns, for each distinct value, the list of values equal to it.
+
+        :rtype: a :class:`list` of :class:`list`
+        """
+        return [[self.__values[iValue] for iValue in group]
+                for group in self.__groups]
+
+    def __len__(self):
+        return len(self.__values)
+
+    @property
+    def uniqueValues(self):
+        """The distinct values, in the order of their first occurrence.
+
+        :type: :class:`list`
+        """
+        return self.__uniqueValues
+
+    @property
+    def nbUniqueValues(self):
+        """The number of distinct values.
+
+        :type: :class:`int`
+        """
+        return len(self.__uniqueValues)
+
+    @property
+    def indexes(self):
+        """For each value, the index of its distinct value.
+
+        :type: a :class:`list` of :class:`int`
+        """
+        return self.__indexes
+
+    @property
+    def counts(self):
+        """The multiplicity of each distinct value.
+
+        :type: a :class:`list` of :class:`int`
+        """
+        return [len(group) for group in self.__groups]
+
+    @property
+    def groups(self):
+        """For each distinct value, the positions of the values equal to it.
+
+        :type: a :class:`list` of :class:`list` of :class:`int`
+        """
+        return self.__groups
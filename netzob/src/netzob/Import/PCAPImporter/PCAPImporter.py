@@ -29,12 +29,19 @@
 #| Standard library imports
 #+---------------------------------------------------------------------------+
 import errno
+import struct
 from gettext import gettext as _
 
 #+---------------------------------------------------------------------------+
 #| Related third party imports
 #+---------------------------------------------------------------------------+
-import pcapy
+import numpy
+
+# pcapy is only required to apply BPF filters
+try:
+    import pcapy
+except ImportError:
+    pcapy = None
 
 ## FIXME: Temporary deactivate this module as it is not currently supported in Python3
 # import impacket.ImpactDecoder as Decoders
@@ -56,6 +63,8 @@ from netzob.Model.Vocabulary.Messages.AbstractMessage import AbstractMessage
 from netzob.Model.Vocabulary.Messages.L2NetworkMessage import L2NetworkMessage
 from netzob.Model.Vocabulary.Messages.L3NetworkMessage import L3NetworkMessage
 from netzob.Model.Vocabulary.Messages.L4NetworkMessage import L4NetworkMessage
+from netzob.Import.PCAPImporter.PCAPReader import PCAPReader
+from netzob.Import.PCAPImporter.TCPReassembler import TCPReassembler
 
 
 @NetzobLogger
@@ -65,6 +74,10 @@ class PCAPImporter(object):
     - PCAPImporter.readFiles(...)
     - PCAPimporter.readFile(...)
     refer to their documentation to have an overview of the required parameters.
+    To import large captures, PCAPImporter.iterFiles(...) and PCAPImporter.iterFile(...)
+    produce the messages one after the other instead of loading all of them.
+    Files (pcap or pcapng) are read with a :class:`PCAPReader`, pcapy (libpcap)
+    is only used when a BPF filter is specified.
 
     >>> from netzob.all import *
     >>> messages = PCAPImporter.readFile("./test/resources/pcaps/test_import_udp.pcap").values()
@@ -121,6 +134,12 @@ class PCAPImporter(object):
     2
     >>> print(len(messages[1].data))
     3224
+
+    Parameter `reassembleTCPStreams` reassembles the payloads of the TCP segments of each connection (see :class:`TCPReassembler`): segments are ordered following their sequence numbers, retransmitted data is dropped and a message is produced for each write of the application. It only applies to messages imported at layer 5.
+
+    >>> messages = PCAPImporter.readFile("./test/resources/pcaps/test_import_http_flow.pcap", reassembleTCPStreams=True).values()
+    >>> print([len(message.data) for message in messages])
+    [410, 3224]
     """
 
     INVALID_BPF_FILTER = 0
@@ -130,32 +149,201 @@ class PCAPImporter(object):
 
     PROTOCOL201 = 201
 
-    # Supported datalinks (by pcapy)
+    # Datalinks (values used by libpcap)
+    DLT_NULL = 0
+    DLT_EN10MB = 1
+    DLT_IEEE802 = 6
+    DLT_ARCNET = 7
+    DLT_SLIP = 8
+    DLT_PPP = 9
+    DLT_FDDI = 10
+    DLT_ATM_RFC1483 = 11
+    DLT_RAW = 12
+    DLT_PPP_SERIAL = 50
+    DLT_PPP_ETHER = 51
+    DLT_C_HDLC = 104
+    DLT_IEEE802_11 = 105
+    DLT_LOOP = 108
+    DLT_LINUX_SLL = 113
+    DLT_LTALK = 114
+
+    # Supported datalinks
     SUPPORTED_DATALINKS = {
-        pcapy.DLT_ARCNET: "DLT_ARCNET",
-        pcapy.DLT_FDDI: "DLT_FDDI",
-        pcapy.DLT_LOOP: "DLT_LOOP",
-        pcapy.DLT_PPP_ETHER: "DLT_PPP_ETHER",
-        pcapy.DLT_ATM_RFC1483: "DLT_ATM_RFC1483",
-        pcapy.DLT_IEEE802: "DLT_IEEE802",
-        pcapy.DLT_LTALK: "DLT_LTALK",
-        pcapy.DLT_PPP_SERIAL: "DLT_PPP_SERIAL",
-        pcapy.DLT_C_HDLC: "DLT_C_HDLC",
-        pcapy.DLT_IEEE802_11: "IEEE802_11",
-        pcapy.DLT_NULL: "DLT_NULL",
-        pcapy.DLT_RAW: "DLT_RAW",
-        pcapy.DLT_EN10MB: "DLT_EN10MB",
-        pcapy.DLT_LINUX_SLL: "LINUX_SLL",
-        pcapy.DLT_PPP: "DLT_PPP",
-        pcapy.DLT_SLIP: "DLT_SLIP",
+        DLT_ARCNET: "DLT_ARCNET",
+        DLT_FDDI: "DLT_FDDI",
+        DLT_LOOP: "DLT_LOOP",
+        DLT_PPP_ETHER: "DLT_PPP_ETHER",
+        DLT_ATM_RFC1483: "DLT_ATM_RFC1483",
+        DLT_IEEE802: "DLT_IEEE802",
+        DLT_LTALK: "DLT_LTALK",
+        DLT_PPP_SERIAL: "DLT_PPP_SERIAL",
+        DLT_C_HDLC: "DLT_C_HDLC",
+        DLT_IEEE802_11: "IEEE802_11",
+        DLT_NULL: "DLT_NULL",
+        DLT_RAW: "DLT_RAW",
+        DLT_EN10MB: "DLT_EN10MB",
+        DLT_LINUX_SLL: "LINUX_SLL",
+        DLT_PPP: "DLT_PPP",
+        DLT_SLIP: "DLT_SLIP",
     }
 
+    # Datalinks whose layer 2 can be decoded
+    DECODED_DATALINKS = [DLT_EN10MB, DLT_LINUX_SLL, PROTOCOL201]
+
     def __init__(self):
         pass
 
-    @typeCheck(str, str, int)
-    def __readMessagesFromFile(self, filePath, bpfFilter, nbPackets):
-        """Internal methods to read all messages from a given PCAP file."""
+    def __checkDatalink(self, datalink, importLayer):
+        """Internal method that verifies the layer 2 of the packets can be decoded."""
+        if importLayer > 1 and datalink not in PCAPImporter.DECODED_DATALINKS:
+            errorMessage = _("This pcap cannot be imported since the " +
+                             "layer 2 is not supported ({0})").format(
+                                 str(datalink))
+            raise NetzobImportException("PCAP", errorMessage,
+                                        self.INVALID_LAYER2)
+
+    @typeCheck(str, int, int, TCPReassembler)
+    def __iterMessagesWithReader(self, filePath, nbPackets, importLayer,
+                                 reassembler):
+        """Internal methods to read the messages of a given PCAP (or PCAPNG) file
+        without libpcap. Packets are read and decoded by batches."""
+        with PCAPReader(filePath) as reader:
+            self.datalink = reader.datalink
+            if self.datalink is not None:
+                self.__checkDatalink(self.datalink, importLayer)
+
+            for (timestamps, offsets, lengths,
+                 datalinks) in reader.iterPacketBatches(nbPackets=nbPackets):
+                for datalink in numpy.unique(datalinks).tolist():
+                    self.__checkDatalink(datalink, importLayer)
+                for message in self.__decodePackets(
+                        reader, timestamps, offsets, lengths, datalinks,
+                        importLayer, reassembler):
+                    yield message
+
+    def __decodePackets(self, reader, timestamps, offsets, lengths,
+                        datalinks, importLayer, reassembler):
+        """Internal method that builds the messages of a batch of packets
+        read with a :class:`PCAPReader`. Headers of all the packets are
+        decoded at once, only the creation of the messages is done packet per packet."""
+
+        layers = reader.decodePackets(offsets, lengths, datalinks)
+        ends = offsets + lengths
+        l3Start = layers["l3Start"]
+        l3End = layers["l3End"]
+        l4Start = layers["l4Start"]
+
+        if importLayer <= 2:
+            keep = ends > layers["l2Start"]
+            (starts, stops) = (offsets, ends)
+        else:
+            keep = layers["ip"]
+            nbUnsupported = len(keep) - numpy.count_nonzero(keep)
+            if nbUnsupported > 0:
+                self._logger.warn(
+                    "Cannot import {0} packets since their layer 3 is unsupported (Only IP is currently supported)".
+                    format(nbUnsupported))
+
+            if importLayer == 3:
+                keep = keep & (l3End > l3Start)
+                (starts, stops) = (layers["l2Start"], ends)
+            else:
+                ipProtocol = layers["ipProtocol"]
+                isL4 = (ipProtocol == PCAPReader.IP_PROTOCOL_TCP) | (
+                    ipProtocol == PCAPReader.IP_PROTOCOL_UDP)
+                nbUnsupported = numpy.count_nonzero(keep & ~isL4)
+                if nbUnsupported > 0:
+                    self._logger.warn(
+                        "Cannot import {0} packets since their layer 4 is unsupported (Only UDP and TCP are currently supported)".
+                        format(nbUnsupported))
+                hasPayload = l3End > l4Start
+                if reassembler is not None:
+                    # segments without payload open or close the TCP connections
+                    hasPayload |= (ipProtocol == PCAPReader.IP_PROTOCOL_TCP) & (
+                        (layers["tcpFlags"] & (TCPReassembler.SYN | TCPReassembler.FIN | TCPReassembler.RST)) != 0)
+                keep = keep & isL4 & hasPayload
+                if importLayer == 4:
+                    (starts, stops) = (l3Start, l3End)
+                else:
+                    (starts, stops) = (l4Start, l3End)
+
+        indexes = numpy.flatnonzero(keep)
+        columns = [
+            timestamps, offsets, datalinks, starts, stops, layers["macSrc"],
+            layers["macDst"], layers["ipSrc"], layers["ipDst"],
+            layers["ipProtocol"], layers["srcPort"], layers["dstPort"],
+            layers["tcpSequence"], layers["tcpFlags"]
+        ]
+
+        # addresses are often repeated, their representations are cached
+        macAddresses = dict()
+        ipAddresses = dict()
+
+        for (epoch, offset, datalink, start, stop, macSrc, macDst, ipSrc, ipDst,
+             ipProtocol, srcPort, dstPort, tcpSequence, tcpFlags) in zip(
+                 *[column[indexes].tolist() for column in columns]):
+
+            data = reader.getBytes(start, stop)
+
+            if datalink == PCAPImporter.DLT_EN10MB:
+                l2Proto = "Ethernet"
+                for macAddress in (macSrc, macDst):
+                    if macAddress not in macAddresses:
+                        macAddresses[macAddress] = PCAPReader.formatMacAddress(
+                            macAddress)
+                l2SrcAddr = macAddresses[macSrc]
+                l2DstAddr = macAddresses[macDst]
+            elif datalink == PCAPImporter.DLT_LINUX_SLL:
+                l2Proto = "Linux SLL"
+                l2SrcAddr = reader.getBytes(offset + 6, offset + 14)
+                l2DstAddr = None
+            elif datalink == PCAPImporter.PROTOCOL201:
+                l2Proto = "Protocol 201"
+                if reader.getBytes(offset + 3, offset + 4) == b"\x01":
+                    l2SrcAddr = "Received"
+                else:
+                    l2SrcAddr = "Sent"
+                l2DstAddr = None
+            else:
+                l2Proto = PCAPImporter.SUPPORTED_DATALINKS.get(datalink)
+                l2SrcAddr = None
+                l2DstAddr = None
+
+            if importLayer <= 2:
+                yield L2NetworkMessage(data, epoch, l2Proto, l2SrcAddr,
+                                       l2DstAddr)
+                continue
+
+            for ipAddress in (ipSrc, ipDst):
+                if ipAddress not in ipAddresses:
+                    ipAddresses[ipAddress] = PCAPReader.formatIPAddress(
+                        ipAddress)
+            l3SrcAddr = ipAddresses[ipSrc]
+            l3DstAddr = ipAddresses[ipDst]
+
+            if importLayer == 3:
+                yield L3NetworkMessage(data, epoch, l2Proto, l2SrcAddr,
+                                       l2DstAddr, "IP", l3SrcAddr, l3DstAddr)
+                continue
+
+            if ipProtocol == PCAPReader.IP_PROTOCOL_TCP:
+                l4Proto = "TCP"
+            else:
+                l4Proto = "UDP"
+            message = L4NetworkMessage(data, epoch, l2Proto, l2SrcAddr,
+                                       l2DstAddr, "IP", l3SrcAddr, l3DstAddr,
+                                       l4Proto, srcPort, dstPort)
+            if reassembler is not None and l4Proto == "TCP":
+                for message in reassembler.addSegment(
+                        message, tcpSequence, tcpFlags):
+                    yield message
+            else:
+                yield message
+
+    @typeCheck(str, str, int, int, TCPReassembler)
+    def __iterMessagesFromFile(self, filePath, bpfFilter, nbPackets,
+                               importLayer, reassembler):
+        """Internal methods to read, one after the other, the messages of a given PCAP file."""
         if (filePath is None):
             raise TypeError("filePath cannot be None")
         if (nbPackets < 0):
@@ -189,21 +377,29 @@ class PCAPImporter(object):
         if self.datalink not in list(PCAPImporter.SUPPORTED_DATALINKS.keys()):
             self._logger.debug("Unkown datalinks")
 
-        if self.importLayer > 1 and self.datalink != pcapy.DLT_EN10MB and self.datalink != pcapy.DLT_LINUX_SLL and self.datalink != PCAPImporter.PROTOCOL201:
-            errorMessage = _("This pcap cannot be imported since the " +
-                             "layer 2 is not supported ({0})").format(
-                                 str(self.datalink))
-            raise NetzobImportException("PCAP", errorMessage,
-                                        self.INVALID_LAYER2)
-        else:
-            packetReader.loop(nbPackets, self.__packetHandler)
-
-    def __packetHandler(self, header, payload):
-        """Internal callback executed on each packet when parsing the pcap"""
+        self.__checkDatalink(self.datalink, importLayer)
+
+        # Packets are read one at a time, only the current one is kept in memory
+        nbReadPackets = 0
+        while nbPackets == 0 or nbReadPackets < nbPackets:
+            (header, payload) = packetReader.next()
+            if header is None:
+                break
+            nbReadPackets += 1
+
+            for message in self.__decodePacket(header, payload, importLayer,
+                                               reassembler):
+                yield message
+
+    def __decodePacket(self, header, payload, importLayer, reassembler):
+        """Internal method executed on each packet when parsing the pcap,
+        it returns the messages built from the packet (none if the
+        packet cannot be imported, several if it completes reassembled
+        TCP messages)."""
         (secs, usecs) = header.getts()
         epoch = secs + (usecs / 1000000.0)
 
-        if self.importLayer == 1 or self.importLayer == 2:
+        if importLayer == 1 or importLayer == 2:
             try:
                 (l2Proto, l2SrcAddr, l2DstAddr, l2Payload,
                  etherType) = self.__decodeLayer2(header, payload)
@@ -211,17 +407,17 @@ class PCAPImporter(object):
                 self._logger.warn(
                     "An error occured while decoding layer2 of a packet: {0}".
                     format(e))
-                return
+                return []
             if len(l2Payload) == 0:
-                return
+                return []
 
             # Build the L2NetworkMessage
             l2Message = L2NetworkMessage(payload, epoch, l2Proto, l2SrcAddr,
                                          l2DstAddr)
 
-            self.messages.add(l2Message)
+            return [l2Message]
 
-        elif self.importLayer == 3:
+        elif importLayer == 3:
             try:
                 (l2Proto, l2SrcAddr, l2DstAddr, l2Payload,
                  etherType) = self.__decodeLayer2(header, payload)
@@ -231,18 +427,18 @@ class PCAPImporter(object):
                 self._logger.warn(
                     "An error occured while decoding layer2 and layer3 of a packet: {0}".
                     format(e))
-                return
+                return []
 
             if len(l3Payload) == 0:
-                return
+                return []
 
             # Build the L3NetworkMessage
             l3Message = L3NetworkMessage(l2Payload, epoch, l2Proto, l2SrcAddr,
                                          l2DstAddr, l3Proto, l3SrcAddr,
                                          l3DstAddr)
-            self.messages.add(l3Message)
+            return [l3Message]
 
-        elif self.importLayer == 4:
+        elif importLayer == 4:
             try:
                 (l2Proto, l2SrcAddr, l2DstAddr, l2Payload,
                  etherType) = self.__decodeLayer2(header, payload)
@@ -254,16 +450,16 @@ class PCAPImporter(object):
                 self._logger.warn(
                     "An error occured while decoding layer2, layer3 or layer4 of a packet: {0}".
                     format(e))
-                return
+                return []
             if len(l4Payload) == 0:
-                return
+                return []
 
             # Build the L4NetworkMessage
             l4Message = L4NetworkMessage(
                 l3Payload, epoch, l2Proto, l2SrcAddr, l2DstAddr, l3Proto,
                 l3SrcAddr, l3DstAddr, l4Proto, l4SrcPort, l4DstPort)
 
-            self.messages.add(l4Message)
+            return [l4Message]
 
         else:
             try:
@@ -277,15 +473,25 @@ class PCAPImporter(object):
                 self._logger.warn(
                     "An error occured while decoding layer2, layer3, layer4 or layer5 of a packet: {0}".
                     format(e))
-                return
+                return []
+
+            if reassembler is not None and l4Proto == "TCP":
+                (tcpSequence, tcpFlags) = struct.unpack("!I5xB",
+                                                        l3Payload[4:14])
+                l5Message = L4NetworkMessage(
+                    l4Payload, epoch, l2Proto, l2SrcAddr, l2DstAddr, l3Proto,
+                    l3SrcAddr, l3DstAddr, l4Proto, l4SrcPort, l4DstPort)
+                return reassembler.addSegment(l5Message, tcpSequence,
+                                                     tcpFlags)
+
             if len(l4Payload) == 0:
-                return
+                return []
 
             l5Message = L4NetworkMessage(
                 l4Payload, epoch, l2Proto, l2SrcAddr, l2DstAddr, l3Proto,
                 l3SrcAddr, l3DstAddr, l4Proto, l4SrcPort, l4DstPort)
-            
-            self.messages.add(l5Message)
+
+            return [l5Message]
 
     def __decodeLayer2(self, header, payload):
         """Internal method that parses the specified header and extracts
@@ -295,7 +501,7 @@ class PCAPImporter(object):
             return ":".join("{0:0>2}".format(hex(b)[2:])
                             for b in arrayMac.tolist())
 
-        if self.datalink == pcapy.DLT_EN10MB:
+        if self.datalink == PCAPImporter.DLT_EN10MB:
             l2Decoder = Decoders.EthDecoder()
             l2Proto = "Ethernet"
             layer2 = l2Decoder.decode(payload)
@@ -303,7 +509,7 @@ class PCAPImporter(object):
             l2DstAddr = formatMacAddress(layer2.get_ether_dhost())
             l2Payload = payload[layer2.get_header_size():]
             etherType = layer2.get_ether_type()
-        elif self.datalink == pcapy.DLT_LINUX_SLL:
+        elif self.datalink == PCAPImporter.DLT_LINUX_SLL:
             l2Decoder = Decoders.LinuxSLLDecoder()
             l2Proto = "Linux SLL"
             layer2 = l2Decoder.decode(payload)
@@ -379,13 +585,14 @@ class PCAPImporter(object):
             raise NetzobImportException("PCAP", warnMessage,
                                         self.INVALID_LAYER4)
 
-    @typeCheck(list, str, int, int, bool)
+    @typeCheck(list, str, int, int, bool, bool)
     def readMessages(self,
                      filePathList,
                      bpfFilter="",
                      importLayer=5,
                      nbPackets=0,
                      mergePacketsInFlow=False,
+                     reassembleTCPStreams=False,
                     ):
         """Read all messages from a list of PCAP files. A BPF filter
         can be set to limit the captured packets. The layer of import
@@ -406,10 +613,79 @@ class PCAPImporter(object):
         :type nbPackets: :class:`int`
         :param mergePacketsInFlow: if True, consecutive packets with same source and destination ar merged (i.e. to mimic a flow) 
         :type mergePacketsInFlow: :class:`bool`
+        :param reassembleTCPStreams: if True, the payloads of the TCP segments are reassembled in a message per application write (only at layer 5)
+        :type reassembleTCPStreams: :class:`bool`
         :return: a list of captured messages
         :rtype: a list of :class:`netzob.Model.Vocabulary.Messages.AbstractMessage`
         """
 
+        # Call the method that does the import job for each PCAP file
+        self.messages = SortedTypedList(AbstractMessage)
+        for message in self.iterMessages(filePathList, bpfFilter,
+                                         importLayer, nbPackets,
+                                         reassembleTCPStreams=reassembleTCPStreams):
+            self.messages.add(message)
+
+        # if requested, we merge consecutive messages that share same source and destination
+        if mergePacketsInFlow:
+            mergedMessages = SortedTypedList(AbstractMessage)
+            for message in PCAPImporter._mergeFlows(self.messages.values()):
+                mergedMessages.add(message)
+            self.messages = mergedMessages
+
+        return self.messages
+
+    @typeCheck(list, str, int, int, bool, bool)
+    def iterMessages(self,
+                     filePathList,
+                     bpfFilter="",
+                     importLayer=5,
+                     nbPackets=0,
+                     mergePacketsInFlow=False,
+                     reassembleTCPStreams=False):
+        """Returns an iterator over the messages of a list of PCAP
+        files. Contrary to :meth:`readMessages`, messages are not
+        stored (nor sorted): packets are read one at a time and the
+        corresponding messages are produced following their order in the
+        files, so that huge captures can be imported with a bounded
+        memory. Parameters are the same as the ones of
+        :meth:`readMessages`.
+
+        >>> from netzob.all import *
+        >>> messages = PCAPImporter().iterMessages(["./test/resources/pcaps/test_import_udp.pcap"])
+        >>> print(repr(next(messages).data))
+        b'CMDidentify#\\x07\\x00\\x00\\x00Roberto'
+        >>> print(len(list(messages)))
+        13
+
+        >>> messages = PCAPImporter.iterFile("./test/resources/pcaps/test_import_http_flow.pcap", mergePacketsInFlow=True)
+        >>> print([len(message.data) for message in messages])
+        [410, 3224]
+
+        Iterators of the same importer are independent.
+
+        >>> importer = PCAPImporter()
+        >>> l5Messages = importer.iterMessages(["./test/resources/pcaps/test_import_udp.pcap"], importLayer=5)
+        >>> l2Messages = importer.iterMessages(["./test/resources/pcaps/test_import_udp.pcap"], importLayer=2)
+        >>> print(type(next(l5Messages)).__name__, type(next(l2Messages)).__name__)
+        L4NetworkMessage L2NetworkMessage
+
+        :param filePathList: the pcap files to read
+        :type filePathList: a list of :class:`str`
+        :param bpfFilter: a string representing a BPF filter.
+        :type bpfFilter: :class:`str`
+        :param importLayer: an integer representing the protocol layer to start importing.
+        :type importLayer: :class:`int`
+        :param nbPackets: the number of packets to import (per file)
+        :type nbPackets: :class:`int`
+        :param mergePacketsInFlow: if True, consecutive packets with same source and destination ar merged (i.e. to mimic a flow)
+        :type mergePacketsInFlow: :class:`bool`
+        :param reassembleTCPStreams: if True, the payloads of the TCP segments are reassembled in a message per application write (only at layer 5)
+        :type reassembleTCPStreams: :class:`bool`
+        :return: an iterator over the captured messages
+        :rtype: a generator of :class:`netzob.Model.Vocabulary.Messages.AbstractMessage`
+        """
+
         # Verify the existence of input files
         errorMessageList = []
         for filePath in filePathList:
@@ -436,28 +712,62 @@ class PCAPImporter(object):
                 "Only layers level {0} are available.".format(availableLayers))
         self.importLayer = importLayer
 
-        # Call the method that does the import job for each PCAP file
-        self.messages = SortedTypedList(AbstractMessage)
-        for filePath in filePathList:
-            self.__readMessagesFromFile(filePath, bpfFilter, nbPackets)
-        
-        # if requested, we merge consecutive messages that share same source and destination
+        if bpfFilter != "" and pcapy is None:
+            raise NetzobImportException(
+                "PCAP", "Module pcapy is required to apply a BPF filter.")
+
+        # each iterator has its own reassembler, so that iterators of the
+        # same importer are independent
+        if reassembleTCPStreams and importLayer == 5:
+            reassembler = TCPReassembler()
+        else:
+            reassembler = None
+
+        messages = self.__iterMessagesFromFiles(
+            filePathList, bpfFilter, nbPackets, importLayer, reassembler)
         if mergePacketsInFlow:
-            mergedMessages = SortedTypedList(AbstractMessage)
-            previousMessage = None
-            for message in self.messages.values():
-                if previousMessage is not None and message.source == previousMessage.source and message.destination == previousMessage.destination:
-                    previousMessage.data += message.data
-                else:
-                    mergedMessages.add(message)
-                    previousMessage = message
-            self.messages = mergedMessages
-            
-        return self.messages
+            messages = PCAPImporter._mergeFlows(messages)
+        return messages
+
+    def __iterMessagesFromFiles(self, filePathList, bpfFilter, nbPackets,
+                                importLayer, reassembler):
+        """Internal method that reads the PCAP files one after the other.
+        Files are read with a :class:`PCAPReader`, unless a BPF filter
+        must be applied with libpcap."""
+        for filePath in filePathList:
+            if bpfFilter == "":
+                messages = self.__iterMessagesWithReader(
+                    filePath, nbPackets, importLayer, reassembler)
+            else:
+                messages = self.__iterMessagesFromFile(
+                    filePath, bpfFilter, nbPackets, importLayer, reassembler)
+            for message in messages:
+                yield message
+
+        # TCP messages whose reassembly is not finished at the end of the captures
+        if reassembler is not None:
+            for message in reassembler.flush():
+                yield message
+
+    @staticmethod
+    def _mergeFlows(messages):
+        """Merges consecutive messages that share the same source and
+        destination. Messages are consumed (and merged messages are
+        produced) one after the other."""
+        previousMessage = None
+        for message in messages:
+            if previousMessage is not None and message.source == previousMessage.source and message.destination == previousMessage.destination:
+                previousMessage.data += message.data
+            else:
+                if previousMessage is not None:
+                    yield previousMessage
+                previousMessage = message
+        if previousMessage is not None:
+            yield previousMessage
 
     @staticmethod
-    @typeCheck(list, str, int, int, bool)
-    def readFiles(filePathList, bpfFilter="", importLayer=5, nbPackets=0, mergePacketsInFlow=False):
+    @typeCheck(list, str, int, int, bool, bool)
+    def readFiles(filePathList, bpfFilter="", importLayer=5, nbPackets=0, mergePacketsInFlow=False, reassembleTCPStreams=False):
         """Read all messages from a list of PCAP files. A BPF filter
         can be set to limit the captured packets. The layer of import
         can also be specified:
@@ -476,17 +786,19 @@ class PCAPImporter(object):
         :param nbPackets: the number of packets to import
         :type nbPackets: :class:`int`
         :param mergePacketsInFlow: if True, consecutive packets with same source and destination ar merged (i.e. to mimic a flow) 
-        :type mergePacketsInFlow: :class:`bool`        
+        :type mergePacketsInFlow: :class:`bool`
+        :param reassembleTCPStreams: if True, the payloads of the TCP segments are reassembled in a message per application write (only at layer 5)
+        :type reassembleTCPStreams: :class:`bool`
         :return: a list of captured messages
         :rtype: a list of :class:`netzob.Model.Vocabulary.Messages.AbstractMessage`
         """
 
         importer = PCAPImporter()
-        return importer.readMessages(filePathList,bpfFilter, importLayer, nbPackets, mergePacketsInFlow)
+        return importer.readMessages(filePathList,bpfFilter, importLayer, nbPackets, mergePacketsInFlow, reassembleTCPStreams)
 
     @staticmethod
-    @typeCheck(str, str, int, int, bool)
-    def readFile(filePath, bpfFilter="", importLayer=5, nbPackets=0, mergePacketsInFlow=False):
+    @typeCheck(str, str, int, int, bool, bool)
+    def readFile(filePath, bpfFilter="", importLayer=5, nbPackets=0, mergePacketsInFlow=False, reassembleTCPStreams=False):
         """Read all messages from the specified PCAP file. A BPF filter
         can be set to limit the captured packets. The layer of import
         can also be specified:
@@ -506,13 +818,69 @@ class PCAPImporter(object):
         :type nbPackets: :class:`int`
         :param mergePacketsInFlow: if True, consecutive packets with same source and destination ar merged (i.e. to mimic a flow) 
         :type mergePacketsInFlow: :class:`bool`
+        :param reassembleTCPStreams: if True, the payloads of the TCP segments are reassembled in a message per application write (only at layer 5)
+        :type reassembleTCPStreams: :class:`bool`
         :return: a list of captured messages
         :rtype: a list of :class:`netzob.Model.Vocabulary.Messages.AbstractMessage`
         """
 
         importer = PCAPImporter()
         return importer.readFiles([filePath], bpfFilter, importLayer,
-                                  nbPackets, mergePacketsInFlow)
+                                  nbPackets, mergePacketsInFlow,
+                                  reassembleTCPStreams)
+
+    @staticmethod
+    @typeCheck(list, str, int, int, bool, bool)
+    def iterFiles(filePathList, bpfFilter="", importLayer=5, nbPackets=0, mergePacketsInFlow=False, reassembleTCPStreams=False):
+        """Returns an iterator over the messages of a list of PCAP
+        files (see :meth:`iterMessages`).
+
+        :param filePathList: a list of pcap files to read
+        :type filePathList: a list of :class:`str`
+        :param bpfFilter: a string representing a BPF filter.
+        :type bpfFilter: :class:`str`
+        :param importLayer: an integer representing the protocol layer to start importing.
+        :type importLayer: :class:`int`
+        :param nbPackets: the number of packets to import (per file)
+        :type nbPackets: :class:`int`
+        :param mergePacketsInFlow: if True, consecutive packets with same source and destination ar merged (i.e. to mimic a flow)
+        :type mergePacketsInFlow: :class:`bool`
+        :param reassembleTCPStreams: if True, the payloads of the TCP segments are reassembled in a message per application write (only at layer 5)
+        :type reassembleTCPStreams: :class:`bool`
+        :return: an iterator over the captured messages
+        :rtype: a generator of :class:`netzob.Model.Vocabulary.Messages.AbstractMessage`
+        """
+
+        importer = PCAPImporter()
+        return importer.iterMessages(filePathList, bpfFilter, importLayer,
+                                     nbPackets, mergePacketsInFlow,
+                                     reassembleTCPStreams)
+
+    @staticmethod
+    @typeCheck(str, str, int, int, bool, bool)
+    def iterFile(filePath, bpfFilter="", importLayer=5, nbPackets=0, mergePacketsInFlow=False, reassembleTCPStreams=False):
+        """Returns an iterator over the messages of the specified PCAP
+        file (see :meth:`iterMessages`).
+
+        :param filePath: the pcap path
+        :type filePath: :class:`str`
+        :param bpfFilter: a string representing a BPF filter.
+        :type bpfFilter: :class:`str`
+        :param importLayer: an integer representing the protocol layer to start importing.
+        :type importLayer: :class:`int`
+        :param nbPackets: the number of packets to import
+        :type nbPackets: :class:`int`
+        :param mergePacketsInFlow: if True, consecutive packets with same source and destination ar merged (i.e. to mimic a flow)
+        :type mergePacketsInFlow: :class:`bool`
+        :param reassembleTCPStreams: if True, the payloads of the TCP segments are reassembled in a message per application write (only at layer 5)
+        :type reassembleTCPStreams: :class:`bool`
+        :return: an iterator over the captured messages
+        :rtype: a generator of :class:`netzob.Model.Vocabulary.Messages.AbstractMessage`
+        """
+
+        return PCAPImporter.iterFiles([filePath], bpfFilter, importLayer,
+                                      nbPackets, mergePacketsInFlow,
+                                      reassembleTCPStreams)
 
     @staticmethod
     @typeCheck(L2NetworkMessage)
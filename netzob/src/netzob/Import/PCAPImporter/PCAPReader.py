@@ -0,0 +1,442 @@
+# -*- coding: utf-8 -*-
+
+#+---------------------------------------------------------------------------+
+#|          01001110 01100101 01110100 01111010 01101111 01100010            |
+#|                                                                           |
+#|               Netzob : Inferring communication protocols                  |
+#+---------------------------------------------------------------------------+
+#| Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+#| This program is free software: you can redistribute it and/or modify      |
+#| it under the terms of the GNU General Public License as published by      |
+#| the Free Software Foundation, either version 3 of the License, or         |
+#| (at your option) any later version.                                       |
+#|                                                                           |
+#| This program is distributed in the hope that it will be useful,           |
+#| but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+#| MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+#| GNU General Public License for more details.                              |
+#|                                                                           |
+#| You should have received a copy of the GNU General Public License         |
+#| along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+#+---------------------------------------------------------------------------+
+#| @url      : http://www.netzob.org                                         |
+#| @contact  : contact@netzob.org                                            |
+#| @sponsors : Amossys, http://www.amossys.fr                                |
+#|             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Standard library imports
+#+---------------------------------------------------------------------------+
+import mmap
+import struct
+
+#+---------------------------------------------------------------------------+
+#| Related third party imports
+#+---------------------------------------------------------------------------+
+import numpy
+
+#+---------------------------------------------------------------------------+
+#| Local application imports
+#+---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
+from netzob.Common.NetzobException import NetzobImportException
+
+
+@NetzobLogger
+class PCAPReader(object):
+    """Reader of pcap and pcapng files that does not depend on libpcap.
+
+    The file is memory-mapped and its records are read by batches: for
+    each packet of a batch, the reader provides its timestamp, its
+    position and its size in the file and its datalink. The headers of
+    the packets of a batch (Ethernet or Linux cooked capture, IPv4, UDP
+    and TCP) can then be decoded all at once with :meth:`decodePackets`,
+    without copying the packets.
+
+    >>> from netzob.Import.PCAPImporter.PCAPReader import PCAPReader
+    >>> with PCAPReader("./test/resources/pcaps/test_import_udp.pcap") as reader:
+    ...     (timestamps, offsets, lengths, datalinks) = next(reader.iterPacketBatches())
+    ...     print(len(offsets), reader.datalink)
+    ...     print(reader.getBytes(offsets[0] + 42, offsets[0] + lengths[0]))
+    ...     layers = reader.decodePackets(offsets, lengths, datalinks)
+    14 1
+    b'CMDidentify#\\x07\\x00\\x00\\x00Roberto'
+    >>> print(layers["etherType"][0] == 0x800, layers["ipProtocol"][0], layers["srcPort"][0], layers["dstPort"][0])
+    True 17 57831 4242
+    >>> print(PCAPReader.formatIPAddress(layers["ipSrc"][0]))
+    127.0.0.1
+
+    The number of packets to read can be limited
+
+    >>> reader = PCAPReader("./test/resources/pcaps/test_import_http.pcap")
+    >>> print([len(batch[1]) for batch in reader.iterPacketBatches(batchSize=20, nbPackets=50)])
+    [20, 20, 10]
+    >>> reader.close()
+
+    """
+
+    # Magic numbers of the supported formats (read as little endian)
+    PCAP_MAGICS = {
+        0xa1b2c3d4: ('<', False),
+        0xd4c3b2a1: ('>', False),
+        0xa1b23c4d: ('<', True),
+        0x4d3cb2a1: ('>', True),
+    }
+    PCAPNG_MAGIC = 0x0a0d0d0a
+
+    # Types of pcapng blocks
+    BLOCK_SECTION_HEADER = 0x0a0d0d0a
+    BLOCK_INTERFACE_DESCRIPTION = 0x00000001
+    BLOCK_PACKET = 0x00000002
+    BLOCK_SIMPLE_PACKET = 0x00000003
+    BLOCK_ENHANCED_PACKET = 0x00000006
+
+    # Options of the pcapng interface description blocks
+    OPTION_END = 0
+    OPTION_IF_TSRESOL = 9
+    OPTION_IF_TSOFFSET = 14
+
+    # Datalinks decoded by decodePackets and the size of their headers
+    DLT_EN10MB = 1
+    DLT_LINUX_SLL = 113
+    PROTOCOL201 = 201
+    L2_HEADER_SIZES = {DLT_EN10MB: 14, DLT_LINUX_SLL: 16, PROTOCOL201: 8}
+
+    ETHERTYPE_IP = 0x800
+    IP_PROTOCOL_TCP = 6
+    IP_PROTOCOL_UDP = 17
+
+    @typeCheck(str)
+    def __init__(self, filePath):
+        """Constructor.
+
+        :param filePath: the path of the pcap or pcapng file
+        :type filePath: :class:`str`
+        :raise: :class:`netzob.Common.NetzobException.NetzobImportException` if the file is not a valid capture
+        """
+        self.filePath = filePath
+        self.datalink = None
+
+        self.__file = open(filePath, 'rb')
+        try:
+            self.__mmap = mmap.mmap(
+                self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # an empty file cannot be mapped
+            self.__file.close()
+            raise NetzobImportException(
+                "PCAP", "The file {0} is empty.".format(filePath))
+        self.__buffer = numpy.frombuffer(self.__mmap, dtype=numpy.uint8)
+
+        if len(self.__mmap) < 4:
+            self.close()
+            raise NetzobImportException(
+                "PCAP", "The file {0} is not a pcap file.".format(filePath))
+
+        (magic, ) = struct.unpack_from('<I', self.__mmap, 0)
+        if magic in PCAPReader.PCAP_MAGICS:
+            self.__readRecords = self.__readPCAPRecords
+            (self.__endianness,
+             self.__nanoseconds) = PCAPReader.PCAP_MAGICS[magic]
+            if len(self.__mmap) < 24:
+                self.close()
+                raise NetzobImportException(
+                    "PCAP", "The header of the file {0} is truncated.".format(
+                        filePath))
+            (network, ) = struct.unpack_from(self.__endianness + 'I',
+                                             self.__mmap, 20)
+            self.datalink = network & 0x0FFFFFFF
+        elif magic == PCAPReader.PCAPNG_MAGIC:
+            self.__readRecords = self.__readPCAPNGRecords
+        else:
+            self.close()
+            raise NetzobImportException(
+                "PCAP", "The file {0} is not a pcap or pcapng file.".format(
+                    filePath))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Releases the file."""
+        self.__buffer = None
+        if not self.__mmap.closed:
+            self.__mmap.close()
+        self.__file.close()
+
+    @typeCheck(int, int)
+    def iterPacketBatches(self, batchSize=65536, nbPackets=0):
+        """Reads the records of the file and yields them by batches.
+
+        Each batch is a tuple of four arrays (of the same size) containing,
+        for each packet, its timestamp (in seconds), its offset and
+        its captured size in the file and its datalink.
+
+        :keyword batchSize: the maximum number of packets in a batch
+        :type batchSize: :class:`int`
+        :keyword nbPackets: the number of packets to read (0 to read all of them)
+        :type nbPackets: :class:`int`
+        :return: an iterator over the batches
+        :rtype: a generator of :class:`tuple` of :class:`numpy.ndarray`
+        """
+        if batchSize < 1:
+            raise ValueError("The size of a batch must be positive")
+        if nbPackets < 0:
+            raise ValueError(
+                "A positive (or null) value is required for the number of packets to read."
+            )
+
+        batch = []
+        nbReadPackets = 0
+        for record in self.__readRecords():
+            batch.append(record)
+            nbReadPackets += 1
+            if len(batch) == batchSize:
+                yield PCAPReader.__createBatch(batch)
+                batch = []
+            if nbPackets > 0 and nbReadPackets >= nbPackets:
+                break
+        if len(batch) > 0:
+            yield PCAPReader.__createBatch(batch)
+
+    @staticmethod
+    def __createBatch(records):
+        (seconds, microseconds, offsets, lengths,
+         datalinks) = numpy.array(
+             records, dtype=numpy.int64).reshape((len(records), 5)).T
+        timestamps = seconds + (microseconds / 1000000.0)
+        return (timestamps, offsets, lengths, datalinks)
+
+    def __readPCAPRecords(self):
+        """Yields (seconds, microseconds, offset, length, datalink) for each
+        record of a pcap file."""
+        data = self.__mmap
+        size = len(data)
+        unpackHeader = struct.Struct(self.__endianness + 'IIII').unpack_from
+        datalink = self.datalink
+        nanoseconds = self.__nanoseconds
+
+        position = 24
+        while position + 16 <= size:
+            (seconds, fraction, length, _) = unpackHeader(data, position)
+            position += 16
+            if position + length > size:
+                self._logger.warning(
+                    "The last packet of {0} is truncated".format(
+                        self.filePath))
+                break
+            if nanoseconds:
+                fraction //= 1000
+            yield (seconds, fraction, position, length, datalink)
+            position += length
+
+    def __readPCAPNGRecords(self):
+        """Yields (seconds, microseconds, offset, length, datalink) for each
+        packet block of a pcapng file."""
+        data = self.__mmap
+        size = len(data)
+        endianness = '<'
+        interfaces = []
+
+        position = 0
+        while position + 12 <= size:
+            (blockType, ) = struct.unpack_from(endianness + 'I', data,
+                                               position)
+            if blockType == PCAPReader.BLOCK_SECTION_HEADER:
+                # the byte order may change with each section
+                (byteOrderMagic, ) = struct.unpack_from('<I', data,
+                                                        position + 8)
+                endianness = '<' if byteOrderMagic == 0x1a2b3c4d else '>'
+                interfaces = []
+            (blockLength, ) = struct.unpack_from(endianness + 'I', data,
+                                                 position + 4)
+            if blockLength < 12 or position + blockLength > size:
+                self._logger.warning(
+                    "The last block of {0} is truncated".format(
+                        self.filePath))
+                break
+            body = position + 8
+            end = position + blockLength - 4
+
+            if blockType == PCAPReader.BLOCK_INTERFACE_DESCRIPTION:
+                interfaces.append(
+                    self.__readInterface(endianness, body, end))
+                if self.datalink is None:
+                    self.datalink = interfaces[-1][0]
+            elif blockType in (PCAPReader.BLOCK_ENHANCED_PACKET,
+                               PCAPReader.BLOCK_PACKET):
+                if blockType == PCAPReader.BLOCK_ENHANCED_PACKET:
+                    (interfaceId, timestampHigh, timestampLow,
+                     length) = struct.unpack_from(endianness + 'IIII', data,
+                                                  body)
+                else:
+                    (interfaceId, _, timestampHigh, timestampLow,
+                     length) = struct.unpack_from(endianness + 'HHIII', data,
+                                                  body)
+                (datalink, unitsPerSecond, offset) = interfaces[interfaceId]
+                timestamp = (timestampHigh << 32) | timestampLow
+                seconds = timestamp // unitsPerSecond + offset
+                microseconds = (
+                    timestamp % unitsPerSecond) * 1000000 // unitsPerSecond
+                yield (seconds, microseconds, body + 20,
+                       min(length, end - body - 20), datalink)
+            elif blockType == PCAPReader.BLOCK_SIMPLE_PACKET:
+                (length, ) = struct.unpack_from(endianness + 'I', data, body)
+                yield (0, 0, body + 4, min(length, end - body - 4),
+                       interfaces[0][0])
+
+            position += blockLength
+
+    def __readInterface(self, endianness, position, end):
+        """Returns the datalink, the time resolution and the time offset of an
+        interface description block."""
+        (datalink, ) = struct.unpack_from(endianness + 'H', self.__mmap,
+                                          position)
+        unitsPerSecond = 1000000
+        offset = 0
+
+        position += 8
+        while position + 4 <= end:
+            (code, length) = struct.unpack_from(endianness + 'HH',
+                                                self.__mmap, position)
+            position += 4
+            if code == PCAPReader.OPTION_END:
+                break
+            if code == PCAPReader.OPTION_IF_TSRESOL:
+                resolution = self.__mmap[position]
+                if resolution & 0x80:
+                    unitsPerSecond = 2**(resolution & 0x7f)
+                else:
+                    unitsPerSecond = 10**resolution
+            elif code == PCAPReader.OPTION_IF_TSOFFSET:
+                (offset, ) = struct.unpack_from(endianness + 'q',
+                                                self.__mmap, position)
+            position += (length + 3) & ~3
+
+        return (datalink, unitsPerSecond, offset)
+
+    def getBytes(self, start, end):
+        """Returns the content of the file between the specified offsets.
+
+        :rtype: :class:`bytes`
+        """
+        return self.__mmap[start:end]
+
+    def decodePackets(self, offsets, lengths, datalinks):
+        """Decodes the layer 2, 3 and 4 headers of the specified packets.
+
+        All the packets are decoded at once, the returned dict contains,
+        for each decoded information, an array with a value per packet:
+
+        - ``l2Start``: the offset of the layer 2 payload,
+        - ``etherType``: the type of the layer 2 payload (-1 if unknown),
+        - ``ip``: True if the layer 2 payload is a valid IPv4 packet,
+        - ``l3Start``, ``l3End``: the offsets of the IP payload (without the padding),
+        - ``ipProtocol``, ``ipSrc``, ``ipDst``: the protocol and the addresses of the IP packet,
+        - ``l4Start``: the offset of the TCP or UDP payload,
+        - ``srcPort``, ``dstPort``: the TCP or UDP ports,
+        - ``tcpSequence``, ``tcpFlags``: the sequence number and the flags of the TCP segment,
+        - ``macSrc``, ``macDst``: the Ethernet addresses (as integers).
+
+        Values associated with a layer that cannot be decoded are meaningless.
+
+        :param offsets: the offset of each packet in the file
+        :type offsets: :class:`numpy.ndarray`
+        :param lengths: the size of each packet
+        :type lengths: :class:`numpy.ndarray`
+        :param datalinks: the datalink of each packet
+        :type datalinks: :class:`numpy.ndarray`
+        :rtype: :class:`dict`
+        """
+        ends = offsets + lengths
+
+        # Layer 2
+        l2Size = numpy.zeros(len(offsets), dtype=numpy.int64)
+        etherType = numpy.full(len(offsets), -1, dtype=numpy.int64)
+        for (datalink, size) in PCAPReader.L2_HEADER_SIZES.items():
+            mask = (datalinks == datalink) & (lengths >= size)
+            l2Size[mask] = size
+        isEthernet = (datalinks == PCAPReader.DLT_EN10MB) & (lengths >= 14)
+        isSLL = (datalinks == PCAPReader.DLT_LINUX_SLL) & (lengths >= 16)
+        is201 = (datalinks == PCAPReader.PROTOCOL201) & (lengths >= 8)
+        etherType[isEthernet] = self.__readUInt(offsets[isEthernet] + 12, 2)
+        etherType[isSLL] = self.__readUInt(offsets[isSLL] + 14, 2)
+        etherType[is201] = self.__readUInt(offsets[is201] + 4, 2)
+        l2Start = offsets + l2Size
+        l2Length = ends - l2Start
+
+        # Layer 3 (IPv4)
+        ip = (etherType == PCAPReader.ETHERTYPE_IP) & (l2Length >= 20)
+        ipHeaderSize = (self.__readUInt(l2Start, 1) & 0x0F) * 4
+        ipLength = self.__readUInt(l2Start + 2, 2)
+        ip &= (ipHeaderSize >= 20) & (ipHeaderSize <= l2Length)
+        l3Start = l2Start + ipHeaderSize
+        # the padding of the layer 2 is removed from the IP payload
+        paddingSize = l2Length - ipLength
+        l3End = numpy.where((paddingSize > 0) &
+                            (ends - l3Start > paddingSize), ends - paddingSize,
+                            ends)
+
+        # Layer 4 (UDP or TCP)
+        ipProtocol = self.__readUInt(l2Start + 9, 1)
+        l4HeaderSize = numpy.where(ipProtocol == PCAPReader.IP_PROTOCOL_TCP,
+                                   (self.__readUInt(l3Start + 12, 1) >> 4) * 4,
+                                   8)
+        l4Start = numpy.minimum(l3Start + l4HeaderSize, l3End)
+        hasPorts = l3End - l3Start >= 4
+
+        return {
+            "l2Start": l2Start,
+            "etherType": etherType,
+            "ip": ip,
+            "l3Start": l3Start,
+            "l3End": l3End,
+            "ipProtocol": ipProtocol,
+            "ipSrc": self.__readUInt(l2Start + 12, 4),
+            "ipDst": self.__readUInt(l2Start + 16, 4),
+            "l4Start": l4Start,
+            "srcPort": numpy.where(hasPorts, self.__readUInt(l3Start, 2), 0),
+            "dstPort": numpy.where(hasPorts,
+                                   self.__readUInt(l3Start + 2, 2), 0),
+            "tcpSequence": self.__readUInt(l3Start + 4, 4),
+            "tcpFlags": self.__readUInt(l3Start + 13, 1),
+            "macSrc": self.__readUInt(offsets + 6, 6),
+            "macDst": self.__readUInt(offsets, 6),
+        }
+
+    def __readUInt(self, positions, size):
+        """Reads the big endian unsigned integers of the specified size
+        stored at each of the positions."""
+        indexes = positions[:, None] + numpy.arange(size)
+        numpy.clip(indexes, 0, len(self.__buffer) - 1, out=indexes)
+        values = self.__buffer[indexes].astype(numpy.int64)
+        shifts = numpy.arange(size - 1, -1, -1, dtype=numpy.int64) * 8
+        return (values << shifts).sum(axis=1)
+
+    @staticmethod
+    def formatIPAddress(value):
+        """Returns the dotted representation of an IPv4 address.
+
+        >>> from netzob.Import.PCAPImporter.PCAPReader import PCAPReader
+        >>> print(PCAPReader.formatIPAddress(0xc0a80001))
+        192.168.0.1
+        """
+        value = int(value)
+        return "{0}.{1}.{2}.{3}".format(value >> 24, (value >> 16) & 0xFF,
+                                        (value >> 8) & 0xFF, value & 0xFF)
+
+    @staticmethod
+    def formatMacAddress(value):
+        """Returns the representation of a 48 bits Ethernet address.
+
+        >>> from netzob.Import.PCAPImporter.PCAPReader import PCAPReader
+        >>> print(PCAPReader.formatMacAddress(0x0800270a0bff))
+        08:00:27:0a:0b:ff
+        """
+        value = int(value)
+        return ":".join("{0:02x}".format((value >> shift) & 0xFF)
+                        for shift in range(40, -1, -8))
@@ -0,0 +1,420 @@
+# -*- coding: utf-8 -*-
+
+#+---------------------------------------------------------------------------+
+#|          01001110 01100101 01110100 01111010 01101111 01100010            |
+#|                                                                           |
+#|               Netzob : Inferring communication protocols                  |
+#+---------------------------------------------------------------------------+
+#| Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+#| This program is free software: you can redistribute it and/or modify      |
+#| it under the terms of the GNU General Public License as published by      |
+#| the Free Software Foundation, either version 3 of the License, or         |
+#| (at your option) any later version.                                       |
+#|                                                                           |
+#| This program is distributed in the hope that it will be useful,           |
+#| but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+#| MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+#| GNU General Public License for more details.                              |
+#|                                                                           |
+#| You should have received a copy of the GNU General Public License         |
+#| along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+#+---------------------------------------------------------------------------+
+#| @url      : http://www.netzob.org                                         |
+#| @contact  : contact@netzob.org                                            |
+#| @sponsors : Amossys, http://www.amossys.fr                                |
+#|             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+#+---------------------------------------------------------------------------+
+
+
+#+---------------------------------------------------------------------------+
+#| Standard library imports
+#+---------------------------------------------------------------------------+
+import heapq
+from collections import OrderedDict
+
+#+---------------------------------------------------------------------------+
+#| Related third party imports
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Local application imports
+#+---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
+from netzob.Model.Vocabulary.Messages.L4NetworkMessage import L4NetworkMessage
+
+
+class _TCPFlow(object):
+    """State of one direction of a TCP connection."""
+
+    def __init__(self):
+        # sequence number of the next expected byte
+        self.nextSequence = None
+        # position of the next expected byte since the start of the flow,
+        # unlike sequence numbers it does not wrap
+        self.position = 0
+        # out-of-order segments: position -> (message, data, push), and
+        # the heap of their positions
+        self.segments = dict()
+        self.positions = []
+        self.segmentsSize = 0
+        # first segment and content of the write being reassembled
+        self.message = None
+        self.chunks = []
+        self.size = 0
+        self.finished = False
+        # the start of the flow is known once its SYN is seen, before
+        # that earlier data can arrive and segments are only buffered
+        self.synchronized = False
+
+
+class _TCPConnection(object):
+    """State of a TCP connection."""
+
+    def __init__(self):
+        # source endpoint -> _TCPFlow
+        self.flows = OrderedDict()
+        # date of the last segment of the connection
+        self.lastDate = None
+
+
+@NetzobLogger
+class TCPReassembler(object):
+    """Reassembles the payloads of TCP segments into application-level
+    messages.
+
+    Segments are dispatched on their connection (i.e. the addresses and
+    ports of both endpoints) and ordered, in each direction, following
+    their sequence numbers: retransmitted data is dropped and
+    out-of-order segments are kept until the missing data is received.
+    A message is produced for each write of the application, which
+    ends when a segment has the PSH flag, when the peer sends data or
+    when the direction is closed (FIN or RST).
+
+    Memory is bounded: a direction never buffers more than
+    `bufferSize` bytes. If missing data is not received before this
+    limit is reached, it is considered as lost and the reassembly
+    continues after it. Missing data is also considered as lost when the
+    peer sends data or when the direction is closed.
+
+    When the capture starts after the SYN of a direction, its first byte
+    is unknown. Its segments are then buffered, earlier data being
+    reassembled before them, until the peer sends data, the direction is
+    closed or its buffer is full.
+
+    Connections are dropped, and their pending messages produced, when
+    they are closed, when they receive no segment during `timeout`
+    seconds (following the dates of the messages) or, the least recently
+    active first, when more than `maxConnections` connections are
+    followed.
+
+    >>> from netzob.all import *
+    >>> from netzob.Import.PCAPImporter.TCPReassembler import TCPReassembler
+    >>> def segment(data, port=1025, toServer=True):
+    ...     endpoints = [("10.0.0.1", port), ("10.0.0.2", 80)]
+    ...     ((l3Src, l4Src), (l3Dst, l4Dst)) = endpoints if toServer else endpoints[::-1]
+    ...     return L4NetworkMessage(data, l3SourceAddress=l3Src, l3DestinationAddress=l3Dst, l4Protocol="TCP", l4SourceAddress=l4Src, l4DestinationAddress=l4Dst)
+    >>> reassembler = TCPReassembler()
+    >>> reassembler.addSegment(segment(b""), 99, TCPReassembler.SYN)
+    []
+    >>> reassembler.addSegment(segment(b"World!"), 106, TCPReassembler.PSH)
+    []
+    >>> print([m.data for m in reassembler.addSegment(segment(b"Hello "), 100, 0)])
+    [b'Hello World!']
+
+    Retransmitted (and overlapping) data is ignored.
+
+    >>> reassembler.addSegment(segment(b"World!"), 106, TCPReassembler.PSH)
+    []
+    >>> reassembler.addSegment(segment(b"d!Bye"), 110, 0)
+    []
+    >>> print([m.data for m in reassembler.addSegment(segment(b"Response", toServer=False), 5000, TCPReassembler.PSH)])
+    [b'Bye']
+
+    Interleaved connections are reassembled separately, remaining data
+    is produced when the reassembler is flushed. The SYN of the server
+    was not captured, so its response is produced once the client sends
+    data again.
+
+    >>> reassembler.addSegment(segment(b"First", 1026), 1, 0)
+    []
+    >>> print([m.data for m in reassembler.addSegment(segment(b" request", 1025), 115, 0)])
+    [b'Response']
+    >>> reassembler.addSegment(segment(b" request", 1026), 6, 0)
+    []
+    >>> print([m.data for m in reassembler.flush()])
+    [b' request', b'First request']
+
+    Earlier data received first in a capture started in the middle of a
+    connection is not lost.
+
+    >>> reassembler.addSegment(segment(b"World"), 106, 0)
+    []
+    >>> reassembler.addSegment(segment(b"Hello "), 100, TCPReassembler.PSH)
+    []
+    >>> print([m.data for m in reassembler.flush()])
+    [b'Hello ', b'World']
+
+    Idle connections are dropped once the date of the segments exceeds
+    their last activity by `timeout` seconds.
+
+    >>> reassembler = TCPReassembler(timeout=60)
+    >>> first = segment(b"Unfinished", 1025)
+    >>> first.date = 1000.0
+    >>> reassembler.addSegment(first, 1, 0)
+    []
+    >>> later = segment(b"Other", 1026)
+    >>> later.date = 1061.0
+    >>> print([m.data for m in reassembler.addSegment(later, 1, 0)])
+    [b'Unfinished']
+    >>> reassembler.nbConnections
+    1
+
+    """
+
+    # TCP flags
+    FIN = 0x01
+    SYN = 0x02
+    RST = 0x04
+    PSH = 0x08
+
+    SEQUENCE_MODULO = 1 << 32
+
+    DEFAULT_BUFFER_SIZE = 1 << 20
+
+    DEFAULT_TIMEOUT = 120
+
+    DEFAULT_MAX_CONNECTIONS = 1 << 16
+
+    @typeCheck(int)
+    def __init__(self,
+                 bufferSize=DEFAULT_BUFFER_SIZE,
+                 timeout=DEFAULT_TIMEOUT,
+                 maxConnections=DEFAULT_MAX_CONNECTIONS):
+        """Constructor.
+
+        :param bufferSize: the maximum number of bytes buffered for each direction of a connection
+        :type bufferSize: :class:`int`
+        :keyword timeout: the number of seconds without segment after which a connection is dropped (None to never drop idle connections)
+        :type timeout: :class:`int`
+        :keyword maxConnections: the maximum number of connections followed at once
+        :type maxConnections: :class:`int`
+        """
+        if bufferSize <= 0:
+            raise ValueError("The size of the buffers must be positive.")
+        if timeout is not None and timeout <= 0:
+            raise ValueError("The timeout must be positive.")
+        if maxConnections <= 0:
+            raise ValueError(
+                "The maximum number of connections must be positive.")
+        self.bufferSize = bufferSize
+        self.timeout = timeout
+        self.maxConnections = maxConnections
+        # connection -> _TCPConnection, the least recently active first
+        self.__connections = OrderedDict()
+
+    @typeCheck(L4NetworkMessage, int, int)
+    def addSegment(self, message, sequence, flags):
+        """Adds a TCP segment to the reassembly and returns the messages
+        it completes.
+
+        :param message: the message built from the payload of the segment
+        :type message: :class:`netzob.Model.Vocabulary.Messages.L4NetworkMessage.L4NetworkMessage`
+        :param sequence: the sequence number of the segment
+        :type sequence: :class:`int`
+        :param flags: the TCP flags of the segment
+        :type flags: :class:`int`
+        :return: the reassembled messages
+        :rtype: a list of :class:`netzob.Model.Vocabulary.Messages.L4NetworkMessage.L4NetworkMessage`
+        """
+        source = (message.l3SourceAddress, message.l4SourceAddress)
+        destination = (message.l3DestinationAddress,
+                       message.l4DestinationAddress)
+        key = (min(source, destination), max(source, destination))
+        date = message.date
+
+        completedMessages = self.__dropIdleConnections(date)
+
+        connection = self.__connections.get(key)
+        if connection is None:
+            connection = self.__connections[key] = _TCPConnection()
+            if len(self.__connections) > self.maxConnections:
+                completedMessages.extend(
+                    self.__dropConnection(next(iter(self.__connections))))
+        else:
+            self.__connections.move_to_end(key)
+        if date is not None:
+            connection.lastDate = date
+        flow = connection.flows.get(source)
+        if flow is None:
+            flow = connection.flows[source] = _TCPFlow()
+
+        # the SYN flag consumes a sequence number
+        if flags & TCPReassembler.SYN:
+            sequence = (sequence + 1) % TCPReassembler.SEQUENCE_MODULO
+            flow.nextSequence = sequence
+            flow.synchronized = True
+        elif flow.nextSequence is None:
+            flow.nextSequence = sequence
+
+        data = message.data
+        if len(data) > 0:
+            # data sent by an endpoint ends the write of its peer
+            for (endpoint, peerFlow) in connection.flows.items():
+                if endpoint != source:
+                    completedMessages.extend(self.__flushFlow(peerFlow))
+
+            push = (flags & TCPReassembler.PSH) != 0
+            distance = self.__distance(flow, sequence)
+            if distance < 0 and not flow.synchronized:
+                # data precedes the start of the flow
+                flow.nextSequence = sequence
+                flow.position += distance
+                distance = 0
+            position = flow.position + distance
+            previousSegment = flow.segments.get(position)
+            if distance + len(data) <= 0:
+                self._logger.debug("Retransmitted TCP data of {0} is dropped".
+                                   format(message.source))
+            elif previousSegment is None or len(data) > len(previousSegment[1]):
+                # a retransmission can carry more data than the original segment
+                if previousSegment is None:
+                    heapq.heappush(flow.positions, position)
+                else:
+                    flow.segmentsSize -= len(previousSegment[1])
+                flow.segments[position] = (message, data, push)
+                flow.segmentsSize += len(data)
+            if flow.synchronized:
+                completedMessages.extend(self.__reassemble(flow))
+
+            if flow.segmentsSize > self.bufferSize:
+                self._logger.debug(
+                    "Missing TCP data of {0} is considered as lost since its buffer is full".
+                    format(message.source))
+                completedMessages.extend(self.__skipGap(flow))
+
+        if flags & (TCPReassembler.FIN | TCPReassembler.RST):
+            flow.finished = True
+            completedMessages.extend(self.__flushFlow(flow))
+            if (flags & TCPReassembler.RST) or all(
+                    f.finished for f in connection.flows.values()):
+                completedMessages.extend(self.__dropConnection(key))
+
+        return completedMessages
+
+    def flush(self):
+        """Returns the messages that are still being reassembled (missing
+        data is considered as lost) and resets the reassembler.
+
+        :return: the remaining messages
+        :rtype: a list of :class:`netzob.Model.Vocabulary.Messages.L4NetworkMessage.L4NetworkMessage`
+        """
+        completedMessages = []
+        for connection in self.__connections.values():
+            for flow in connection.flows.values():
+                completedMessages.extend(self.__flushFlow(flow))
+        self.__connections = OrderedDict()
+        return completedMessages
+
+    def __dropIdleConnections(self, date):
+        """Drops the connections without segment for `timeout` seconds
+        before the specified date and returns their pending messages."""
+        completedMessages = []
+        if self.timeout is None or date is None:
+            return completedMessages
+        # connections are ordered by activity, the idle ones come first
+        while len(self.__connections) > 0:
+            key = next(iter(self.__connections))
+            lastDate = self.__connections[key].lastDate
+            if lastDate is None or date - lastDate <= self.timeout:
+                break
+            self._logger.debug(
+                "TCP connection {0} is dropped after {1}s without segment".
+                format(key, date - lastDate))
+            completedMessages.extend(self.__dropConnection(key))
+        return completedMessages
+
+    def __dropConnection(self, key):
+        """Forgets the connection and returns its pending messages."""
+        connection = self.__connections.pop(key)
+        completedMessages = []
+        for flow in connection.flows.values():
+            completedMessages.extend(self.__flushFlow(flow))
+        return completedMessages
+
+    def __distance(self, flow, sequence):
+        """Returns the (signed) number of bytes between the next expected
+        byte of the flow and the specified sequence number."""
+        distance = (sequence - flow.nextSequence) % TCPReassembler.SEQUENCE_MODULO
+        if distance >= TCPReassembler.SEQUENCE_MODULO // 2:
+            distance -= TCPReassembler.SEQUENCE_MODULO
+        return distance
+
+    def __reassemble(self, flow):
+        """Appends the buffered segments that follow the received data
+        and returns the completed messages."""
+        completedMessages = []
+        while len(flow.positions) > 0:
+            distance = flow.positions[0] - flow.position
+            if distance > 0:
+                break
+            (message, data, push) = flow.segments.pop(
+                heapq.heappop(flow.positions))
+            flow.segmentsSize -= len(data)
+
+            # data already received is dropped
+            data = data[-distance:]
+            if len(data) == 0:
+                continue
+            if flow.message is None:
+                flow.message = message
+            flow.chunks.append(data)
+            flow.size += len(data)
+            flow.nextSequence = (flow.nextSequence + len(data)
+                                 ) % TCPReassembler.SEQUENCE_MODULO
+            flow.position += len(data)
+
+            if push or flow.size >= self.bufferSize:
+                completedMessages.extend(self.__completeMessage(flow))
+        return completedMessages
+
+    def __skipGap(self, flow):
+        """Considers the data missing before the buffered segments as lost
+        and returns the messages completed by this decision."""
+        # the start of the flow can not move back anymore
+        flow.synchronized = True
+        completedMessages = self.__completeMessage(flow)
+        if len(flow.positions) > 0:
+            gap = flow.positions[0] - flow.position
+            flow.nextSequence = (flow.nextSequence + gap
+                                 ) % TCPReassembler.SEQUENCE_MODULO
+            flow.position += gap
+            completedMessages.extend(self.__reassemble(flow))
+        return completedMessages
+
+    def __flushFlow(self, flow):
+        """Returns all the messages buffered in the flow, missing data is
+        considered as lost."""
+        completedMessages = []
+        while len(flow.segments) > 0:
+            completedMessages.extend(self.__skipGap(flow))
+        completedMessages.extend(self.__completeMessage(flow))
+        return completedMessages
+
+    def __completeMessage(self, flow):
+        """Returns the message being reassembled in the flow (if any)."""
+        if flow.message is None:
+            return []
+        message = flow.message
+        message.data = b"".join(flow.chunks)
+        flow.message = None
+        flow.chunks = []
+        flow.size = 0
+        return [message]
+
+    @property
+    def nbConnections(self):
+        """The number of connections currently followed (Read-only).
+
+        :type: :class:`int`
+        """
+        return len(self.__connections)
@@ -28,11 +28,11 @@
 #+---------------------------------------------------------------------------+
 #| Standard library imports
 #+---------------------------------------------------------------------------+
-import math
 
 #+---------------------------------------------------------------------------+
 #| Related third party imports
 #+---------------------------------------------------------------------------+
+import numpy
 
 #+---------------------------------------------------------------------------+
 #| Local application imports
@@ -130,36 +130,119 @@ class EntropyMeasurement(object):
         Exception: At least one value must be provided
         """
 
-        if values is None:
-            raise Exception("values cannot be None")
-        if len(values) < 1:
-            raise Exception("At least one value must be provided")
-
-        # computes longuest message
-        longuest = max([len(value) for value in values])
-
-        for i_byte in range(longuest):
-
-            dataset = []
-            for value in values:
-                try:
-                    dataset.append(value[i_byte])
-                except Exception:
-                    pass
-
-            yield EntropyMeasurement.__measure_entropy(dataset)
+        statistics = EntropyMeasurement.measure_values_statistics(values)
+        for entropy in statistics["entropy"].tolist():
+            yield entropy
 
     @staticmethod
-    def __measure_entropy(values):
+    def measure_values_statistics(values):
+        """This method returns, for each position, the entropy of the bytes
+        found at this position in the specified values and some other
+        statistics. All positions are computed at once from a single
+        histogram of the (position, byte) couples.
+
+        Values can be provided as a list, or as an iterator over values or
+        over lists of values, so that captures that do not fit in memory
+        can be measured chunk by chunk.
+
+        >>> stats = EntropyMeasurement.measure_values_statistics([b"\\x00\\x01", b"\\x00\\x03\\xff", b"\\x00\\x05"])
+        >>> stats["entropy"].tolist()
+        [0.0, 1.584962500721156, 0.0]
+        >>> stats["nbValues"].tolist()
+        [3, 3, 1]
+        >>> stats["nbDistinct"].tolist()
+        [1, 3, 1]
+        >>> stats["min"].tolist(), stats["max"].tolist()
+        ([0, 1, 255], [0, 5, 255])
+
+        >>> chunks = ([b"\\x00\\x01"] * 10 for i in range(5))
+        >>> EntropyMeasurement.measure_values_statistics(chunks)["nbValues"].tolist()
+        [50, 50]
+
+        >>> EntropyMeasurement.measure_values_statistics(iter([]))
+        Traceback (most recent call last):
+        ...
+        Exception: At least one value must be provided
+
+        :param values: the values to measure
+        :type values: an iterable of :class:`bytes`, or of :class:`list` of :class:`bytes`
+        :return: the statistics per position, indexed by their name: `entropy`, `nbValues` (number of values long enough to have a byte at this position), `nbDistinct` (number of distinct bytes), `min` and `max` (smallest and largest bytes)
+        :rtype: a :class:`dict` of :class:`numpy.ndarray`
+        """
         if values is None:
             raise Exception("values cannot be None")
-        if len(values) < 1:
+
+        # counts[i_byte, x] is the number of values with byte x at position i_byte
+        counts = numpy.zeros((0, 256), dtype=numpy.int64)
+        nbMeasuredValues = 0
+        for chunk in EntropyMeasurement.__iterChunks(values):
+            nbMeasuredValues += len(chunk)
+            chunkCounts = EntropyMeasurement.__count_bytes(chunk)
+            if len(chunkCounts) > len(counts):
+                chunkCounts[:len(counts)] += counts
+                counts = chunkCounts
+            else:
+                counts[:len(chunkCounts)] += chunkCounts
+
+        if nbMeasuredValues < 1:
             raise Exception("At least one value must be provided")
 
-        entropy = 0
-        for x in range(256):
-            p_x = float(values.count(x)) / len(values)
-            if p_x > 0:
-                entropy += -p_x * math.log(p_x, 2)
+        nbValues = counts.sum(axis=1)
+
+        probabilities = counts / nbValues[:, numpy.newaxis]
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            terms = numpy.where(counts > 0,
+                                -probabilities * numpy.log2(probabilities),
+                                0.0)
+        present = counts > 0
+        return {
+            "entropy": terms.sum(axis=1),
+            "nbValues": nbValues,
+            "nbDistinct": present.sum(axis=1),
+            "min": present.argmax(axis=1),
+            "max": 255 - present[:, ::-1].argmax(axis=1)
+        }
+
+    # number of values given at once to numpy when values are not chunked
+    CHUNK_SIZE = 65536
+
+    @staticmethod
+    def __iterChunks(values):
+        """Yields lists of values, the items of values being either values or
+        lists of values."""
+        chunk = []
+        for item in values:
+            if isinstance(item, (list, tuple)):
+                if len(chunk) > 0:
+                    yield chunk
+                    chunk = []
+                yield item
+            else:
+                chunk.append(item)
+                if len(chunk) >= EntropyMeasurement.CHUNK_SIZE:
+                    yield chunk
+                    chunk = []
+        if len(chunk) > 0:
+            yield chunk
 
-        return entropy
+    @staticmethod
+    def __count_bytes(values):
+        """Returns the number of occurrences of each byte at each position
+        of the values, as an array of shape (longuest value, 256)."""
+        values = [
+            value if isinstance(value, bytes) else bytes(value)
+            for value in values
+        ]
+        lengths = numpy.fromiter(
+            (len(value) for value in values), dtype=numpy.int64,
+            count=len(values))
+        longuest = int(lengths.max()) if len(lengths) > 0 else 0
+        data = numpy.frombuffer(b"".join(values), dtype=numpy.uint8)
+
+        # position of each byte in its value
+        starts = numpy.cumsum(lengths) - lengths
+        positions = numpy.arange(len(data)) - numpy.repeat(starts, lengths)
+
+        counts = numpy.bincount(
+            positions * 256 + data, minlength=longuest * 256)
+        return counts.reshape((longuest, 256))
@@ -66,9 +66,18 @@ class Format(object):
 
     @staticmethod
     @typeCheck(AbstractField)
-    def splitAligned(field, useSemantic=True, doInternalSlick=False):
+    def splitAligned(field,
+                     useSemantic=True,
+                     doInternalSlick=False,
+                     useGuideTree=False,
+                     nbThread=None,
+                     bandWidth=None):
         """Split the specified field according to the variations of message bytes.
-        Relies on a sequence alignment algorithm.
+        Relies on a sequence alignment algorithm. If useGuideTree is set,
+        messages are progressively aligned following their UPGMA tree,
+        subtrees being aligned by nbThread threads. If bandWidth is set,
+        alignments are restricted to a band of diagonals (see
+        :class:`netzob.Inference.Vocabulary.FormatOperations.FieldSplitAligned.FieldSplitAligned.FieldSplitAligned`).
 
         The following example is an anti-regression test
         for issue https://github.com/netzob/netzob/issues/13 reported by Sergej
@@ -86,7 +95,11 @@ class Format(object):
         if field is None:
             raise TypeError("Field cannot be None")
 
-        fs = FieldSplitAligned(doInternalSlick=doInternalSlick)
+        fs = FieldSplitAligned(
+            doInternalSlick=doInternalSlick,
+            useGuideTree=useGuideTree,
+            nbThread=nbThread,
+            bandWidth=bandWidth)
         fs.execute(field, useSemantic)
 
     @staticmethod
@@ -358,15 +371,21 @@ class Format(object):
 
     @staticmethod
     @typeCheck(list)
-    def clusterByAlignment(messages, minEquivalence=50, internalSlick=True):
+    def clusterByAlignment(messages, minEquivalence=50, internalSlick=True, nbThread=None, prefilter=None, bandWidth=None, earlyAbandon=False, cache=None):
         """This clustering process regroups messages in groups that maximes
         their alignement. It provides the required methods to compute clustering
         between multiple symbols/messages using UPGMA algorithms (see U{http://en.wikipedia.org/wiki/UPGMA}).
         When processing, the matrix of scores is computed by the C extensions (L{_libScoreComputation}
-        and used to regroup messages and symbols into equivalent cluster.
+        with `nbThread` threads (one per cpu if None) and used to regroup messages and symbols into equivalent cluster.
+        If a `prefilter` is provided (see :class:`MinHashLSH`), only the pairs of messages it finds are aligned.
+        Alignments can be restricted to a band of `bandWidth` diagonals and, if `earlyAbandon` is set, stopped
+        as soon as they can not reach `minEquivalence` (see :class:`ClusterByAlignment`).
+        Scores already stored in the `cache` (see :class:`SimilarityCache`) are not computed again.
         """
         clustering = ClusterByAlignment(
-            minEquivalence=minEquivalence, internalSlick=internalSlick)
+            minEquivalence=minEquivalence, internalSlick=internalSlick,
+            nbThread=nbThread, prefilter=prefilter, bandWidth=bandWidth,
+            earlyAbandon=earlyAbandon, cache=cache)
         return clustering.cluster(messages)
 
     @staticmethod
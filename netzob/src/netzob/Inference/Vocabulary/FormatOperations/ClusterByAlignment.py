@@ -34,16 +34,18 @@
 # +---------------------------------------------------------------------------+
 # | Standard library imports                                                  |
 # +---------------------------------------------------------------------------+
-from collections import OrderedDict
+import multiprocessing
 
 # +---------------------------------------------------------------------------+
 # | Related third party imports                                               |
 # +---------------------------------------------------------------------------+
+import numpy
 
 # +---------------------------------------------------------------------------+
 # | Local application imports                                                 |
 # +---------------------------------------------------------------------------+
 from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
+from netzob.Common.Utils.Deduplicator import Deduplicator
 from netzob.Model.Vocabulary.Symbol import Symbol
 from netzob.Model.Vocabulary.Messages.AbstractMessage import AbstractMessage
 from netzob.Common.C_Extensions.WrapperArgsFactory import WrapperArgsFactory
@@ -107,13 +109,30 @@ class ClusterByAlignment(object):
 
     """
 
+    # Score of the pairs of symbols discarded by the prefilter
+    DEFAULT_SCORE = 0.0
+
+    # Version of the computation of the scores, it is part of the
+    # parameters of the cached scores
+    SCORES_VERSION = 1
+
     def __init__(self,
                  minEquivalence=50,
                  internalSlick=True,
-                 recomputeMatrixThreshold=None):
+                 recomputeMatrixThreshold=None,
+                 nbThread=None,
+                 prefilter=None,
+                 bandWidth=None,
+                 earlyAbandon=False,
+                 cache=None):
         self.minEquivalence = minEquivalence
         self.internalSlick = internalSlick
         self.recomputeMatrixThreshold = recomputeMatrixThreshold
+        self.nbThread = nbThread
+        self.prefilter = prefilter
+        self.bandWidth = bandWidth
+        self.earlyAbandon = earlyAbandon
+        self.cache = cache
 
     @typeCheck(list)
     def cluster(self, messages):
@@ -150,7 +169,8 @@ class ClusterByAlignment(object):
     @typeCheck(list)
     def _processUPGMA(self, messages, recomputeMatrixThreshold=None):
         """Computes the matrix of equivalences (in C) and reduces it
-        iteratively."""
+        iteratively. Identical messages are aligned once: they start
+        in the same cluster."""
         if messages is None:
             raise TypeError("Messages cannot be None")
         if len(messages) == 0:
@@ -161,8 +181,15 @@ class ClusterByAlignment(object):
                     "At least one message ({0}) is not an AbstractMessage.".
                     format(str(m)))
 
-        # We create one symbol for each message
-        initialSymbols = [Symbol(messages=[message]) for message in messages]
+        # We create one symbol for each distinct message, it holds all the
+        # duplicates of the message so that its size weights the averages
+        dedup = Deduplicator(messages, key=lambda message: message.data)
+        initialSymbols = [
+            Symbol(messages=duplicates)
+            for duplicates in dedup.getGroupsValues()
+        ]
+        self._logger.debug("{0} distinct messages out of {1}".format(
+            dedup.nbUniqueValues, len(messages)))
 
         self._logger.debug("Computing the associated matrix")
 
@@ -174,7 +201,172 @@ class ClusterByAlignment(object):
                                            recomputeMatrixThreshold)
 
     @typeCheck(list)
-    def _computeSimilarityMatrix(self, symbols):
+    def computeGuideTree(self, messages):
+        """Computes the UPGMA tree of the messages, i.e. the order in which
+        clusters are merged when the merging is not stopped by the minimum
+        equivalence. It can guide a progressive alignment of the messages.
+
+        The tree is returned as a (number of messages - 1, 2) array:
+        the node n + k (where n is the number of messages) is the merge of
+        the two nodes of the k-th row, nodes 0 to n - 1 being the messages.
+        Children always come before their parent, the last row is the root.
+
+        >>> from netzob.all import *
+        >>> messages = [RawMessage(data) for data in [b"hello netzob", b"bye", b"hello zoby", b"bye bye"]]
+        >>> clustering = ClusterByAlignment()
+        >>> print(clustering.computeGuideTree(messages))
+        [[2 0]
+         [3 1]
+         [5 4]]
+
+        :param messages: the messages (a tree of a single message has no row)
+        :type messages: a :class:`list` of :class:`netzob.Model.Vocabulary.Messages.AbstractMessage.AbstractMessage`
+        :rtype: :class:`numpy.ndarray`
+        """
+        if messages is None or len(messages) == 0:
+            raise TypeError("There should be at least one message.")
+        for m in messages:
+            if not isinstance(m, AbstractMessage):
+                raise TypeError(
+                    "At least one message ({0}) is not an AbstractMessage.".
+                    format(str(m)))
+
+        # Each message is a leaf, even if it is a duplicate of another one
+        # and all the scores are required to merge the clusters
+        symbols = [Symbol(messages=[message]) for message in messages]
+        self.scores = self._computeSimilarityMatrix(
+            symbols, earlyAbandon=False)
+        self._computePhylogenicTree(
+            symbols, None, minEquivalence=-numpy.inf)
+        return numpy.array(
+            self.__merges, dtype=numpy.int64).reshape((len(messages) - 1, 2))
+
+    @typeCheck(list, list)
+    def clusterIncrementally(self, symbols, messages, realign=True):
+        """Places new messages in existing symbols without clustering the
+        previous messages again. Each distinct new message is only aligned
+        with the first message of each symbol (its representative) and
+        joins the symbol with the best score if it reaches
+        :attr:`minEquivalence` (the oldest symbol on equal scores). The
+        remaining new messages are clustered together in new symbols.
+
+        The cost is linear in the number of new messages as long as most
+        of them match an existing symbol.
+
+        >>> from netzob.all import *
+        >>> pseudos = ["zoby", "ditrich", "toto", "carlito"]
+        >>> messages = [RawMessage("hello {0}, what's up in Paris ?".format(pseudo).encode('utf-8')) for pseudo in pseudos]
+        >>> messages += [RawMessage("My ip address is {0}".format(ip).encode('utf-8')) for ip in ["192.168.0.10", "10.120.121.212"]]
+        >>> clustering = ClusterByAlignment()
+        >>> symbols = clustering.cluster(messages)
+        >>> print([len(symbol.messages) for symbol in symbols])
+        [4, 2]
+        >>> newMessages = [RawMessage(b"hello netzob, what's up in Munich ?"), RawMessage(b"My ip address is 78.167.23.10")]
+        >>> newMessages += [RawMessage("Your IP is 10.0.0.{0}".format(i).encode('utf-8')) for i in range(3)]
+        >>> symbols = clustering.clusterIncrementally(symbols, newMessages)
+        >>> print([len(symbol.messages) for symbol in symbols])
+        [5, 3, 3]
+        >>> print(symbols[2])
+        Field                | Field
+        -------------------- | -----
+        'Your IP is 10.0.0.' | '1'  
+        'Your IP is 10.0.0.' | '0'  
+        'Your IP is 10.0.0.' | '2'  
+        -------------------- | -----
+
+        :param symbols: the existing symbols, each one must have a message
+        :type symbols: a :class:`list` of :class:`netzob.Model.Vocabulary.Symbol.Symbol`
+        :param messages: the new messages
+        :type messages: a :class:`list` of :class:`netzob.Model.Vocabulary.Messages.AbstractMessage.AbstractMessage`
+        :param realign: if True, the fields of the symbols that receive new messages are computed again
+        :type realign: :class:`bool`
+        :return: the existing symbols followed by the new ones
+        :rtype: a :class:`list` of :class:`netzob.Model.Vocabulary.Symbol.Symbol`
+        """
+        if symbols is None or messages is None:
+            raise TypeError("Symbols and messages cannot be None")
+        for symbol in symbols:
+            if not isinstance(symbol, Symbol):
+                raise TypeError(
+                    "At least one specified symbol is not a valid symbol")
+            if len(symbol.messages) == 0:
+                raise ValueError(
+                    "Symbol {0} has no message to represent it.".format(
+                        symbol.name))
+        for m in messages:
+            if not isinstance(m, AbstractMessage):
+                raise TypeError(
+                    "At least one message ({0}) is not an AbstractMessage.".
+                    format(str(m)))
+
+        symbols = list(symbols)
+        if len(messages) == 0:
+            return symbols
+
+        # Each distinct new message is scored once against each representative
+        dedup = Deduplicator(messages, key=lambda message: message.data)
+        groups = dedup.getGroupsValues()
+        (nbSymbols, nbNew) = (len(symbols), len(groups))
+        bestSymbols = numpy.full(nbNew, -1, dtype=numpy.int64)
+        if nbSymbols > 0:
+            candidates = symbols + [Symbol(messages=[group[0]]) for group in groups]
+            wrapper = WrapperArgsFactory(
+                "_libScoreComputation.computeSimilarityMatrix")
+            wrapper.typeList[wrapper.function](candidates)
+            # the representative comes first in each pair (k, nbSymbols + u)
+            pairs = numpy.stack([
+                numpy.tile(numpy.arange(nbSymbols), nbNew),
+                numpy.repeat(numpy.arange(nbSymbols, nbSymbols + nbNew), nbSymbols)
+            ], axis=1)
+            bandWidth = self.bandWidth if self.bandWidth is not None else -1
+            abandonScore = float(self.minEquivalence) if self.earlyAbandon else 0.0
+            scores = self.__computePairScores(
+                candidates, wrapper, pairs, bandWidth,
+                abandonScore).reshape((nbNew, nbSymbols))
+            best = numpy.argmax(scores, axis=1)
+            matched = scores[numpy.arange(nbNew), best] >= self.minEquivalence
+            bestSymbols[matched] = best[matched]
+
+        updatedSymbols = set()
+        for (group, best) in zip(groups, bestSymbols.tolist()):
+            if best >= 0:
+                symbols[best].messages.extend(group)
+                updatedSymbols.add(best)
+        self._logger.debug(
+            "{0} distinct new messages out of {1} added to {2} symbols".format(
+                numpy.count_nonzero(bestSymbols >= 0), nbNew,
+                len(updatedSymbols)))
+
+        from netzob.Inference.Vocabulary.Format import Format
+        if realign:
+            for best in sorted(updatedSymbols):
+                Format.splitAligned(symbols[best], useSemantic=False)
+
+        remaining = [
+            message
+            for (group, best) in zip(groups, bestSymbols.tolist()) if best < 0
+            for message in group
+        ]
+        if len(remaining) > 0:
+            newSymbols = self._processUPGMA(remaining,
+                                            self.recomputeMatrixThreshold)
+            for symbol in newSymbols:
+                Format.splitAligned(symbol, useSemantic=False)
+            symbols.extend(newSymbols)
+
+        return symbols
+
+    @typeCheck(list)
+    def _computeSimilarityMatrix(self, symbols, earlyAbandon=None):
+        """Computes (in C) the similarity scores of each pair of symbols.
+        Scores are returned as a condensed matrix: the score of the
+        symbols i and j (with i < j) is at index n*i - i*(i+1)/2 + j - i - 1.
+        Rows of the matrix are computed by :attr:`nbThread` native threads.
+        If a :attr:`prefilter` is set, only the candidate pairs it finds
+        are aligned, other pairs get the score :attr:`DEFAULT_SCORE`.
+        Alignments are restricted to :attr:`bandWidth` and abandoned
+        following :attr:`earlyAbandon` (if not specified). If a
+        :attr:`cache` is set, only the pairs it does not know are aligned."""
         if symbols is None:
             raise TypeError("Symbols cannot be None")
         for symbol in symbols:
@@ -189,134 +381,231 @@ class ClusterByAlignment(object):
         wrapper.typeList[wrapper.function](symbols)
         self._logger.debug("wrapper = {0}".format(wrapper))
 
-        (listScores) = _libScoreComputation.computeSimilarityMatrix(
-            self.internalSlick, self._cb_executionStatus, self._isFinish,
-            debug, wrapper)
-        # Retrieve the scores for each association of symbols
-        scores = OrderedDict()
-        for (iuid, juid, score) in listScores:
-            if iuid not in list(scores.keys()):
-                scores[iuid] = OrderedDict()
-            if juid not in list(scores.keys()):
-                scores[juid] = OrderedDict()
-            scores[iuid][juid] = score
-            if iuid not in list(scores[juid].keys()):
-                scores[juid][iuid] = score
+        if earlyAbandon is None:
+            earlyAbandon = self.earlyAbandon
+        # the C extension uses -1 for no band and 0 to never abandon
+        bandWidth = self.bandWidth if self.bandWidth is not None else -1
+        abandonScore = float(self.minEquivalence) if earlyAbandon else 0.0
+
+        if self.prefilter is None and self.cache is None:
+            (listScores) = _libScoreComputation.computeSimilarityMatrix(
+                self.internalSlick, self._cb_executionStatus, self._isFinish,
+                debug, wrapper, self.nbThread, bandWidth, abandonScore)
+            # Scores are provided for each pair (i, j) with i < j, in this order
+            return numpy.fromiter(
+                (score for (iuid, juid, score) in listScores),
+                dtype=numpy.float64,
+                count=len(listScores))
+
+        nbSymbols = len(symbols)
+        if self.prefilter is not None:
+            pairs = self.prefilter.findCandidatePairs(
+                [symbol.messages[0].data for symbol in symbols])
+            self._logger.debug("Align {0} pairs of symbols out of {1}".format(
+                len(pairs), nbSymbols * (nbSymbols - 1) // 2))
+        else:
+            pairs = numpy.stack(numpy.triu_indices(nbSymbols, 1), axis=1)
+
+        scores = numpy.full(nbSymbols * (nbSymbols - 1) // 2,
+                            ClusterByAlignment.DEFAULT_SCORE,
+                            dtype=numpy.float64)
+        (i, j) = (pairs[:, 0], pairs[:, 1])
+        scores[nbSymbols * i - i * (i + 1) // 2 + j - i - 1] = \
+            self.__computePairScores(symbols, wrapper, pairs, bandWidth,
+                                     abandonScore)
         return scores
 
-    def _computePhylogenicTree(self, symbols, recomputeMatrixThreshold):
-        """Compute the phylogenic tree
-        @var max_i: uid of i_maximum
-        @var max_j: uid of j_maximum
-        @var maxScore: the highest global score"""
-        maxScore = 0
-        (float(100) - float(self.minEquivalence)) / float(100)
-        self.lastScore = None
+    def __computePairScores(self, symbols, wrapper, pairs, bandWidth,
+                            abandonScore):
+        """Computes (in C) the similarity scores of the specified pairs of
+        symbols, the scores known by the cache are not computed again."""
+        if self.cache is None:
+            return self.__alignPairs(wrapper, pairs, bandWidth, abandonScore)
+
+        parameters = "version={0};bandWidth={1};abandonScore={2!r}".format(
+            ClusterByAlignment.SCORES_VERSION, bandWidth, abandonScore)
+        # only the first message of a symbol is aligned
+        keys = [
+            self.cache.computeKey(symbol.messages[0].data,
+                                  symbol.messages[0].semanticTags)
+            for symbol in symbols
+        ]
+        scores = self.cache.getScores(parameters, keys, pairs)
+        missing = numpy.isnan(scores)
+        self._logger.debug("Align {0} pairs of symbols not in the cache".format(
+            numpy.count_nonzero(missing)))
+        if missing.any():
+            scores[missing] = self.__alignPairs(wrapper, pairs[missing],
+                                                bandWidth, abandonScore)
+            self.cache.setScores(parameters, keys, pairs[missing],
+                                 scores[missing])
+        return scores
 
-        if len(self.scores) > 1:
-            max_i = max(self.scores, key=lambda x: self.scores[x][max(self.scores[x], key=lambda y: self.scores[x][y])])
-            max_j = max(self.scores[max_i],
-                        key=lambda y: self.scores[max_i][y])
-            maxScore = self.scores[max_i][max_j]
-        while len(self.scores) > 1 and maxScore >= self.minEquivalence:
+    def __alignPairs(self, wrapper, pairs, bandWidth, abandonScore):
+        """Computes (in C) the similarity scores of the pairs of symbols."""
+        if len(pairs) == 0:
+            return numpy.zeros(0, dtype=numpy.float64)
+        listScores = _libScoreComputation.computeSimilarityScores(
+            self.internalSlick, self._cb_executionStatus, self._isFinish,
+            False, wrapper, self.nbThread,
+            numpy.ascontiguousarray(pairs, dtype=numpy.uint32).tobytes(),
+            bandWidth, abandonScore)
+        return numpy.array(listScores, dtype=numpy.float64)
+
+    def _computePhylogenicTree(self,
+                               symbols,
+                               recomputeMatrixThreshold,
+                               minEquivalence=None):
+        """Compute the phylogenic tree: the two most similar clusters are
+        merged until their score is lower than the minimum equivalence
+        (:attr:`minEquivalence` if not specified).
+
+        Clusters are stored in slots of the condensed score matrix, a
+        merged cluster reuses the slot of one of its children. The best
+        partner of each cluster is cached so that finding the two most
+        similar clusters does not require to scan the whole matrix.
+        Equal scores are resolved in favor of the oldest clusters."""
+        if minEquivalence is None:
+            minEquivalence = self.minEquivalence
+        self.lastScore = None
+        self.__initializeTree(symbols, self.scores)
 
-            symbols_uid = [str(s.id)
-                           for s in symbols]  # List of the UID in of symbols
-            (i_maximum, j_maximum) = (symbols_uid.index(max_i),
-                                      symbols_uid.index(max_j))
-            size_i = len(symbols[i_maximum].messages)
-            size_j = len(symbols[j_maximum].messages)
+        while self.__nbActive > 1:
+            bestScores = numpy.where(self.__active, self.__bestScores,
+                                     -numpy.inf)
+            maxScore = bestScores.max()
+            if maxScore < minEquivalence:
+                break
+            i = self.__oldest(numpy.flatnonzero(bestScores == maxScore))
+            j = self.__bestSlots[i]
 
             self._logger.debug("Clustering {0} with {1} (score = {2})".format(
-                str(i_maximum), str(j_maximum), str(maxScore)))
-
-            newuid = self._mergeEffectiveRowCol(symbols, i_maximum, j_maximum)
-            self._updateScore(symbols, max_i, max_j, newuid, size_i, size_j,
-                              recomputeMatrixThreshold)
-            #            self.log.debug("Score après: {0}".format(str(self.scores)))
-            if len(self.scores) > 1:
-                max_i = max(self.scores, key=lambda x: self.scores[x][max(self.scores[x], key=lambda y: self.scores[x][y])])
-                max_j = max(self.scores[max_i],
-                            key=lambda y: self.scores[max_i][y])
-                maxScore = self.scores[max_i][max_j]
+                str(i), str(j), str(maxScore)))
+
+            # Should we recompute the matrix
+            if self.lastScore is None:
+                self.lastScore = maxScore
+            recompute = recomputeMatrixThreshold is not None and abs(
+                maxScore - self.lastScore) > recomputeMatrixThreshold
+            self.lastScore = maxScore
+
+            self.__mergeSlots(i, j)
+            if recompute:
+                self._logger.debug(
+                    "Merge and recompute matrix similarity threshold")
+                symbols = self.__currentSymbols()
+                self.__initializeTree(
+                    symbols, self._computeSimilarityMatrix(symbols))
+
+        return self.__currentSymbols()
+
+    def __initializeTree(self, symbols, scores):
+        """Creates a slot for each symbol with the scores of the
+        similarity matrix."""
+        nbSymbols = len(symbols)
+        self.scores = scores
+        self.__nbSlots = nbSymbols
+        self.__nbActive = nbSymbols
+        # index (in the condensed matrix) of the scores of each row
+        slots = numpy.arange(nbSymbols, dtype=numpy.int64)
+        self.__rowStarts = nbSymbols * slots - slots * (slots + 1) // 2 - slots - 1
+        self.__active = numpy.ones(nbSymbols, dtype=bool)
+        self.__ages = slots.copy()
+        self.__nextAge = nbSymbols
+        self.__sizes = numpy.array(
+            [len(symbol.messages) for symbol in symbols], dtype=numpy.int64)
+        self.__symbols = list(symbols)
+        self.__messages = [None] * nbSymbols
+        # node of the tree in each slot, and children of each merge
+        self.__nodes = slots.copy()
+        self.__merges = []
+        self.__bestScores = numpy.full(nbSymbols, -numpy.inf)
+        self.__bestSlots = numpy.zeros(nbSymbols, dtype=numpy.int64)
+        for slot in range(nbSymbols):
+            self.__updateBest(slot)
+
+    def __row(self, slot):
+        """Returns the scores of the cluster in the slot with each slot."""
+        row = numpy.empty(self.__nbSlots, dtype=numpy.float64)
+        row[:slot] = self.scores[self.__rowStarts[:slot] + slot]
+        row[slot] = -numpy.inf
+        start = self.__rowStarts[slot]
+        row[slot + 1:] = self.scores[start + slot + 1:start + self.__nbSlots]
+        return row
+
+    def __setRow(self, slot, row):
+        """Stores the scores of the cluster in the slot with each slot."""
+        self.scores[self.__rowStarts[:slot] + slot] = row[:slot]
+        start = self.__rowStarts[slot]
+        self.scores[start + slot + 1:start + self.__nbSlots] = row[slot + 1:]
+
+    def __oldest(self, slots):
+        """Returns the slot of the oldest cluster among the specified ones."""
+        return slots[numpy.argmin(self.__ages[slots])]
+
+    def __updateBest(self, slot):
+        """Computes the best partner of the cluster in the slot."""
+        row = numpy.where(self.__active, self.__row(slot), -numpy.inf)
+        row[slot] = -numpy.inf
+        bestScore = row.max()
+        self.__bestScores[slot] = bestScore
+        self.__bestSlots[slot] = self.__oldest(numpy.flatnonzero(row == bestScore))
+
+    def __mergeSlots(self, i, j):
+        """Merges the cluster of the slot j in the one of the slot i and
+        updates the scores with the average of the merged clusters
+        (weighted by their size)."""
+        (size_i, size_j) = (int(self.__sizes[i]), int(self.__sizes[j]))
+        total_size = size_i + size_j
+        row = (size_i * self.__row(i) + size_j * self.__row(j)) / total_size
+
+        # messages of the youngest cluster come first
+        (older, younger) = (i, j) if self.__ages[i] < self.__ages[j] else (j, i)
+        self.__messages[i] = self.__slotMessages(younger) + self.__slotMessages(older)
+        self.__symbols[i] = None
+        self.__symbols[j] = None
+        self.__messages[j] = None
+        self.__merges.append((int(self.__nodes[younger]), int(self.__nodes[older])))
+        self.__nodes[i] = self.__nbSlots + len(self.__merges) - 1
+
+        self.__active[j] = False
+        self.__nbActive -= 1
+        self.__sizes[i] = total_size
+        self.__ages[i] = self.__nextAge
+        self.__nextAge += 1
+        self.__setRow(i, row)
+
+        # clusters whose best partner was merged are updated, the other
+        # ones only have to consider the new cluster (which is the youngest)
+        self.__updateBest(i)
+        others = numpy.flatnonzero(self.__active)
+        others = others[others != i]
+        outdated = (self.__bestSlots[others] == i) | (self.__bestSlots[others] == j)
+        for slot in others[outdated].tolist():
+            self.__updateBest(slot)
+        improved = others[~outdated]
+        improved = improved[row[improved] > self.__bestScores[improved]]
+        self.__bestScores[improved] = row[improved]
+        self.__bestSlots[improved] = i
+
+    def __slotMessages(self, slot):
+        """Returns the messages of the cluster in the slot."""
+        if self.__messages[slot] is not None:
+            return self.__messages[slot]
+        return list(self.__symbols[slot].messages)
+
+    def __currentSymbols(self):
+        """Returns the symbols of the remaining clusters, from the oldest
+        to the youngest."""
+        slots = numpy.flatnonzero(self.__active)
+        symbols = []
+        for slot in slots[numpy.argsort(self.__ages[slots], kind="stable")].tolist():
+            if self.__symbols[slot] is None:
+                self.__symbols[slot] = Symbol(messages=self.__messages[slot])
+                self.__messages[slot] = None
+            symbols.append(self.__symbols[slot])
         return symbols
 
-    def _mergeEffectiveRowCol(self, symbols, i_maximum, j_maximum):
-        """Merge the symbols i and j in the "symbols" structure
-        @param i_maximum: id of the first symbol to merge
-        @param j_maximum: id of the second symbol to merge
-        @return the newly created symbol result of the merged process"""
-        # Extract symbols i and j
-        if i_maximum > j_maximum:
-            symbol1 = symbols.pop(i_maximum)
-            symbol2 = symbols.pop(j_maximum)
-        else:
-            symbol1 = symbols.pop(j_maximum)
-            symbol2 = symbols.pop(i_maximum)
-
-        # Merge the symbols i and j
-        messages = []
-        messages.extend(symbol1.messages)
-        messages.extend(symbol2.messages)
-
-        newSymbol = Symbol(messages=messages)
-
-        # Append th new symbol to the "symbols" structure
-        symbols.append(newSymbol)
-
-        return str(newSymbol.id)
-
-    def _updateScore(self,
-                     symbols,
-                     iuid,
-                     juid,
-                     newuid,
-                     size_i,
-                     size_j,
-                     recomputeMatrixThreshold=None):
-        """Update the score of two merged clusters.
-        @param iuid: id of the first cluster merged
-        @param juid: id of the second cluster merged
-        @param newuid: new id of the merged cluster
-        @param size_i: size of the first cluster
-        @param size_j: size of the second cluster"""
-
-        self._logger.debug("Update score (recompte matrix : {0})".format(
-            recomputeMatrixThreshold))
-
-        currentScore = self.scores[iuid][juid]
-
-        # Delete row and col
-        del self.scores[iuid]
-        del self.scores[juid]
-        # Create a new col
-        self.scores[newuid] = OrderedDict()
-
-        # Should we recompute
-        if self.lastScore is None:
-            self.lastScore = currentScore
-
-        if recomputeMatrixThreshold is None or abs(
-                currentScore - self.lastScore) <= recomputeMatrixThreshold:
-            self._logger.debug("Ok no need in recomputing the matrix")
-
-            total_size = size_i + size_j
-
-            for k in list(self.scores.keys()):
-                if k != newuid:
-                    self.scores[k][newuid] = (
-                        size_i * self.scores[k][iuid] + size_j *
-                        self.scores[k][juid]) * 1.0 / total_size
-                    del self.scores[k][iuid]
-                    del self.scores[k][juid]
-                    self.scores[newuid][k] = self.scores[k][newuid]
-        else:
-            self._logger.debug(
-                "Merge and recompute matrix similarity threshold")
-            self.scores = self.computeSimilarityMatrix(symbols)
-
-        self.lastScore = currentScore
-
     def _cb_executionStatus(self, stage, donePercent, currentMessage):
         """Callback function called by the C extension to provide info on status
         @param donePercent: a float between 0 and 100 included
@@ -367,3 +656,145 @@ class ClusterByAlignment(object):
     @recomputeMatrixThreshold.setter
     def recomputeMatrixThreshold(self, recomputeMatrixThreshold):
         self.__recomputeMatrixThreshold = recomputeMatrixThreshold
+
+    @property
+    def nbThread(self):
+        """The number of threads used to compute the similarity matrix.
+        Scores do not depend on it.
+
+        If set to None, one thread per available cpu is used.
+
+        :type: :class:`int`
+        """
+        return self.__nbThread
+
+    @nbThread.setter
+    @typeCheck(int)
+    def nbThread(self, nbThread):
+        if nbThread is None:
+            nbThread = multiprocessing.cpu_count()
+
+        if nbThread <= 0:
+            raise ValueError(
+                "NbThread must be >0, use None to use all the available cpus.")
+
+        self.__nbThread = nbThread
+
+    @property
+    def prefilter(self):
+        """If set, the prefilter (such as a
+        :class:`netzob.Inference.Vocabulary.FormatOperations.MinHashLSH.MinHashLSH`)
+        finds the pairs of messages likely to be similar and only these
+        pairs are aligned. This makes the computation of the scores
+        almost linear on heterogeneous messages, at the risk of missing
+        some similar pairs.
+
+        >>> from netzob.all import *
+        >>> from netzob.Inference.Vocabulary.FormatOperations.MinHashLSH import MinHashLSH
+        >>> messages = [RawMessage("hello {0}, what's up in {1} ?".format(pseudo, city).encode('utf-8')) for pseudo in ["zoby", "toto"] for city in ["Paris", "Munich"]]
+        >>> messages += [RawMessage("My ip address is {0}".format(ip).encode('utf-8')) for ip in ["192.168.0.10", "10.120.121.212"]]
+        >>> symbols = ClusterByAlignment(prefilter=MinHashLSH()).cluster(messages)
+        >>> print([len(symbol.messages) for symbol in symbols])
+        [4, 2]
+        """
+        return self.__prefilter
+
+    @prefilter.setter
+    def prefilter(self, prefilter):
+        self.__prefilter = prefilter
+
+    @property
+    def bandWidth(self):
+        """If set, the alignment of two messages only considers the
+        diagonals of the dynamic programming matrix close to the one
+        joining its corners: the band covers the difference of length of
+        the messages plus bandWidth diagonals (of half-bytes) on each side.
+        The memory and the time required to align two messages become
+        linear in their length, but the alignment may be suboptimal if
+        their common parts are shifted by more than the band.
+
+        If set to None, the whole matrix is computed.
+
+        >>> from netzob.all import *
+        >>> messages = [RawMessage("hello {0}, what's up in {1} ?".format(pseudo, city).encode('utf-8')) for pseudo in ["zoby", "toto"] for city in ["Paris", "Munich"]]
+        >>> messages += [RawMessage("My ip address is {0}".format(ip).encode('utf-8')) for ip in ["192.168.0.10", "10.120.121.212"]]
+        >>> symbols = ClusterByAlignment(bandWidth=4).cluster(messages)
+        >>> print([len(symbol.messages) for symbol in symbols])
+        [4, 2]
+
+        :type: :class:`int`
+        """
+        return self.__bandWidth
+
+    @bandWidth.setter
+    @typeCheck(int)
+    def bandWidth(self, bandWidth):
+        if bandWidth is not None and bandWidth < 0:
+            raise ValueError(
+                "BandWidth must be >=0, use None to compute the whole matrix.")
+        self.__bandWidth = bandWidth
+
+    @property
+    def earlyAbandon(self):
+        """If active, the alignment of two messages stops as soon as their
+        score can not reach the :attr:`minEquivalence` anymore and the pair
+        gets the score :attr:`DEFAULT_SCORE`. Clusters are unchanged
+        unless the score of a merged cluster is averaged with such a pair.
+        As the score also depends on the ratio of static and dynamic parts
+        (that are only known at the end), it is only effective for high
+        minimum equivalences.
+
+        >>> from netzob.all import *
+        >>> pseudos = ["zoby", "ditrich", "toto", "carlito"]
+        >>> cities = ["Paris", "Munich", "Barcelone", "Vienne"]
+        >>> messages = [RawMessage("hello {0}, what's up in {1} ?".format(pseudo, city).encode('utf-8')) for pseudo in pseudos for city in cities]
+        >>> messages += [RawMessage("Your name is {0} and city is {1}".format(pseudo, city).encode('utf-8')) for pseudo in pseudos for city in cities]
+        >>> exact = ClusterByAlignment(minEquivalence=85)._processUPGMA(messages)
+        >>> clustering = ClusterByAlignment(minEquivalence=85, earlyAbandon=True)
+        >>> bounded = clustering._processUPGMA(messages)
+        >>> [len(s.messages) for s in exact] == [len(s.messages) for s in bounded]
+        True
+
+        :type: :class:`bool`
+        """
+        return self.__earlyAbandon
+
+    @earlyAbandon.setter
+    @typeCheck(bool)
+    def earlyAbandon(self, earlyAbandon):
+        if earlyAbandon is None:
+            raise TypeError("EarlyAbandon cannot be None")
+        self.__earlyAbandon = earlyAbandon
+
+    @property
+    def cache(self):
+        """If set, the similarity scores are stored in this
+        :class:`netzob.Inference.Vocabulary.FormatOperations.SimilarityCache.SimilarityCache`
+        under the content of the messages and the parameters of their
+        alignment (:attr:`bandWidth` and, if :attr:`earlyAbandon` is
+        active, :attr:`minEquivalence`). A clustering of the same messages
+        only aligns the pairs the cache does not know: new messages should
+        be added after the previous ones, as the score of a pair depends on
+        the order of its messages.
+
+        >>> from netzob.all import *
+        >>> from netzob.Inference.Vocabulary.FormatOperations.SimilarityCache import SimilarityCache
+        >>> messages = [RawMessage("hello {0}, what's up in {1} ?".format(pseudo, city).encode('utf-8')) for pseudo in ["zoby", "toto"] for city in ["Paris", "Munich"]]
+        >>> messages += [RawMessage("My ip address is {0}".format(ip).encode('utf-8')) for ip in ["192.168.0.10", "10.120.121.212"]]
+        >>> cache = SimilarityCache()
+        >>> symbols = ClusterByAlignment(cache=cache).cluster(messages[:4])
+        >>> len(cache)
+        6
+        >>> symbols = ClusterByAlignment(cache=cache).cluster(messages)
+        >>> len(cache)
+        15
+        >>> print([len(symbol.messages) for symbol in symbols])
+        [4, 2]
+
+        :type: :class:`netzob.Inference.Vocabulary.FormatOperations.SimilarityCache.SimilarityCache`
+        """
+        return self.__cache
+
+    @cache.setter
+    def cache(self, cache):
+        self.__cache = cache
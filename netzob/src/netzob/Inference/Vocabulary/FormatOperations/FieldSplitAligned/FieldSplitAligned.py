@@ -36,11 +36,18 @@
 #| Standard library imports
 #+---------------------------------------------------------------------------+
 from collections import OrderedDict
+import multiprocessing
+
+#+---------------------------------------------------------------------------+
+#| Related third party imports
+#+---------------------------------------------------------------------------+
+import numpy
 
 #+---------------------------------------------------------------------------+
 #| Local application imports
 #+---------------------------------------------------------------------------+
 from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
+from netzob.Common.Utils.Deduplicator import Deduplicator
 from netzob.Model.Vocabulary.AbstractField import AbstractField
 from netzob.Common.C_Extensions.WrapperArgsFactory import WrapperArgsFactory
 from netzob.Model.Vocabulary.Types.AbstractType import AbstractType
@@ -111,6 +118,21 @@ class FieldSplitAligned(object):
     'hello ' | 'sygus'  | ", what's up in " | 'Germany' | ' ?' 
     -------- | -------- | ----------------- | --------- | -----
 
+    Messages can also be aligned following a guide tree, the most similar
+    ones being aligned first (see :attr:`useGuideTree`)
+
+    >>> messages = [RawMessage(data=sample) for sample in reversed(samples)]
+    >>> symbol = Symbol(messages=messages)
+    >>> fs = FieldSplitAligned(useGuideTree=True, nbThread=2)
+    >>> fs.execute(symbol, useSemantic = False)
+    >>> print(symbol)
+    Field    | Field    | Field             | Field     | Field
+    -------- | -------- | ----------------- | --------- | -----
+    'hello ' | 'sygus'  | ", what's up in " | 'Germany' | ' ?' 
+    'hello ' | 'netzob' | ", what's up in " | 'UK'      | ' ?' 
+    'hello ' | 'toto'   | ", what's up in " | 'France'  | ' ?' 
+    -------- | -------- | ----------------- | --------- | -----
+
     # Let's illustrate the use of semantic constrained sequence alignment with a simple example
 
     >>> samples = [b"John-0108030405--john.doe@gmail.com", b"Mathieu-0908070605-31 rue de Paris, 75000 Paris, France-mat@yahoo.fr", b"Olivia-0348234556-7 allee des peupliers, 13000 Marseille, France-olivia.tortue@hotmail.fr"]
@@ -165,12 +187,18 @@ class FieldSplitAligned(object):
     """
 
     def __init__(self, unitSize=AbstractType.UNITSIZE_8,
-                 doInternalSlick=False):
+                 doInternalSlick=False,
+                 useGuideTree=False,
+                 nbThread=None,
+                 bandWidth=None):
         """Constructor.
 
         """
         self.doInternalSlick = doInternalSlick
         self.unitSize = unitSize
+        self.useGuideTree = useGuideTree
+        self.nbThread = nbThread
+        self.bandWidth = bandWidth
 
     @typeCheck(AbstractField, bool)
     def execute(self, field, useSemantic=True):
@@ -195,8 +223,11 @@ class FieldSplitAligned(object):
         # Semantic tags (a.k.a applicative data)
         semanticTags = None
         if useSemantic:
+            # a single search engine reuses its search automaton
+            # between messages sharing the same applicative data
+            searchEngine = SearchEngine()
             semanticTags = [
-                self.__searchApplicativeDataInMessage(message)
+                self.__searchApplicativeDataInMessage(message, searchEngine)
                 for message, values in list(messageValues.items())
             ]
 
@@ -386,17 +417,32 @@ class FieldSplitAligned(object):
             raise TypeError(
                 "There should be a list of semantic tags for each value")
 
+        # Identical values (with identical tags) do not change the
+        # alignment, each of them is only aligned once
+        dedup = Deduplicator(
+            list(zip(values, semanticTags)),
+            key=lambda valueTags: (valueTags[0], tuple(valueTags[1].items())))
+        self._logger.debug("Align {0} distinct values out of {1}".format(
+            dedup.nbUniqueValues, len(values)))
+
         # Prepare the argument to send to the C wrapper
-        toSend = [(values[iValue], semanticTags[iValue])
-                  for iValue in range(len(values))]
+        toSend = dedup.uniqueValues
 
         wrapper = WrapperArgsFactory("_libNeedleman.alignMessages")
         wrapper.typeList[wrapper.function](toSend)
 
         debug = False
+        guideTree = None
+        if self.useGuideTree:
+            guideTree = self._computeGuideTree(
+                [value for (value, tags) in toSend])
+            guideTree = guideTree.astype(numpy.uint32).tobytes()
+        # the C extension uses -1 for no band
+        bandWidth = self.bandWidth if self.bandWidth is not None else -1
         (score1, score2, score3, regex, mask,
          semanticTags) = _libNeedleman.alignMessages(
-             self.doInternalSlick, self._cb_executionStatus, debug, wrapper)
+             self.doInternalSlick, self._cb_executionStatus, debug, wrapper,
+             guideTree, self.nbThread, bandWidth)
         scores = (score1, score2, score3)
 
         # Deserialize returned info
@@ -405,14 +451,32 @@ class FieldSplitAligned(object):
                                                      self.unitSize)
         return (alignment, semanticTags, scores)
 
+    def _computeGuideTree(self, values):
+        """Computes the tree that guides the progressive alignment of the
+        values: the UPGMA tree of the clustering by alignment (see
+        :meth:`netzob.Inference.Vocabulary.FormatOperations.ClusterByAlignment.ClusterByAlignment.computeGuideTree`).
+
+        :parameter values: values to align
+        :type values: a list of :class:`bytes`
+        :rtype: :class:`numpy.ndarray`
+        """
+        from netzob.Model.Vocabulary.Messages.RawMessage import RawMessage
+        from netzob.Inference.Vocabulary.FormatOperations.ClusterByAlignment import ClusterByAlignment
+        clustering = ClusterByAlignment(
+            nbThread=self.nbThread, bandWidth=self.bandWidth)
+        return clustering.computeGuideTree(
+            [RawMessage(value) for value in values])
+
     @typeCheck(AbstractMessage)
-    def __searchApplicativeDataInMessage(self, message):
+    def __searchApplicativeDataInMessage(self, message, searchEngine=None):
         """This internal method search any applicative data that could be identified
         in the specified message and returns results in a dict that shows the position
         of the applicative data identified.
 
         :parameter message: the message in which we search any applicative data
         :type message: :class:`netzob.Model.Vocabulary.Messages.AbstractMessage.AbstractMessage`
+        :keyword searchEngine: the search engine to use, a new one is created if not specified
+        :type searchEngine: :class:`netzob.Inference.Vocabulary.Search.SearchEngine.SearchEngine`
         :return: a dict that describes the position of identified applicative data
         :rtype: :class:`dict`
         """
@@ -433,7 +497,9 @@ class FieldSplitAligned(object):
             )
 
         if len(appValues) > 0:
-            searchResults = SearchEngine.searchInMessage(
+            if searchEngine is None:
+                searchEngine = SearchEngine()
+            searchResults = searchEngine.searchDataInMessage(
                 list(appValues.keys()), message, addTags=False)
             for searchResult in searchResults:
                 for (startResultRange, endResultRange) in searchResult.ranges:
@@ -715,6 +781,80 @@ class FieldSplitAligned(object):
             raise TypeError("doInternalSlick cannot be None")
         self.__doInternalSlick = doInternalSlick
 
+    @property
+    def useGuideTree(self):
+        """If active, messages are aligned following their UPGMA tree
+        (see :meth:`_computeGuideTree`): the two most similar messages (or
+        alignments) are aligned first. The result does not depend on the
+        order of the messages and independent subtrees are aligned in
+        parallel, but it requires the similarity scores of all the pairs
+        of distinct values. Otherwise, each message is aligned in turn
+        with the alignment of the previous ones.
+
+        :type: :class:`bool`
+        """
+        return self.__useGuideTree
+
+    @useGuideTree.setter
+    @typeCheck(bool)
+    def useGuideTree(self, useGuideTree):
+        if useGuideTree is None:
+            raise TypeError("useGuideTree cannot be None")
+        self.__useGuideTree = useGuideTree
+
+    @property
+    def nbThread(self):
+        """The number of threads used to compute the guide tree and to
+        align its nodes. The alignment does not depend on it.
+
+        If set to None, one thread per available cpu is used.
+
+        :type: :class:`int`
+        """
+        return self.__nbThread
+
+    @nbThread.setter
+    @typeCheck(int)
+    def nbThread(self, nbThread):
+        if nbThread is None:
+            nbThread = multiprocessing.cpu_count()
+
+        if nbThread <= 0:
+            raise ValueError(
+                "NbThread must be >0, use None to use all the available cpus.")
+
+        self.__nbThread = nbThread
+
+    @property
+    def bandWidth(self):
+        """If set, alignments are restricted to a band of diagonals around
+        the difference of length of the aligned sequences (see
+        :attr:`netzob.Inference.Vocabulary.FormatOperations.ClusterByAlignment.ClusterByAlignment.bandWidth`).
+        This makes the alignment of long messages tractable.
+
+        If set to None, the whole matrix is computed.
+
+        >>> from netzob.all import *
+        >>> messages = [RawMessage(b"HEADER" + bytes([i]) * (100 + i) + b"TRAILER") for i in range(3)]
+        >>> symbol = Symbol(messages=messages)
+        >>> FieldSplitAligned(bandWidth=8).execute(symbol)
+        >>> print(len(symbol.fields))
+        3
+        >>> print(symbol.fields[0].getValues(), symbol.fields[2].getValues())
+        [b'HEADER', b'HEADER', b'HEADER'] [b'TRAILER', b'TRAILER', b'TRAILER']
+
+        :type: :class:`int`
+        """
+        return self.__bandWidth
+
+    @bandWidth.setter
+    @typeCheck(int)
+    def bandWidth(self, bandWidth):
+        if bandWidth is not None and bandWidth < 0:
+            raise ValueError(
+                "BandWidth must be >=0, use None to compute the whole matrix.")
+        self.__bandWidth = bandWidth
+
     @property
     def unitSize(self):
         return self.__unitSize
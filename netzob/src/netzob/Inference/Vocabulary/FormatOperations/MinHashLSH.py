@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+# +---------------------------------------------------------------------------+
+# |          01001110 01100101 01110100 01111010 01101111 01100010            |
+# |                                                                           |
+# |               Netzob : Inferring communication protocols                  |
+# +---------------------------------------------------------------------------+
+# | Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+# | This program is free software: you can redistribute it and/or modify      |
+# | it under the terms of the GNU General Public License as published by      |
+# | the Free Software Foundation, either version 3 of the License, or         |
+# | (at your option) any later version.                                       |
+# |                                                                           |
+# | This program is distributed in the hope that it will be useful,           |
+# | but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+# | MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+# | GNU General Public License for more details.                              |
+# |                                                                           |
+# | You should have received a copy of the GNU General Public License         |
+# | along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+# +---------------------------------------------------------------------------+
+# | @url      : http://www.netzob.org                                         |
+# | @contact  : contact@netzob.org                                            |
+# | @sponsors : Amossys, http://www.amossys.fr                                |
+# |             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+# +---------------------------------------------------------------------------+
+
+
+# +---------------------------------------------------------------------------+
+# | Standard library imports                                                  |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | Related third party imports                                               |
+# +---------------------------------------------------------------------------+
+import numpy
+
+# +---------------------------------------------------------------------------+
+# | Local application imports                                                 |
+# +---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
+
+
+@NetzobLogger
+class MinHashLSH(object):
+    """Finds the pairs of messages that are likely to be similar, without
+    comparing every pair of messages.
+
+    Each message is sketched with a MinHash signature of its byte n-grams
+    (two messages share a value of their signatures with a probability
+    equal to the Jaccard similarity of their n-grams). Signatures are
+    split in `nbBands` bands of `bandSize` values and the messages that
+    share a band are considered as candidates (locality-sensitive
+    hashing). Pairs of messages with a Jaccard similarity around
+    (1/nbBands)^(1/bandSize) have one chance out of two to be found,
+    more similar pairs are almost always found.
+
+    >>> from netzob.Inference.Vocabulary.FormatOperations.MinHashLSH import MinHashLSH
+    >>> datas = [b"GET /index.html HTTP/1.1", b"GET /image.png HTTP/1.1", b"\x01\x02\x03\x04", b"\x01\x02\x03\x05", b"GET /index.htm HTTP/1.0"]
+    >>> print(MinHashLSH().findCandidatePairs(datas).tolist())
+    [[0, 1], [0, 4], [1, 4], [2, 3]]
+
+    """
+
+    # Hash functions are computed modulo this (Mersenne) prime
+    PRIME = (1 << 31) - 1
+
+    def __init__(self, ngramSize=3, nbBands=20, bandSize=3, seed=0):
+        """Constructor.
+
+        :param ngramSize: the size (in bytes, at most 7) of the n-grams
+        :type ngramSize: :class:`int`
+        :param nbBands: the number of bands of the signatures
+        :type nbBands: :class:`int`
+        :param bandSize: the number of values in each band
+        :type bandSize: :class:`int`
+        :param seed: the seed of the hash functions
+        :type seed: :class:`int`
+        """
+        if not 0 < ngramSize <= 7:
+            raise ValueError("The size of the n-grams must be between 1 and 7.")
+        if nbBands <= 0 or bandSize <= 0:
+            raise ValueError("The number and the size of the bands must be positive.")
+        self.ngramSize = ngramSize
+        self.nbBands = nbBands
+        self.bandSize = bandSize
+        random = numpy.random.RandomState(seed)
+        nbHashes = nbBands * bandSize
+        self.__a = random.randint(1, MinHashLSH.PRIME, size=nbHashes).astype(numpy.uint64)
+        self.__b = random.randint(0, MinHashLSH.PRIME, size=nbHashes).astype(numpy.uint64)
+
+    @typeCheck(list)
+    def findCandidatePairs(self, datas):
+        """Returns the pairs of messages that share at least a band of
+        their signatures.
+
+        :param datas: the content of the messages
+        :type datas: a list of :class:`bytes`
+        :return: the indexes (i, j) of each candidate pair, with i < j, sorted
+        :rtype: a :class:`numpy.ndarray` of shape (nbPairs, 2)
+        """
+        signatures = numpy.array([self.computeSignature(data) for data in datas],
+                                 dtype=numpy.uint64).reshape(len(datas), -1)
+
+        pairCodes = []
+        for band in range(self.nbBands):
+            values = signatures[:, band * self.bandSize:(band + 1) * self.bandSize]
+            # messages are grouped by the values of their band
+            (_, buckets) = numpy.unique(values, axis=0, return_inverse=True)
+            order = numpy.argsort(buckets, kind="stable")
+            bounds = numpy.flatnonzero(numpy.diff(buckets[order])) + 1
+            for members in numpy.split(order, bounds):
+                if len(members) > 1:
+                    (i, j) = numpy.triu_indices(len(members), 1)
+                    pairCodes.append(members[i] * len(datas) + members[j])
+
+        if len(pairCodes) == 0:
+            return numpy.zeros((0, 2), dtype=numpy.int64)
+        pairCodes = numpy.unique(numpy.concatenate(pairCodes))
+        self._logger.debug("{0} candidate pairs found among {1} messages".format(
+            len(pairCodes), len(datas)))
+        return numpy.stack([pairCodes // len(datas), pairCodes % len(datas)], axis=1)
+
+    def computeSignature(self, data):
+        """Returns the MinHash signature of the n-grams of the data.
+
+        :param data: the content of a message
+        :type data: :class:`bytes`
+        :rtype: a :class:`numpy.ndarray` of nbBands * bandSize values
+        """
+        ngrams = self.__ngrams(data)
+        if len(ngrams) == 0:
+            return numpy.full(len(self.__a), MinHashLSH.PRIME, dtype=numpy.uint64)
+        hashes = (self.__a[:, None] * ngrams[None, :] + self.__b[:, None]) % MinHashLSH.PRIME
+        return hashes.min(axis=1)
+
+    def __ngrams(self, data):
+        """Returns the distinct n-grams of the data (as integers reduced
+        modulo the prime)."""
+        values = numpy.frombuffer(bytes(data), dtype=numpy.uint8).astype(numpy.uint64)
+        if len(values) == 0:
+            return numpy.zeros(0, dtype=numpy.uint64)
+        if len(values) < self.ngramSize:
+            # the whole message is used, its size distinguishes it from n-grams
+            ngram = len(values) + 1
+            for value in bytes(data):
+                ngram = (ngram << 8) | value
+            return numpy.array([ngram % MinHashLSH.PRIME], dtype=numpy.uint64)
+        nbNgrams = len(values) - self.ngramSize + 1
+        ngrams = numpy.zeros(nbNgrams, dtype=numpy.uint64)
+        for k in range(self.ngramSize):
+            ngrams = (ngrams << numpy.uint64(8)) | values[k:k + nbNgrams]
+        return numpy.unique(ngrams % numpy.uint64(MinHashLSH.PRIME))
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+
+# +---------------------------------------------------------------------------+
+# |          01001110 01100101 01110100 01111010 01101111 01100010            |
+# |                                                                           |
+# |               Netzob : Inferring communication protocols                  |
+# +---------------------------------------------------------------------------+
+# | Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+# | This program is free software: you can redistribute it and/or modify      |
+# | it under the terms of the GNU General Public License as published by      |
+# | the Free Software Foundation, either version 3 of the License, or         |
+# | (at your option) any later version.                                       |
+# |                                                                           |
+# | This program is distributed in the hope that it will be useful,           |
+# | but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+# | MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+# | GNU General Public License for more details.                              |
+# |                                                                           |
+# | You should have received a copy of the GNU General Public License         |
+# | along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+# +---------------------------------------------------------------------------+
+# | @url      : http://www.netzob.org                                         |
+# | @contact  : contact@netzob.org                                            |
+# | @sponsors : Amossys, http://www.amossys.fr                                |
+# |             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+# +---------------------------------------------------------------------------+
+
+
+# +---------------------------------------------------------------------------+
+# | Standard library imports                                                  |
+# +---------------------------------------------------------------------------+
+import hashlib
+import sqlite3
+
+# +---------------------------------------------------------------------------+
+# | Related third party imports                                               |
+# +---------------------------------------------------------------------------+
+import numpy
+
+# +---------------------------------------------------------------------------+
+# | Local application imports                                                 |
+# +---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
+
+
+@NetzobLogger
+class SimilarityCache(object):
+    """Stores the similarity scores of pairs of messages in a sqlite
+    database, so that a clustering of the same messages (or of a few
+    more messages) only aligns the pairs it has never seen.
+
+    A score is stored under the content hashes of the two messages (see
+    :meth:`computeKey`) and the parameters of the alignment that produced
+    it. As the alignment of a and b may not have exactly the same score
+    than the one of b and a, pairs are oriented: the score of (a, b) is
+    not used for (b, a).
+
+    >>> import numpy
+    >>> from netzob.Inference.Vocabulary.FormatOperations.SimilarityCache import SimilarityCache
+    >>> cache = SimilarityCache()
+    >>> keys = [SimilarityCache.computeKey(data) for data in [b"hello", b"hallo", b"bye"]]
+    >>> pairs = numpy.array([[0, 1], [0, 2], [1, 2]])
+    >>> cache.getScores("params", keys, pairs).tolist()
+    [nan, nan, nan]
+    >>> cache.setScores("params", keys, pairs[:2], [80.0, 12.5])
+    >>> cache.getScores("params", keys, pairs).tolist()
+    [80.0, 12.5, nan]
+    >>> cache.getScores("other params", keys, pairs).tolist()
+    [nan, nan, nan]
+    >>> cache.getScores("params", keys, numpy.array([[1, 0]])).tolist()
+    [nan]
+    >>> len(cache)
+    2
+
+    """
+
+    def __init__(self, path=":memory:"):
+        """Constructor.
+
+        :param path: the file of the database, it is created if it does
+                     not exist (the default database only lives in memory)
+        :type path: :class:`str`
+        """
+        self.__path = path
+        self.__connection = sqlite3.connect(path)
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS scores (parameters TEXT, key1 BLOB, "
+            "key2 BLOB, score REAL, PRIMARY KEY (parameters, key1, key2))")
+        self.__connection.commit()
+
+    @staticmethod
+    def computeKey(data, semanticTags=None):
+        """Returns the content hash of a message.
+
+        >>> from netzob.Inference.Vocabulary.FormatOperations.SimilarityCache import SimilarityCache
+        >>> len(SimilarityCache.computeKey(b"hello"))
+        20
+        >>> SimilarityCache.computeKey(b"hello") == SimilarityCache.computeKey(b"hello", {0: "str"})
+        False
+
+        :param data: the content of the message
+        :type data: :class:`bytes`
+        :param semanticTags: the semantic tags of the message (by position)
+        :type semanticTags: :class:`dict`
+        :rtype: :class:`bytes`
+        """
+        sha = hashlib.sha1()
+        sha.update(len(data).to_bytes(8, "big"))
+        sha.update(bytes(data))
+        if semanticTags:
+            tags = sorted((position, str(tag))
+                          for (position, tag) in semanticTags.items())
+            sha.update(repr(tags).encode("utf-8"))
+        return sha.digest()
+
+    @typeCheck(str, list)
+    def getScores(self, parameters, keys, pairs):
+        """Returns the stored scores of the pairs of messages.
+
+        :param parameters: the parameters of the alignments
+        :type parameters: :class:`str`
+        :param keys: the key of each message (see :meth:`computeKey`)
+        :type keys: a list of :class:`bytes`
+        :param pairs: the indexes (i, j) of the messages of each pair
+        :type pairs: a :class:`numpy.ndarray` of shape (nbPairs, 2)
+        :return: the score of each pair, NaN if it is not stored
+        :rtype: a :class:`numpy.ndarray` of float
+        """
+        scores = numpy.full(len(pairs), numpy.nan, dtype=numpy.float64)
+        if len(pairs) == 0:
+            return scores
+        (ids, distinctKeys) = self.__identify(keys)
+
+        # stored scores of the pairs of the specified messages
+        cursor = self.__connection.cursor()
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS query_keys "
+                       "(key BLOB PRIMARY KEY, id INTEGER)")
+        cursor.execute("DELETE FROM query_keys")
+        cursor.executemany("INSERT INTO query_keys VALUES (?, ?)",
+                           ((key, i) for (i, key) in enumerate(distinctKeys)))
+        cursor.execute(
+            "SELECT k1.id, k2.id, s.score FROM query_keys k1 "
+            "JOIN scores s ON s.parameters = ? AND s.key1 = k1.key "
+            "JOIN query_keys k2 ON s.key2 = k2.key", (parameters, ))
+        rows = numpy.array(cursor.fetchall(), dtype=numpy.float64).reshape(-1, 3)
+        cursor.execute("DELETE FROM query_keys")
+        if len(rows) == 0:
+            return scores
+
+        # pairs are matched by the code of their keys
+        nbKeys = len(distinctKeys)
+        storedCodes = rows[:, 0].astype(numpy.int64) * nbKeys + rows[:, 1].astype(numpy.int64)
+        order = numpy.argsort(storedCodes)
+        (storedCodes, storedScores) = (storedCodes[order], rows[order, 2])
+        codes = self.__codes(ids, pairs, nbKeys)
+        positions = numpy.minimum(
+            numpy.searchsorted(storedCodes, codes), len(storedCodes) - 1)
+        found = storedCodes[positions] == codes
+        scores[found] = storedScores[positions[found]]
+        self._logger.debug("{0} scores found out of {1}".format(
+            numpy.count_nonzero(found), len(pairs)))
+        return scores
+
+    @typeCheck(str, list)
+    def setScores(self, parameters, keys, pairs, scores):
+        """Stores the scores of the pairs of messages.
+
+        :param parameters: the parameters of the alignments
+        :type parameters: :class:`str`
+        :param keys: the key of each message (see :meth:`computeKey`)
+        :type keys: a list of :class:`bytes`
+        :param pairs: the indexes (i, j) of the messages of each pair
+        :type pairs: a :class:`numpy.ndarray` of shape (nbPairs, 2)
+        :param scores: the score of each pair
+        :type scores: a list of float
+        """
+        if len(pairs) != len(scores):
+            raise ValueError("There should be a score for each pair.")
+        pairs = numpy.asarray(pairs).tolist()
+        self.__connection.executemany(
+            "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)",
+            ((parameters, keys[i], keys[j], float(score))
+             for ((i, j), score) in zip(pairs, scores)))
+        self.__connection.commit()
+
+    def clear(self):
+        """Removes all the stored scores."""
+        self.__connection.execute("DELETE FROM scores")
+        self.__connection.commit()
+
+    def close(self):
+        """Closes the database."""
+        self.__connection.close()
+
+    def __len__(self):
+        (count, ) = self.__connection.execute(
+            "SELECT COUNT(*) FROM scores").fetchone()
+        return count
+
+    def __identify(self, keys):
+        """Returns the identifier of the key of each message and the
+        distinct keys."""
+        identifiers = {}
+        ids = numpy.array(
+            [identifiers.setdefault(key, len(identifiers)) for key in keys],
+            dtype=numpy.int64)
+        distinctKeys = [None] * len(identifiers)
+        for (key, i) in identifiers.items():
+            distinctKeys[i] = key
+        return (ids, distinctKeys)
+
+    def __codes(self, ids, pairs, nbKeys):
+        """Returns a code for each pair of keys."""
+        pairs = numpy.asarray(pairs, dtype=numpy.int64)
+        return ids[pairs[:, 0]] * nbKeys + ids[pairs[:, 1]]
+
+    @property
+    def path(self):
+        """The file of the database.
+
+        :type: :class:`str`
+        """
+        return self.__path
@@ -0,0 +1,205 @@
+#-*- coding: utf-8 -*-
+
+#+---------------------------------------------------------------------------+
+#|          01001110 01100101 01110100 01111010 01101111 01100010            |
+#|                                                                           |
+#|               Netzob : Inferring communication protocols                  |
+#+---------------------------------------------------------------------------+
+#| Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+#| This program is free software: you can redistribute it and/or modify      |
+#| it under the terms of the GNU General Public License as published by      |
+#| the Free Software Foundation, either version 3 of the License, or         |
+#| (at your option) any later version.                                       |
+#|                                                                           |
+#| This program is distributed in the hope that it will be useful,           |
+#| but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+#| MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+#| GNU General Public License for more details.                              |
+#|                                                                           |
+#| You should have received a copy of the GNU General Public License         |
+#| along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+#+---------------------------------------------------------------------------+
+#| @url      : http://www.netzob.org                                         |
+#| @contact  : contact@netzob.org                                            |
+#| @sponsors : Amossys, http://www.amossys.fr                                |
+#|             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| File contributors :                                                       |
+#|       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+#|       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Standard library imports                                                  |
+#+---------------------------------------------------------------------------+
+from collections import deque
+
+#+---------------------------------------------------------------------------+
+#| Related third party imports                                               |
+#+---------------------------------------------------------------------------+
+from bitarray import bitarray
+
+#+---------------------------------------------------------------------------+
+#| Local application imports                                                 |
+#+---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import NetzobLogger
+
+
+@NetzobLogger
+class PatternAutomaton(object):
+    """An Aho-Corasick automaton that finds the occurrences of many bit
+    patterns with a single scan of the target.
+
+    The automaton works on bytes. Since a pattern may start at any bit
+    offset of the target, each pattern is registered once per possible
+    shift: for a shift `h`, the key is the sequence of complete bytes
+    found in the pattern after its first `h` bits. A key matched in the
+    bytes of the target gives a candidate position that is then verified
+    against the whole pattern. Patterns too short to contain a complete
+    byte for every shift are searched with :meth:`bitarray.search`.
+
+    Results are the start positions (in bits) of every occurrence,
+    including overlapping ones, like :meth:`bitarray.search` would return.
+
+    >>> from bitarray import bitarray
+    >>> from netzob.all import *
+    >>> from netzob.Inference.Vocabulary.Search.PatternAutomaton import PatternAutomaton
+    >>> patterns = [TypeConverter.convert(b"netzob", Raw, BitArray),
+    ...             TypeConverter.convert(b"zob", Raw, BitArray),
+    ...             bitarray('0110')]
+    >>> automaton = PatternAutomaton(patterns)
+    >>> target = TypeConverter.convert(b"netzob! zob", Raw, BitArray)
+    >>> automaton.search(target)
+    [[0], [24, 64], [0, 8, 32, 40, 72, 80]]
+    >>> [list(target.search(pattern)) for pattern in patterns]
+    [[0], [24, 64], [0, 8, 32, 40, 72, 80]]
+
+    Patterns are found wherever they start, even across byte boundaries,
+    and whatever the endianness of their bitarray.
+
+    >>> shifted = bitarray('101') + TypeConverter.convert(b"netzob", Raw, BitArray)
+    >>> automaton.search(shifted)
+    [[3], [27], [3, 11, 35, 43]]
+    >>> automaton = PatternAutomaton([bitarray('0110111001100101', endian='little')])
+    >>> automaton.search(target)
+    [[0]]
+
+    """
+
+    # Patterns shorter than this cannot provide a complete byte for each of
+    # the eight possible shifts
+    MIN_INDEXED_SIZE = 15
+
+    def __init__(self, patterns):
+        """
+        :parameter patterns: the bit patterns to search after
+        :type patterns: a :class:`list` of :class:`bitarray.bitarray`
+        """
+        if patterns is None:
+            raise TypeError("Patterns cannot be None")
+        self.__patterns = []
+        self.__indexes = []
+        self.__shortPatterns = []
+
+        # identical patterns are only searched once
+        uniquePatterns = dict()
+        for pattern in patterns:
+            if not isinstance(pattern, bitarray):
+                raise TypeError("Each pattern must be a bitarray")
+            if len(pattern) == 0:
+                raise ValueError("Patterns cannot be empty")
+            key = pattern.to01()
+            if key not in uniquePatterns:
+                uniquePatterns[key] = len(self.__patterns)
+                self.__patterns.append(bitarray(key, endian='big'))
+            self.__indexes.append(uniquePatterns[key])
+
+        self.__goto = [dict()]
+        self.__fail = [0]
+        self.__outputs = [[]]
+        for iPattern, pattern in enumerate(self.__patterns):
+            if len(pattern) < PatternAutomaton.MIN_INDEXED_SIZE:
+                self.__shortPatterns.append(iPattern)
+                continue
+            for shift in range(8):
+                nbBytes = (len(pattern) - shift) // 8
+                key = pattern[shift:shift + nbBytes * 8].tobytes()
+                self.__insert(key, (iPattern, shift, nbBytes))
+        self.__buildFailureLinks()
+
+    def __insert(self, key, output):
+        state = 0
+        for byte in key:
+            nextState = self.__goto[state].get(byte)
+            if nextState is None:
+                nextState = len(self.__goto)
+                self.__goto.append(dict())
+                self.__fail.append(0)
+                self.__outputs.append([])
+                self.__goto[state][byte] = nextState
+            state = nextState
+        self.__outputs[state].append(output)
+
+    def __buildFailureLinks(self):
+        queue = deque(self.__goto[0].values())
+        while len(queue) > 0:
+            state = queue.popleft()
+            for byte, nextState in self.__goto[state].items():
+                queue.append(nextState)
+                failState = self.__fail[state]
+                while failState != 0 and byte not in self.__goto[failState]:
+                    failState = self.__fail[failState]
+                failState = self.__goto[failState].get(byte, 0)
+                if failState == nextState:
+                    failState = 0
+                self.__fail[nextState] = failState
+                self.__outputs[nextState] = self.__outputs[nextState] + self.__outputs[failState]
+
+    def search(self, target):
+        """Search all the patterns in the target.
+
+        :parameter target: the bits in which patterns are searched
+        :type target: :class:`bitarray.bitarray`
+        :return: for each pattern (in the order they were given), the sorted
+                 start positions of its occurrences
+        :rtype: a :class:`list` of :class:`list` of :class:`int`
+        """
+        if not isinstance(target, bitarray):
+            raise TypeError("Target must be a bitarray")
+
+        positions = [set() for _ in self.__patterns]
+        if target.endian() != 'big':
+            target = bitarray(target.to01(), endian='big')
+        targetSize = len(target)
+
+        goto = self.__goto
+        fail = self.__fail
+        outputs = self.__outputs
+        patterns = self.__patterns
+        state = 0
+        for iByte, byte in enumerate(target.tobytes()):
+            while state != 0 and byte not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(byte, 0)
+            for (iPattern, shift, nbBytes) in outputs[state]:
+                start = (iByte + 1 - nbBytes) * 8 - shift
+                pattern = patterns[iPattern]
+                end = start + len(pattern)
+                if start >= 0 and end <= targetSize and target[start:end] == pattern:
+                    positions[iPattern].add(start)
+
+        for iPattern in self.__shortPatterns:
+            positions[iPattern].update(target.search(patterns[iPattern]))
+
+        return [sorted(positions[index]) for index in self.__indexes]
+
+    @property
+    def patterns(self):
+        """The distinct patterns indexed by the automaton, normalized
+        in big endian.
+
+        :type: a :class:`list` of :class:`bitarray.bitarray`
+        """
+        return list(self.__patterns)
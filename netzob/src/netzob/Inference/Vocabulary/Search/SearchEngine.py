@@ -34,7 +34,6 @@
 #+---------------------------------------------------------------------------+
 #| Standard library imports                                                  |
 #+---------------------------------------------------------------------------+
-import itertools
 import multiprocessing
 
 #+---------------------------------------------------------------------------+
@@ -52,6 +51,7 @@ from netzob.Model.Vocabulary.Types.TypeConverter import TypeConverter
 from netzob.Model.Vocabulary.Types.Raw import Raw
 from netzob.Model.Vocabulary.Types.BitArray import BitArray
 from netzob.Inference.Vocabulary.Search.SearchTask import SearchTask
+from netzob.Inference.Vocabulary.Search.PatternAutomaton import PatternAutomaton
 from netzob.Inference.Vocabulary.Search.SearchResult import SearchResult, SearchResults
 from netzob.Model.Vocabulary.Functions.VisualizationFunctions.HighlightFunction import HighlightFunction
 
@@ -61,14 +61,18 @@ def _executeSearch(arg, **kwargs):
     a pool of threads.
     """
 
-    data = arg[0]
-    message = arg[1]
+    datas = arg[0]
+    messages = arg[1]
     addTags = arg[2]
     dataLabels = arg[3]
 
     se = SearchEngine()
-    c = se.searchDataInMessage(
-        data, message, addTags=addTags, dataLabels=dataLabels)
+    c = se.searchDataInMessages(
+        datas,
+        messages,
+        addTags=addTags,
+        inParallel=False,
+        dataLabels=dataLabels)
     return c
 
 
@@ -98,7 +102,8 @@ class SearchEngine(object):
     """
 
     def __init__(self):
-        pass
+        self.__compiledData = None
+        self.__compiled = None
 
     @staticmethod
     @typeCheck(AbstractType, AbstractMessage, bool)
@@ -233,13 +238,19 @@ class SearchEngine(object):
             # Create a pool of 'nbThead' threads (process)
             pool = multiprocessing.Pool(nbThread)
 
+            # Each worker searches a chunk of messages so the search
+            # automaton is only compiled once per chunk
+            chunkSize = max(1, -(-len(messages) // (nbThread * 4)))
+            chunks = [
+                messages[i:i + chunkSize]
+                for i in range(0, len(messages), chunkSize)
+            ]
+
             # Execute search operations
             pool.map_async(
                 _executeSearch,
-                list(
-                    zip([noDuplicateDatas] * len(messages), messages, [
-                        addTags
-                    ] * len(messages), [dataLabels] * len(messages))),
+                [(noDuplicateDatas, chunk, addTags, dataLabels)
+                 for chunk in chunks],
                 callback=self.__collectResults_cb)
 
             # Waits all alignment tasks finish
@@ -294,27 +305,9 @@ class SearchEngine(object):
         if message is None:
             raise TypeError("Message cannot be None")
 
-        searchTasks = []
-        for d in data:
-            # normalize the given data
-            normedData = AbstractType.normalize(d)
+        compiled = self.__compile(data)
 
-            # build search tasks
-            props = dict()
-            props['message'] = message
-            props['data'] = d
-            if dataLabels is not None and d in list(dataLabels.keys()):
-                props['label'] = dataLabels[d]
-
-            searchTasks.extend(self.__buildSearchTasks(normedData, props))
-
-        # fetch the content of the message and convert it to bitarray
-        target = TypeConverter.convert(message.data, Raw, BitArray)
-
-        # Generate search cases
-        searchCases = itertools.product([target], searchTasks)
-
-        searchResults = self.__search(searchCases)
+        searchResults = self.__searchCompiled(compiled, message, dataLabels)
 
         # If requested, we tag the results in the message using visualization functions
         # if addTags:
@@ -324,55 +317,72 @@ class SearchEngine(object):
         #             message.visualizationFunctions.append(HighlightFunction(startPos, endPos))
         return searchResults
 
-    def __search(self, searchCases):
-        """Execute the different search cases and build
-        search results that will be returned.
+    def __compile(self, data):
+        """Computes the encoding mutations of each specified data and builds
+        the automaton that searches all of them at once. The last compiled
+        data are kept so that successive searches of the same data in
+        different messages share the same automaton.
+
+        :parameter data: the data to search after
+        :type data: a list of :class:`netzob.Model.Vocabulary.Types.AbstractType.AbstractType`
+        :return: the list of (data, mutationType, mutation) and the automaton that searches the mutations
+        :rtype: a :class:`tuple`
+        """
+        if self.__compiled is not None and self.__compiledData == data:
+            return self.__compiled
+
+        mutations = []
+        for d in data:
+            # normalize the given data
+            normedData = AbstractType.normalize(d)
+            for mutationType, mutation in list(normedData.mutate().items()):
+                mutations.append((d, mutationType, mutation))
+
+        automaton = PatternAutomaton(
+            [mutation for (_, _, mutation) in mutations])
+
+        self.__compiledData = list(data)
+        self.__compiled = (mutations, automaton)
+        return self.__compiled
+
+    def __searchCompiled(self, compiled, message, dataLabels=None):
+        """Scans the message once with the compiled automaton and builds
+        a search result for each mutation found in it.
 
-        :parameter searchCases: an iterable of tupple (bitarray, :class:`netzob.Inference.Vocabulary.Search.SearchTask.SearchTask`)
-        :type searchCases: a list
+        :parameter compiled: the mutations and their automaton as returned by :meth:`__compile`
+        :type compiled: a :class:`tuple`
+        :parameter message: the message in which the search will take place
+        :type message: :class:`netzob.Model.Vocabulary.Messages.AbstractMessage`
+        :keyword dataLabels: an optionnal dict to attach to each data a label
+        :type dataLabels: dict
         :return: the obtained results
         :rtype: a list of :class:`netzob.Inference.Vocabulary.Search.SearchResult.SearchResult`
-
         """
-        if searchCases is None:
-            raise TypeError("There should be at least one search case.")
+        (mutations, automaton) = compiled
+
+        # fetch the content of the message and convert it to bitarray
+        target = TypeConverter.convert(message.data, Raw, BitArray)
 
         results = SearchResults()
-        for (target, searchTask) in searchCases:
-            if target is None or not isinstance(
-                    target, bitarray) or searchTask is None or not isinstance(
-                        searchTask, SearchTask):
-                raise TypeError(
-                    "Each search case must a tupple made of a bitarray and a SearchTask instance"
-                )
+        allPositions = automaton.search(target)
+        for (d, mutationType, mutation), positions in zip(mutations,
+                                                          allPositions):
+            if len(positions) == 0:
+                continue
+
+            props = dict()
+            props['message'] = message
+            props['data'] = d
+            if dataLabels is not None and d in list(dataLabels.keys()):
+                props['label'] = dataLabels[d]
+            searchTask = SearchTask(mutation, mutationType, properties=props)
 
             ranges = []
-            for startIndex in target.search(searchTask.data):
+            for startIndex in positions:
                 self._logger.debug("Search found {}: {}>{}".format(
-                    searchTask.data, startIndex, len(searchTask.data)))
-                ranges.append((startIndex, startIndex + len(searchTask.data)))
+                    mutation, startIndex, len(mutation)))
+                ranges.append((startIndex, startIndex + len(mutation)))
 
-            if len(ranges) > 0:
-                results.append(SearchResult(target, searchTask, ranges))
+            results.append(SearchResult(target, searchTask, ranges))
 
         return results
-
-    @typeCheck(AbstractType, dict)
-    def __buildSearchTasks(self, data, properties=None):
-        """Builds a search tasks for each possible encoding mutations of the
-        specified data.
-
-        :parameter data: the data from wich it must create search tasks
-        :type data: :class:`netzob.Model.Vocabulary.Types.AbstractType.AbstractType`
-        :keyword properties: a dict of properties {name, value} to attach to each built searchTask
-        :type properties: a dict
-        :return: a list of search tasks
-        :rtype: a :class:`list` of :class:`netzob.Inference.Vocabulary.SearchEngine.SearchTask.SearchTask`
-        """
-        if data is None:
-            raise TypeError("The data cannot be None")
-
-        return [
-            SearchTask(mutation, mutationType, properties=properties)
-            for mutationType, mutation in list(data.mutate().items())
-        ]
@@ -98,7 +98,11 @@ class AbstractField(AbstractMementoCreator, metaclass=abc.ABCMeta):
         self._variable = None
 
     @typeCheck(bool, bool, bool)
-    def getCells(self, encoded=True, styled=True, transposed=False):
+    def getCells(self,
+                 encoded=True,
+                 styled=True,
+                 transposed=False,
+                 nbThread=1):
         """Returns a matrix with a different line for each messages attached to the symbol of the current element.
 
         The matrix includes a different column for each leaf children of the current element.
@@ -248,38 +252,45 @@ class AbstractField(AbstractMementoCreator, metaclass=abc.ABCMeta):
         ' ?' 
         -----
 
+        A transposed matrix is organized per field, its cells are
+        sliced on demand from a single buffer holding all the messages
+
+        >>> columns = fbody.getCells(transposed=True)
+        >>> print(columns.headers)
+        ['whatsup', 'city', 'end']
+        >>> print(columns[1][:3])
+        [b'5061726973', b'4265726c696e', b'4e65772d596f726b']
+        >>> print(columns.lengths[1])
+        [40 48 64 40 48 64 40 48 64]
+
         :keyword encoded: if set to True, encoding functions are applied on returned cells
         :type encoded: :class:`bool`
         :keyword styled: if set to True, visualization functions are applied on returned cells
         :type styled: :class:`bool`
         :keyword transposed: is set to True, the returned matrix is transposed (1 line for each field)
         :type transposed: :class:`bool`
+        :keyword nbThread: the number of processes used to parse the messages (use None for the number of cpu)
+        :type nbThread: :class:`int`
 
         :return: a matrix representing the aligned messages following fields definitions.
-        :rtype: a :class:`netzob.Common.Utils.MatrixList.MatrixList`
+        :rtype: a :class:`netzob.Common.Utils.MatrixList.MatrixList` (or a :class:`netzob.Common.Utils.ColumnarMatrixList.ColumnarMatrixList` if transposed)
         :raises: :class:`netzob.Model.Vocabulary.AbstractField.AlignmentException` if an error occurs while aligning messages
         """
 
         if len(self.messages) < 1:
             raise ValueError("This symbol does not contain any message.")
 
-        # Fetch all the data to align
-        data = [message.data for message in self.messages]
-
-        # [DEBUG] set to false for debug only. A sequential alignment is more simple to debug
-        useParallelAlignment = False
-
-        if useParallelAlignment:
-            # Execute a parallel alignment
-            from netzob.Common.Utils.DataAlignment.ParallelDataAlignment import ParallelDataAlignment
-            return ParallelDataAlignment.align(data, self, encoded=encoded)
-        else:
-            # Execute a sequential alignment
-            from netzob.Common.Utils.DataAlignment.DataAlignment import DataAlignment
-            return DataAlignment.align(data, self, encoded=encoded)
+        # Messages are parsed once (in parallel if nbThread is not 1)
+        # and their alignment is kept in the cache of the symbol
+        alignmentCache = self.getSymbol().alignmentCache
+        if transposed:
+            return alignmentCache.getColumnar(
+                self, encoded=encoded, nbThread=nbThread)
+        return alignmentCache.getCells(
+            self, encoded=encoded, styled=styled, nbThread=nbThread)
 
     @typeCheck(bool, bool)
-    def getValues(self, encoded=True, styled=True):
+    def getValues(self, encoded=True, styled=True, nbThread=1):
         """Returns all the values the current element can take following messages attached to the symbol of current element.
 
         Specific encodingFunctions can also be considered if parameter encoded is set to True.
@@ -339,16 +350,16 @@ class AbstractField(AbstractMementoCreator, metaclass=abc.ABCMeta):
         :type encoded: :class:`bool`
         :keyword styled: if set to True, visualization functions are applied on returned cells
         :type styled: :class:`bool`
+        :keyword nbThread: the number of processes used to parse the messages (use None for the number of cpu)
+        :type nbThread: :class:`int`
 
         :return: a list detailling all the values current element takes.
         :rtype: a :class:`list` of :class:`str`
         :raises: :class:`netzob.Model.Vocabulary.AbstractField.AlignmentException` if an error occurs while aligning messages
         """
-        cells = self.getCells(encoded=encoded, styled=styled)
-        values = []
-        for line in cells:
-            values.append(b''.join(line))
-        return values
+        columns = self.getCells(
+            encoded=encoded, styled=styled, transposed=True, nbThread=nbThread)
+        return columns.joinColumns()
 
     @typeCheck(bool, bool)
     def getMessageCells(self, encoded=False, styled=False):
@@ -520,6 +531,10 @@ class AbstractField(AbstractMementoCreator, metaclass=abc.ABCMeta):
     @staticmethod
     def abstract(data, fields):
         """Search in the fields/symbols the first one that can abstract the data.
+        Only the fields/symbols that may parse the data (see
+        :class:`netzob.Model.Vocabulary.Domain.Parser.SymbolDispatcher.SymbolDispatcher`)
+        are tried. A dispatcher can be provided instead of the list of
+        fields/symbols, to abstract several messages without analysing them again.
 
         >>> from netzob.all import *
         >>> messages = ["{0}, what's up in {1} ?".format(pseudo, city) for pseudo in ['netzob', 'zoby'] for city in ['Paris', 'Berlin']]
@@ -551,15 +566,18 @@ class AbstractField(AbstractMementoCreator, metaclass=abc.ABCMeta):
 
         :parameter data: the data that should be abstracted in symbol
         :type data: :class:`str`
-        :parameter fields: a list of fields/symbols targeted during the abstraction process
-        :type fields: :class:`list` of :class:`netzob.Model.Vocabulary.AbstractField`
+        :parameter fields: a list of fields/symbols targeted during the abstraction process, or their dispatcher
+        :type fields: :class:`list` of :class:`netzob.Model.Vocabulary.AbstractField` or :class:`netzob.Model.Vocabulary.Domain.Parser.SymbolDispatcher.SymbolDispatcher`
 
         :return: a field/symbol and the structured received message
         :rtype: a tuple (:class:`netzob.Model.Vocabulary.AbstractField`, dict)
         :raises: :class:`netzob.Model.Vocabulary.AbstractField.AbstractionException` if an error occurs while abstracting the data
         """
         from netzob.Common.Utils.DataAlignment.DataAlignment import DataAlignment
-        for field in fields:
+        from netzob.Model.Vocabulary.Domain.Parser.SymbolDispatcher import SymbolDispatcher
+        if not isinstance(fields, SymbolDispatcher):
+            fields = SymbolDispatcher(fields)
+        for field in fields.getCandidates(data):
             try:
                 # Try to align/parse the data with the current field
                 alignedData = DataAlignment.align([data], field, encoded=False)
@@ -581,6 +599,43 @@ class AbstractField(AbstractMementoCreator, metaclass=abc.ABCMeta):
 
         return (unknown_symbol, structured_data)
 
+    @staticmethod
+    def abstractMany(data, fields, nbThread=1):
+        """Search, for each data, the first field/symbol that can abstract it
+        (see :meth:`abstract`). The fields/symbols are analysed once for all the
+        data, identical data are abstracted once and data can be processed by
+        a pool of `nbThread` processes (see
+        :class:`netzob.Model.Vocabulary.Domain.Parser.BatchAbstractor.BatchAbstractor`).
+
+        >>> from netzob.all import *
+        >>> s1 = Symbol([Field("netzob, what's up in "), Field(Alt(["Paris", "Berlin"]), name="city")], name="Symbol-netzob")
+        >>> s2 = Symbol([Field("zoby, what's up in "), Field(Alt(["Paris", "Berlin"]), name="city")], name="Symbol-zoby")
+        >>> messages = ["{0}, what's up in {1}".format(pseudo, city) for pseudo in ['netzob', 'zoby', 'toto'] for city in ['Paris', 'Berlin']]
+        >>> result = AbstractField.abstractMany(messages, [s1, s2])
+        >>> for iMessage in range(len(result)):
+        ...     symbol = result.getSymbol(iMessage)
+        ...     print(symbol.name if symbol is not None else None, result.getStructuredData(iMessage))
+        Symbol-netzob OrderedDict([('Field', b"netzob, what's up in "), ('city', b'Paris')])
+        Symbol-netzob OrderedDict([('Field', b"netzob, what's up in "), ('city', b'Berlin')])
+        Symbol-zoby OrderedDict([('Field', b"zoby, what's up in "), ('city', b'Paris')])
+        Symbol-zoby OrderedDict([('Field', b"zoby, what's up in "), ('city', b'Berlin')])
+        None OrderedDict()
+        None OrderedDict()
+
+        :parameter data: the data (or messages) that should be abstracted in symbols
+        :type data: a :class:`list` of :class:`bytes` or of :class:`netzob.Model.Vocabulary.Messages.AbstractMessage.AbstractMessage`
+        :parameter fields: a list of fields/symbols targeted during the abstraction process
+        :type fields: :class:`list` of :class:`netzob.Model.Vocabulary.AbstractField`
+        :keyword nbThread: the number of processes used to parse the data (use None for the number of cpu)
+        :type nbThread: :class:`int`
+
+        :return: the field/symbol of each data and the structured data
+        :rtype: :class:`netzob.Model.Vocabulary.Domain.Parser.AbstractionResult.AbstractionResult`
+        """
+        from netzob.Model.Vocabulary.Domain.Parser.BatchAbstractor import BatchAbstractor
+        with BatchAbstractor(fields, nbThread=nbThread) as abstractor:
+            return abstractor.abstract(data)
+
     def getSymbol(self):
         """Computes the symbol to which this field is attached.
 
@@ -37,7 +37,6 @@
 # +---------------------------------------------------------------------------+
 import uuid
 from bitarray import bitarray
-from random import shuffle
 
 # +---------------------------------------------------------------------------+
 # | related third party imports                                               |
@@ -82,6 +81,29 @@ class GenericPath(object):
         else:
             self._dataAssignedToVariable = dataAssignedToVariable
 
+        self.__dataShared = False
+
+    def _shareAssignedData(self):
+        """Returns the dicts of data assigned to the fields and to the variables
+        so that they can be shared with a duplicated path. Both paths
+        share them until one of them modifies an assignment (copy-on-write).
+
+        Assigned bitarrays are shared as well, they must be replaced
+        and never modified in place.
+
+        :return: the data assigned to the fields and the data assigned to the variables
+        :rtype: a :class:`tuple` of :class:`dict`
+        """
+        self.__dataShared = True
+        return (self._dataAssignedToField, self._dataAssignedToVariable)
+
+    def __ownAssignedData(self):
+        """Copies the assignment dicts if they are shared with another path."""
+        if self.__dataShared:
+            self._dataAssignedToField = dict(self._dataAssignedToField)
+            self._dataAssignedToVariable = dict(self._dataAssignedToVariable)
+            self.__dataShared = False
+
     def addResult(self, variable, result):
         """This method can be use to register the bitarray obtained after having parsed a variable
 
@@ -162,6 +184,7 @@ class GenericPath(object):
         if field is None:
             raise Exception("Field cannot be None")
 
+        self.__ownAssignedData()
         self._dataAssignedToField[field.id] = data
 
     def isDataAvailableForField(self, field):
@@ -191,6 +214,7 @@ class GenericPath(object):
 
         if field is None:
             raise Exception("Field cannot be None")
+        self.__ownAssignedData()
         del self._dataAssignedToField[field.id]
 
     @typeCheck(AbstractVariable)
@@ -222,13 +246,19 @@ class GenericPath(object):
             raise Exception("Variable cannot be None")
         return variable.id in self._dataAssignedToVariable
 
-    @typeCheck(bitarray, AbstractVariable)
+    @typeCheck(object, AbstractVariable)
     def assignDataToVariable(self, data, variable):
+        """Assign the specified data to the specified variable. While
+        parsing, the data that remains to be parsed can be a
+        :class:`netzob.Model.Vocabulary.Domain.Parser.BitArrayView.BitArrayView`
+        over the message.
+        """
         if data is None:
             raise Exception("Data cannot be None")
         if variable is None:
             raise Exception("Variable cannot be None")
 
+        self.__ownAssignedData()
         self._dataAssignedToVariable[variable.id] = data
 
     @typeCheck(AbstractVariable)
@@ -236,6 +266,7 @@ class GenericPath(object):
         if variable is None:
             raise Exception("Variable cannot be None")
 
+        self.__ownAssignedData()
         del self._dataAssignedToVariable[variable.id]
 
     def registerFieldCallBack(self, fields, variable, parsingCB=True):
@@ -248,50 +279,93 @@ class GenericPath(object):
             raise Exception(
                 "At least one field must be defined in the callback")
 
+        if not parsingCB and hasattr(variable, "checkDependencies"):
+            # the value of a relation that (indirectly) depends on itself
+            # can never be computed
+            variable.checkDependencies()
+
         self._fieldsCallbacks.append((fields, variable, parsingCB))
 
     def _triggerFieldCallbacks(self, field):
+        """Executes the callbacks whose fields all have a value.
 
-        moreCallBackFound = True
+        A specializing callback computes the value of a relation, so a
+        callback that reads the value of a relation still waiting for its
+        own callback is delayed until this one is executed. Callbacks are
+        hence executed once each, by increasing
+        :attr:`dependencyRank` of their relation, and in their
+        registration order otherwise.
 
-        # Try n-times to trigger callbacks as there can have deadlocks
-        # between mutually linked domain definitions
-        for i in range(10):
-            if moreCallBackFound is False:
-                break
+        Below, the value of `copy` is only computed once the checksum
+        itself has been computed, which waits for the size.
 
-            moreCallBackFound = False
-            callBackToExecute = None
+        >>> from netzob.all import *
+        >>> payload = Field(Raw(nbBytes=(1, 20)), name="payload")
+        >>> size = Field(name="size")
+        >>> chk = Field(name="chk")
+        >>> chk.domain = InternetChecksum([size, chk, payload], dataType=Raw(nbBytes=2))
+        >>> size.domain = Size([chk, size, payload])
+        >>> copy = Field(Value(chk), name="copy")
+        >>> s = Symbol([copy, chk, size, payload])
+        >>> messages = [s.specialize() for i in range(20)]
+        >>> all(m[:2] == m[2:4] and m[4] == len(m) - 2 for m in messages)
+        True
 
-            # Mix the callbacks functions, as we want to call them
-            # randomly in order to eliminate potential deadlocks due
-            # to mutually linked domain definitions
-            shuffle(self._fieldsCallbacks)
+        :return: False if a callback has failed
+        """
+        callBacks = list(enumerate(self._fieldsCallbacks))
+        # relations are ranked after the relations they depend on, so a
+        # single pass usually executes every callback that can be
+        callBacks.sort(
+            key=lambda item: getattr(item[1][1], "dependencyRank", 0))
+        # callbacks registered while executing the others are appended here
+        self._fieldsCallbacks = []
+        executedCallBacks = set()
+        executedVariables = set()
+        try:
+            while True:
+                blockedRelations = set()
+                nbExecuted = len(executedCallBacks)
+                for (index, callBack) in callBacks:
+                    if index in executedCallBacks:
+                        continue
+                    (fields, variable, parsingCB) = callBack
+                    if (variable.id in executedVariables or
+                            not all(self.isDataAvailableForField(f)
+                                    for f in fields) or
+                            self.__isWaitingForRelations(variable,
+                                                         blockedRelations)):
+                        if not parsingCB:
+                            blockedRelations.add(variable.id)
+                        continue
 
-            for (fields, variable, parsingCB) in self._fieldsCallbacks:
-                fieldsHaveValue = True
-                for f in fields:
-                    if not self.isDataAvailableForField(f):
-                        fieldsHaveValue = False
-                if fieldsHaveValue:
                     self._logger.debug(
                         "Found a callback that must be able to trigger (all its fields are set)"
                     )
-                    callBackToExecute = (fields, variable, parsingCB)
-                    break
-
-            if callBackToExecute is not None:
-                moreCallBackFound = True
-                (fields, variable, parsingCB) = callBackToExecute
-                if parsingCB:
-                    resultingPaths = variable.parse(self, acceptCallBack=False)
-                else:
-                    resultingPaths = variable.specialize(self, acceptCallBack=True)
-                if len(resultingPaths) == 0:
-                    return False
-
-                self._fieldsCallbacks.remove(callBackToExecute)
-        return True
+                    executedCallBacks.add(index)
+                    executedVariables.add(variable.id)
+                    if parsingCB:
+                        resultingPaths = variable.parse(
+                            self, acceptCallBack=False)
+                    else:
+                        resultingPaths = variable.specialize(
+                            self, acceptCallBack=True)
+                    if len(resultingPaths) == 0:
+                        return False
+
+                if len(executedCallBacks) == nbExecuted:
+                    return True
+        finally:
+            self._fieldsCallbacks = [
+                callBack for (index, callBack) in sorted(callBacks)
+                if index not in executedCallBacks
+            ] + self._fieldsCallbacks
+
+    def __isWaitingForRelations(self, variable, blockedRelations):
+        if not hasattr(variable, "getRequiredRelations"):
+            return False
+        return any(relation.id in blockedRelations
+                   for relation in variable.getRequiredRelations())
 
     @property
     def name(self):
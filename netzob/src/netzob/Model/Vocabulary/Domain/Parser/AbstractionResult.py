@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+# +---------------------------------------------------------------------------+
+# |          01001110 01100101 01110100 01111010 01101111 01100010            |
+# |                                                                           |
+# |               Netzob : Inferring communication protocols                  |
+# +---------------------------------------------------------------------------+
+# | Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+# | This program is free software: you can redistribute it and/or modify      |
+# | it under the terms of the GNU General Public License as published by      |
+# | the Free Software Foundation, either version 3 of the License, or         |
+# | (at your option) any later version.                                       |
+# |                                                                           |
+# | This program is distributed in the hope that it will be useful,           |
+# | but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+# | MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+# | GNU General Public License for more details.                              |
+# |                                                                           |
+# | You should have received a copy of the GNU General Public License         |
+# | along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+# +---------------------------------------------------------------------------+
+# | @url      : http://www.netzob.org                                         |
+# | @contact  : contact@netzob.org                                            |
+# | @sponsors : Amossys, http://www.amossys.fr                                |
+# |             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+# |             ANSSI,   https://www.ssi.gouv.fr                              |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | File contributors :                                                       |
+# |       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+# |       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+# +---------------------------------------------------------------------------+
+
+
+# +---------------------------------------------------------------------------+
+# | Standard library imports                                                  |
+# +---------------------------------------------------------------------------+
+from collections import OrderedDict
+
+# +---------------------------------------------------------------------------+
+# | Related third party imports                                               |
+# +---------------------------------------------------------------------------+
+import numpy
+
+# +---------------------------------------------------------------------------+
+# | Local application imports                                                 |
+# +---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import NetzobLogger
+from netzob.Model.Vocabulary.Types.TypeConverter import TypeConverter
+from netzob.Model.Vocabulary.Types.BitArray import BitArray
+from netzob.Model.Vocabulary.Types.Raw import Raw
+
+
+@NetzobLogger
+class AbstractionResult(object):
+    """The abstraction of a list of messages with a list of symbols (or
+    fields), see :class:`netzob.Model.Vocabulary.Domain.Parser.BatchAbstractor.BatchAbstractor`.
+
+    The symbol of each message is stored as its position in the list of
+    symbols (-1 if no symbol can abstract it) in a single NumPy array.
+    The messages of each symbol are aligned in a
+    :class:`netzob.Common.Utils.ColumnarMatrixList.ColumnarMatrixList`,
+    which only keeps the position of the cells in the messages.
+
+    >>> from netzob.all import *
+    >>> s1 = Symbol([Field("hello "), Field(ASCII(nbChars=(1, 10)))], name="hello")
+    >>> s2 = Symbol([Field("bye")], name="bye")
+    >>> result = AbstractField.abstractMany([b"hello zoby", b"bye", b"what ?", b"hello netzob"], [s1, s2])
+    >>> print(result.assignments)
+    [ 0  1 -1  0]
+    >>> print(result.getSymbol(3).name, result.getSymbol(2))
+    hello None
+    >>> print(result.getStructuredData(3))
+    OrderedDict([('Field', b'netzob')])
+    >>> print(result.getMessageIndexes(s1))
+    [0 3]
+    >>> print(result.getAlignment(s1))
+    Field    | Field   
+    -------- | --------
+    'hello ' | 'zoby'  
+    'hello ' | 'netzob'
+    -------- | --------
+    >>> print(result.counts)
+    [2 1]
+
+    """
+
+    def __init__(self, fields, assignments, alignments):
+        """Constructor.
+
+        :param fields: the symbols (or fields) used to abstract the messages
+        :type fields: a :class:`list` of :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        :param assignments: the position of the symbol of each message (-1 if unknown)
+        :type assignments: a :class:`numpy.ndarray` of :class:`int`
+        :param alignments: for each symbol, the alignment of its messages (in the order of the messages)
+        :type alignments: a :class:`list` of :class:`netzob.Common.Utils.ColumnarMatrixList.ColumnarMatrixList`
+        """
+        if len(fields) != len(alignments):
+            raise ValueError("An alignment must be provided for each field")
+        self.__fields = list(fields)
+        self.__assignments = numpy.asarray(assignments, dtype=numpy.int64)
+        self.__alignments = list(alignments)
+
+        # row of each message in the alignment of its symbol
+        self.__rows = numpy.full(len(self.__assignments), -1, dtype=numpy.int64)
+        self.__messageIndexes = []
+        order = numpy.argsort(self.__assignments, kind="stable")
+        bounds = numpy.searchsorted(self.__assignments[order],
+                                    numpy.arange(-1, len(self.__fields) + 1))
+        for iField in range(len(self.__fields)):
+            indexes = order[bounds[iField + 1]:bounds[iField + 2]]
+            self.__rows[indexes] = numpy.arange(len(indexes))
+            self.__messageIndexes.append(indexes)
+            if alignments[iField].nbMessages != len(indexes):
+                raise ValueError(
+                    "The alignment of the field {0} does not match its messages".
+                    format(iField))
+
+    def __len__(self):
+        return len(self.__assignments)
+
+    def getSymbol(self, iMessage):
+        """Returns the symbol (or field) of a message, or None if no symbol
+        can abstract it.
+
+        :rtype: :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        """
+        iField = int(self.__assignments[iMessage])
+        if iField < 0:
+            return None
+        return self.__fields[iField]
+
+    def getStructuredData(self, iMessage):
+        """Returns, for each field of the symbol of a message, the value it
+        takes in the message (as :meth:`AbstractField.abstract`). It is
+        empty if the message has no symbol.
+
+        :rtype: :class:`collections.OrderedDict`
+        """
+        structuredData = OrderedDict()
+        iField = int(self.__assignments[iMessage])
+        if iField < 0:
+            return structuredData
+        alignment = self.__alignments[iField]
+        row = int(self.__rows[iMessage])
+        for iColumn, header in enumerate(alignment.headers):
+            structuredData[header] = TypeConverter.convert(
+                alignment.getBitArray(iColumn, row), BitArray, Raw)
+        return structuredData
+
+    def getMessageIndexes(self, field):
+        """Returns the position of the messages of a symbol (or field).
+
+        :rtype: a :class:`numpy.ndarray` of :class:`int`
+        """
+        return self.__messageIndexes[self.__indexOf(field)]
+
+    def getAlignment(self, field):
+        """Returns the alignment of the messages of a symbol (or field),
+        in the order of the messages.
+
+        :rtype: :class:`netzob.Common.Utils.ColumnarMatrixList.ColumnarMatrixList`
+        """
+        return self.__alignments[self.__indexOf(field)]
+
+    def __indexOf(self, field):
+        for (iField, current) in enumerate(self.__fields):
+            if current is field:
+                return iField
+        raise ValueError("The field was not used to abstract the messages")
+
+    @property
+    def fields(self):
+        """The symbols (or fields) used to abstract the messages.
+
+        :type: a :class:`list` of :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        """
+        return list(self.__fields)
+
+    @property
+    def assignments(self):
+        """The position of the symbol of each message, -1 if no symbol
+        can abstract it.
+
+        :type: a :class:`numpy.ndarray` of :class:`int`
+        """
+        return self.__assignments
+
+    @property
+    def counts(self):
+        """The number of messages of each symbol (or field).
+
+        :type: a :class:`numpy.ndarray` of :class:`int`
+        """
+        return numpy.array(
+            [len(indexes) for indexes in self.__messageIndexes],
+            dtype=numpy.int64)
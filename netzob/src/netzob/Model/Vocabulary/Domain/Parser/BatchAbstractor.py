@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+
+# +---------------------------------------------------------------------------+
+# |          01001110 01100101 01110100 01111010 01101111 01100010            |
+# |                                                                           |
+# |               Netzob : Inferring communication protocols                  |
+# +---------------------------------------------------------------------------+
+# | Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+# | This program is free software: you can redistribute it and/or modify      |
+# | it under the terms of the GNU General Public License as published by      |
+# | the Free Software Foundation, either version 3 of the License, or         |
+# | (at your option) any later version.                                       |
+# |                                                                           |
+# | This program is distributed in the hope that it will be useful,           |
+# | but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+# | MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+# | GNU General Public License for more details.                              |
+# |                                                                           |
+# | You should have received a copy of the GNU General Public License         |
+# | along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+# +---------------------------------------------------------------------------+
+# | @url      : http://www.netzob.org                                         |
+# | @contact  : contact@netzob.org                                            |
+# | @sponsors : Amossys, http://www.amossys.fr                                |
+# |             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+# |             ANSSI,   https://www.ssi.gouv.fr                              |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | File contributors :                                                       |
+# |       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+# |       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+# +---------------------------------------------------------------------------+
+
+
+# +---------------------------------------------------------------------------+
+# | Standard library imports                                                  |
+# +---------------------------------------------------------------------------+
+import math
+import multiprocessing
+
+# +---------------------------------------------------------------------------+
+# | Related third party imports                                               |
+# +---------------------------------------------------------------------------+
+import numpy
+
+# +---------------------------------------------------------------------------+
+# | Local application imports                                                 |
+# +---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
+from netzob.Common.Utils.Deduplicator import Deduplicator
+from netzob.Common.Utils.ColumnarMatrixList import ColumnarMatrixList
+from netzob.Model.Vocabulary.Messages.AbstractMessage import AbstractMessage
+from netzob.Model.Vocabulary.Domain.Variables.Memory import Memory
+from netzob.Model.Vocabulary.Domain.Parser.MessageParser import MessageParser
+from netzob.Model.Vocabulary.Domain.Parser.SymbolDispatcher import SymbolDispatcher
+from netzob.Model.Vocabulary.Domain.Parser.AbstractionResult import AbstractionResult
+from netzob.Model.Vocabulary.Types.TypeConverter import TypeConverter
+from netzob.Model.Vocabulary.Types.BitArray import BitArray
+from netzob.Model.Vocabulary.Types.Raw import Raw
+
+_workerAbstractor = None
+
+
+def _initializeWorker(fields):
+    """Initializer of the worker processes: the symbols are received
+    and analysed once per worker."""
+    global _workerAbstractor
+    _workerAbstractor = BatchAbstractor(fields)
+
+
+def _abstractChunk(chunk):
+    """Wrapper used to parallelize the abstraction of data in the worker
+    processes. For each data of the chunk, the position of its symbol and
+    the size (in bits) of the value assigned to each leaf field are
+    returned."""
+    return [_workerAbstractor._abstractData(data) for data in chunk]
+
+
+@NetzobLogger
+class BatchAbstractor(object):
+    """Abstracts lists of messages with a list of symbols (or fields), as
+    :meth:`netzob.Model.Vocabulary.AbstractField.AbstractField.abstract`
+    does for a single message: each message is assigned to the first
+    symbol that can parse it.
+
+    Symbols are analysed once (see
+    :class:`netzob.Model.Vocabulary.Domain.Parser.SymbolDispatcher.SymbolDispatcher`)
+    and the same parser is used for all the messages, identical messages
+    being only parsed once. The messages can be dispatched by chunks to a
+    pool of `nbThread` processes, which is kept alive between executions
+    and can be released with :meth:`close` (or using the abstractor as a
+    context manager). The result is an
+    :class:`netzob.Model.Vocabulary.Domain.Parser.AbstractionResult.AbstractionResult`.
+
+    >>> from netzob.all import *
+    >>> from netzob.Model.Vocabulary.Domain.Parser.BatchAbstractor import BatchAbstractor
+    >>> symbols = [Symbol([Field("CMD{0} ".format(i)), Field(ASCII(nbChars=(1, 10)), name="arg")], name="S{0}".format(i)) for i in range(10)]
+    >>> data = ["CMD{0} {1}".format(i % 11, i) for i in range(1000)]
+    >>> with BatchAbstractor(symbols, nbThread=2) as abstractor:
+    ...     result = abstractor.abstract(data)
+    >>> print(result.counts)
+    [91 91 91 91 91 91 91 91 91 91]
+    >>> print(result.getSymbol(10), result.getSymbol(11).name)
+    None S0
+    >>> print(result.getAlignment(symbols[3]).getColumn(1)[:3])
+    [b'3', b'14', b'25']
+    >>> result.assignments.tolist() == BatchAbstractor(symbols).abstract(data).assignments.tolist()
+    True
+
+    """
+
+    def __init__(self, fields, nbThread=1, chunkSize=None):
+        """Constructor.
+
+        :param fields: the symbols (or fields) used to abstract the messages
+        :type fields: a :class:`list` of :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        :keyword nbThread: the number of processes used to parse the messages (use None for the number of cpu)
+        :type nbThread: :class:`int`
+        :keyword chunkSize: the number of messages sent at once to a process (use None for automatic)
+        :type chunkSize: :class:`int`
+        """
+        self.__pool = None
+        self.__fields = list(fields)
+        self.__dispatcher = SymbolDispatcher(self.__fields)
+        self.__parser = MessageParser()
+
+        # data is parsed with the leaf fields of the root of each field
+        self.__rootLeafFields = []
+        self.__fieldLeafFields = []
+        for field in self.__fields:
+            root = field
+            while root.hasParent():
+                root = root.parent
+            self.__rootLeafFields.append(root.getLeafFields())
+            self.__fieldLeafFields.append(field.getLeafFields())
+
+        self.nbThread = nbThread
+        self.chunkSize = chunkSize
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Stops the pool of processes. A new one is started if another
+        execution requires it."""
+        if self.__pool is not None:
+            self.__pool.terminate()
+            self.__pool.join()
+        self.__pool = None
+
+    def abstract(self, data):
+        """Abstracts the messages.
+
+        :param data: the messages (or their content)
+        :type data: an iterable of :class:`netzob.Model.Vocabulary.Messages.AbstractMessage.AbstractMessage` or :class:`bytes`
+        :rtype: :class:`netzob.Model.Vocabulary.Domain.Parser.AbstractionResult.AbstractionResult`
+        """
+        data = [self.__toBytes(d) for d in data]
+        dedup = Deduplicator(data)
+        results = self.__abstractUniqueData(dedup.uniqueValues)
+
+        uniqueAssignments = numpy.array(
+            [iField for (iField, sizes) in results], dtype=numpy.int64)
+        assignments = uniqueAssignments[numpy.array(
+            dedup.indexes, dtype=numpy.int64)]
+        self._logger.debug("{0} messages out of {1} abstracted".format(
+            numpy.count_nonzero(assignments >= 0), len(data)))
+
+        # messages grouped by symbol, in their order
+        order = numpy.argsort(assignments, kind="stable")
+        bounds = numpy.searchsorted(assignments[order],
+                                    numpy.arange(len(self.__fields) + 1))
+        alignments = []
+        for (iField, field) in enumerate(self.__fields):
+            rootLeafFields = self.__rootLeafFields[iField]
+            fieldLeafFields = self.__fieldLeafFields[iField]
+            indexes = order[bounds[iField]:bounds[iField + 1]]
+            sizes = [results[dedup.indexes[i]][1] for i in indexes.tolist()]
+            alignment = ColumnarMatrixList.fromSizes(
+                [data[i] for i in indexes.tolist()],
+                sizes,
+                headers=[leaf.name for leaf in rootLeafFields])
+            # leaf fields of the field are consecutive in the leaf fields of its root
+            start = rootLeafFields.index(fieldLeafFields[0])
+            alignments.append(
+                alignment.subMatrix(start, start + len(fieldLeafFields)))
+
+        return AbstractionResult(self.__fields, assignments, alignments)
+
+    def __abstractUniqueData(self, data):
+        """Returns, for each data, the position of its symbol and the size
+        of its cells."""
+        if self.nbThread == 1 or len(data) < 2:
+            return [self._abstractData(d) for d in data]
+
+        chunkSize = self.chunkSize
+        if chunkSize is None:
+            # a few chunks per worker balance the load without too many exchanges
+            chunkSize = int(math.ceil(len(data) / (self.nbThread * 4)))
+        chunks = [
+            data[i:i + chunkSize] for i in range(0, len(data), chunkSize)
+        ]
+        results = []
+        for chunkResult in self.__getPool().imap(_abstractChunk, chunks):
+            results.extend(chunkResult)
+        return results
+
+    def _abstractData(self, data):
+        """Returns the position of the first symbol that parses the data
+        (-1 if none) and the size (in bits) of the value assigned to each
+        leaf field of its root."""
+        for iField in self.__dispatcher.getCandidateIndexes(data):
+            # each message is parsed with an empty memory
+            self.__parser.memory = Memory()
+            try:
+                alignedMsg = next(
+                    self.__parser.parseRaw(data,
+                                           self.__rootLeafFields[iField]))
+            except Exception:
+                continue
+            return (iField, [len(value) for value in alignedMsg])
+        return (-1, None)
+
+    def __getPool(self):
+        """Returns the pool of processes."""
+        if self.__pool is None:
+            self._logger.debug("Starting a pool of {0} processes".format(
+                self.nbThread))
+            self.__pool = multiprocessing.Pool(
+                self.nbThread,
+                initializer=_initializeWorker,
+                initargs=(self.__fields, ))
+        return self.__pool
+
+    def __toBytes(self, data):
+        """Returns the content of a message as bytes."""
+        if isinstance(data, AbstractMessage):
+            data = data.data
+        if isinstance(data, bytes):
+            return data
+        return TypeConverter.convert(
+            TypeConverter.convert(data, Raw, BitArray), BitArray, Raw)
+
+    # Properties
+
+    @property
+    def fields(self):
+        """The symbols (or fields) used to abstract the messages.
+
+        :type: a :class:`list` of :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        """
+        return list(self.__fields)
+
+    @property
+    def nbThread(self):
+        """The number of processes used to parse the messages.
+
+        If set to None, one process per available cpu is used.
+
+        :type: :class:`int`
+        """
+        return self.__nbThread
+
+    @nbThread.setter
+    @typeCheck(int)
+    def nbThread(self, nbThread):
+        if nbThread is None:
+            nbThread = multiprocessing.cpu_count()
+
+        if nbThread < 1:
+            raise ValueError(
+                "NbThread cannot be <1, use None to use all the available cpus.")
+
+        self.close()
+        self.__nbThread = nbThread
+
+    @property
+    def chunkSize(self):
+        """The number of messages sent at once to a process. If set to
+        None, each process receives a few chunks.
+
+        :type: :class:`int`
+        """
+        return self.__chunkSize
+
+    @chunkSize.setter
+    @typeCheck(int)
+    def chunkSize(self, chunkSize):
+        if chunkSize is not None and chunkSize < 1:
+            raise ValueError("ChunkSize must be >0, use None for automatic.")
+        self.__chunkSize = chunkSize
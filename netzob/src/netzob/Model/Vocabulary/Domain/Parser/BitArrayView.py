@@ -0,0 +1,180 @@
+#-*- coding: utf-8 -*-
+
+#+---------------------------------------------------------------------------+
+#|          01001110 01100101 01110100 01111010 01101111 01100010            |
+#|                                                                           |
+#|               Netzob : Inferring communication protocols                  |
+#+---------------------------------------------------------------------------+
+#| Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+#| This program is free software: you can redistribute it and/or modify      |
+#| it under the terms of the GNU General Public License as published by      |
+#| the Free Software Foundation, either version 3 of the License, or         |
+#| (at your option) any later version.                                       |
+#|                                                                           |
+#| This program is distributed in the hope that it will be useful,           |
+#| but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+#| MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+#| GNU General Public License for more details.                              |
+#|                                                                           |
+#| You should have received a copy of the GNU General Public License         |
+#| along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+#+---------------------------------------------------------------------------+
+#| @url      : http://www.netzob.org                                         |
+#| @contact  : contact@netzob.org                                            |
+#| @sponsors : Amossys, http://www.amossys.fr                                |
+#|             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| File contributors :                                                       |
+#|       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+#|       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+#+---------------------------------------------------------------------------+
+
+
+#+---------------------------------------------------------------------------+
+#| Standard library imports                                                  |
+#+---------------------------------------------------------------------------+
+
+#+---------------------------------------------------------------------------+
+#| Related third party imports                                               |
+#+---------------------------------------------------------------------------+
+from bitarray import bitarray
+
+#+---------------------------------------------------------------------------+
+#| Local application imports                                                 |
+#+---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import typeCheck
+
+
+class BitArrayView(object):
+    """A read-only view over the bits [offset:offset+length] of a bitarray.
+
+    The parsers assign the data that remains to be parsed to the fields
+    and the variables. Taking the remaining data after a parsed value
+    (``data[len(value):]``) returns a new view over the same buffer
+    instead of copying it, so that parsing a message with many fields
+    does a linear amount of copies. Any other slice, such as the candidate
+    ``data[:size]`` of a leaf, returns a new :class:`bitarray`.
+
+    The buffer is shared and must not be modified while views over it
+    are used.
+
+    >>> from netzob.all import *
+    >>> from netzob.Model.Vocabulary.Domain.Parser.BitArrayView import BitArrayView
+    >>> data = TypeConverter.convert(b"netzob", Raw, BitArray)
+    >>> view = BitArrayView(data)
+    >>> remaining = view[8:][16:]
+    >>> remaining
+    BitArrayView(offset=24, length=24)
+    >>> remaining.buffer is data
+    True
+    >>> remaining[:8]
+    bitarray('01111010')
+    >>> print(TypeConverter.convert(remaining.copy(), BitArray, Raw))
+    b'zob'
+    >>> remaining == TypeConverter.convert(b"zob", Raw, BitArray)
+    True
+    >>> remaining[0], remaining[-1], len(remaining)
+    (False, False, 24)
+    >>> len(view[100:])
+    0
+
+    """
+
+    @typeCheck(bitarray, int, int)
+    def __init__(self, buffer, offset=0, length=None):
+        if buffer is None:
+            raise ValueError("Buffer cannot be None")
+        if length is None:
+            length = len(buffer) - offset
+        if offset < 0 or length < 0 or offset + length > len(buffer):
+            raise ValueError(
+                "The view [{0}:{1}] is out of the buffer of {2} bits".format(
+                    offset, offset + length, len(buffer)))
+        self.__buffer = buffer
+        self.__offset = offset
+        self.__length = length
+
+    @property
+    def buffer(self):
+        """The bitarray the view is taken over (Read-only).
+
+        :type: :class:`bitarray`
+        """
+        return self.__buffer
+
+    @property
+    def offset(self):
+        """The position of the first bit of the view in the buffer
+        (Read-only).
+
+        :type: :class:`int`
+        """
+        return self.__offset
+
+    def __len__(self):
+        return self.__length
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            (start, stop, step) = key.indices(self.__length)
+            if key.stop is None and step == 1:
+                return BitArrayView(self.__buffer, self.__offset + start,
+                                    self.__length - start)
+            if step == 1:
+                return self.__buffer[self.__offset + start:self.__offset +
+                                     max(start, stop)]
+            return self.copy()[key]
+
+        if key < 0:
+            key += self.__length
+        if key < 0 or key >= self.__length:
+            raise IndexError("BitArrayView index out of range")
+        return self.__buffer[self.__offset + key]
+
+    def copy(self):
+        """Returns the bits of the view in a new bitarray.
+
+        :rtype: :class:`bitarray`
+        """
+        return self.__buffer[self.__offset:self.__offset + self.__length]
+
+    def __eq__(self, other):
+        if isinstance(other, BitArrayView):
+            other = other.copy()
+        elif not isinstance(other, bitarray):
+            return NotImplemented
+        return self.__length == len(other) and self.copy() == other
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __add__(self, other):
+        if isinstance(other, BitArrayView):
+            other = other.copy()
+        return self.copy() + other
+
+    def __radd__(self, other):
+        return other + self.copy()
+
+    def __iter__(self):
+        return iter(self.copy())
+
+    def endian(self):
+        return self.__buffer.endian()
+
+    def tobytes(self):
+        return self.copy().tobytes()
+
+    def to01(self):
+        return self.copy().to01()
+
+    def __repr__(self):
+        return "BitArrayView(offset={0}, length={1})".format(
+            self.__offset, self.__length)
@@ -205,7 +205,7 @@ class FieldParser():
                            format(data, self.field.name))
 
         # we assign this data to the field's variable
-        parsingPath.assignDataToVariable(data.copy(), self.field.domain)
+        parsingPath.assignDataToVariable(data, self.field.domain)
 
         # we create a first VariableParser and uses it to parse the domain
         variableParser = VariableParser(domain)
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+# +---------------------------------------------------------------------------+
+# |          01001110 01100101 01110100 01111010 01101111 01100010            |
+# |                                                                           |
+# |               Netzob : Inferring communication protocols                  |
+# +---------------------------------------------------------------------------+
+# | Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+# | This program is free software: you can redistribute it and/or modify      |
+# | it under the terms of the GNU General Public License as published by      |
+# | the Free Software Foundation, either version 3 of the License, or         |
+# | (at your option) any later version.                                       |
+# |                                                                           |
+# | This program is distributed in the hope that it will be useful,           |
+# | but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+# | MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+# | GNU General Public License for more details.                              |
+# |                                                                           |
+# | You should have received a copy of the GNU General Public License         |
+# | along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+# +---------------------------------------------------------------------------+
+# | @url      : http://www.netzob.org                                         |
+# | @contact  : contact@netzob.org                                            |
+# | @sponsors : Amossys, http://www.amossys.fr                                |
+# |             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+# |             ANSSI,   https://www.ssi.gouv.fr                              |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | File contributors :                                                       |
+# |       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+# |       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+# +---------------------------------------------------------------------------+
+
+
+# +---------------------------------------------------------------------------+
+# | Standard library imports                                                  |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | Related third party imports                                               |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | Local application imports                                                 |
+# +---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import NetzobLogger
+from netzob.Model.Vocabulary.Domain.Variables.Leafs.Data import Data
+from netzob.Model.Vocabulary.Domain.Variables.SVAS import SVAS
+
+
+@NetzobLogger
+class FixedLayoutParser(object):
+    """This class parses a message against fields whose layout does not
+    depend on the parsed content, i.e. when each leaf field has a
+    constant value or a fixed size, except the last one that can take all
+    the remaining data.
+
+    Such a layout has at most one parsing path, so the data is directly
+    sliced without duplicating parsing paths or backtracking. The results
+    (and memorized values) are the same as the ones of the generic
+    :class:`MessageParser`.
+
+    >>> from netzob.all import *
+    >>> from netzob.Model.Vocabulary.Domain.Parser.FixedLayoutParser import FixedLayoutParser
+    >>> from netzob.Model.Vocabulary.Domain.Variables.Memory import Memory
+    >>> f1 = Field(b"\\x01", name="f1")
+    >>> f2 = Field(Integer(unitSize=AbstractType.UNITSIZE_16), name="f2")
+    >>> f3 = Field(ASCII(nbChars=(0, 10)), name="f3")
+    >>> parser = FixedLayoutParser.compile([f1, f2, f3])
+    >>> data = TypeConverter.convert(b"\\x01\\x00\\x05hello", Raw, BitArray)
+    >>> print(parser.parse(data, Memory()))
+    [bitarray('00000001'), bitarray('0000000000000101'), bitarray('0110100001100101011011000110110001101111')]
+
+    Data that does not follow the layout is rejected
+
+    >>> print(parser.parse(TypeConverter.convert(b"\\x02\\x00\\x05hello", Raw, BitArray), Memory()))
+    None
+
+    Fields which size depends on the content cannot be compiled
+
+    >>> print(FixedLayoutParser.compile([f3, f1]))
+    None
+    >>> print(FixedLayoutParser.compile([f1, Field(Size(f3)), f3]))
+    None
+
+    """
+
+    def __init__(self, variables):
+        """Constructor.
+
+        :param variables: for each leaf field, its domain and its size in bits (or None if it takes all the remaining data)
+        :type variables: a :class:`list` of :class:`tuple`
+        """
+        self.__variables = variables
+
+    @staticmethod
+    def compile(fields):
+        """Analyses the specified fields and returns a parser if
+        their layout is fixed, or None if the generic parser must be used.
+
+        :param fields: the leaf fields used to parse
+        :type fields: a :class:`list` of :class:`netzob.Model.Vocabulary.Field.Field`
+        :rtype: :class:`FixedLayoutParser`
+        """
+        variables = []
+        for iField, field in enumerate(fields):
+            domain = field.domain
+            if len(field.fields) > 0 or type(domain) is not Data:
+                return None
+            if domain.svas is None:
+                return None
+
+            (minSize, maxSize) = domain.dataType.size
+            if minSize == maxSize and maxSize is not None:
+                size = maxSize
+            elif domain.svas == SVAS.CONSTANT or (
+                    domain.svas == SVAS.PERSISTENT and
+                    domain.currentValue is not None):
+                # the value to compare with defines the size
+                size = maxSize
+            elif iField == len(fields) - 1:
+                size = None
+            else:
+                return None
+
+            variables.append((domain, size))
+
+        return FixedLayoutParser(variables)
+
+    def parse(self, data, memory):
+        """Parses the specified data and returns the value of each field
+        or None if it cannot be parsed. Values learnt while parsing are
+        memorized in the provided memory, even if the parsing fails.
+
+        :param data: the data to parse
+        :type data: :class:`bitarray`
+        :param memory: the memory to use
+        :type memory: :class:`netzob.Model.Vocabulary.Domain.Variables.Memory.Memory`
+        :rtype: a :class:`list` of :class:`bitarray`
+        """
+        result = []
+        offset = 0
+        for (variable, size) in self.__variables:
+            expectedValue = None
+            if variable.svas == SVAS.CONSTANT or variable.svas == SVAS.PERSISTENT:
+                if memory.hasValue(variable):
+                    expectedValue = memory.getValue(variable)
+                else:
+                    expectedValue = variable.currentValue
+
+            if expectedValue is not None:
+                value = data[offset:offset + len(expectedValue)]
+                if value != expectedValue:
+                    return None
+                value = expectedValue.copy()
+            elif variable.svas == SVAS.CONSTANT:
+                return None
+            else:
+                (minSize, maxSize) = variable.dataType.size
+                if size is None:
+                    size = len(data) - offset
+                    if size < minSize or (maxSize is not None and
+                                          size > maxSize):
+                        return None
+                elif offset + size > len(data):
+                    return None
+
+                value = data[offset:offset + size]
+                if size > 0 and not variable.dataType.canParse(value):
+                    return None
+                if variable.svas != SVAS.VOLATILE:
+                    memory.memorize(variable, value.copy())
+
+            result.append(value)
+            offset += len(value)
+
+        # the data must be entirely consumed
+        if offset != len(data):
+            return None
+
+        return result
@@ -44,10 +44,12 @@ from netzob.Model.Vocabulary.Domain.Variables.Memory import Memory
 from netzob.Model.Vocabulary.Messages.AbstractMessage import AbstractMessage
 from netzob.Model.Vocabulary.Symbol import Symbol
 from netzob.Model.Vocabulary.Domain.Parser.ParsingPath import ParsingPath
+from netzob.Model.Vocabulary.Domain.Parser.BitArrayView import BitArrayView
 from netzob.Model.Vocabulary.Types.TypeConverter import TypeConverter
 from netzob.Model.Vocabulary.Types.BitArray import BitArray
 from netzob.Model.Vocabulary.Types.Raw import Raw
 from netzob.Model.Vocabulary.Domain.Parser.FieldParser import FieldParser
+from netzob.Model.Vocabulary.Domain.Parser.FixedLayoutParser import FixedLayoutParser
 
 
 class InvalidParsingPathException(Exception):
@@ -206,16 +208,47 @@ class MessageParser(object):
         the specified fields.
 
         It returns an iterator over all the valid parsing path that can be found.
-        
+
+        If the layout of the fields is fixed (see :class:`FixedLayoutParser`), the
+        only possible parsing path is directly computed.
+
+        >>> from netzob.all import *
+        >>> f1 = Field(b"\\x01", name="f1")
+        >>> f2 = Field(Raw(nbBytes=2), name="f2")
+        >>> f3 = Field(Raw(nbBytes=(0, 10)), name="f3")
+        >>> mp = MessageParser()
+        >>> data = TypeConverter.convert(b"\\x01\\x02\\x03\\x04", Raw, BitArray)
+        >>> print(next(mp.parseBitarray(data, [f1, f2, f3])))
+        [bitarray('00000001'), bitarray('0000001000000011'), bitarray('00000100')]
+        >>> print(next(mp.parseBitarray(data[8:], [f1, f2, f3])))
+        Traceback (most recent call last):
+         ...
+        netzob.Model.Vocabulary.Domain.Parser.MessageParser.InvalidParsingPathException: No parsing path returned while parsing 'b'\\x02\\x03\\x04''
+
         """
 
         self._logger.debug(
             "New parsing method executed on {}".format(bitArrayToParse))
 
-        # building a new parsing path
-        currentParsingPath = ParsingPath(bitArrayToParse.copy(),
-                                         self.memory.duplicate())
-        currentParsingPath.assignDataToField(bitArrayToParse.copy(), fields[0])
+        if must_consume_everything:
+            fixedLayoutParser = FixedLayoutParser.compile(fields)
+            if fixedLayoutParser is not None:
+                memory = self.memory.duplicate()
+                result = fixedLayoutParser.parse(bitArrayToParse, memory)
+                if result is not None:
+                    self.memory = memory
+                    yield result
+                raise InvalidParsingPathException(
+                    "No parsing path returned while parsing '{}'".format(
+                        TypeConverter.convert(bitArrayToParse, BitArray,
+                                              Raw)))
+
+        # building a new parsing path, the data is shared by the
+        # parsing paths which only assign views over it to the fields
+        dataToParse = bitArrayToParse.copy()
+        currentParsingPath = ParsingPath(dataToParse, self.memory.duplicate())
+        currentParsingPath.assignDataToField(
+            BitArrayView(dataToParse), fields[0])
 
         # field iterator
         i_current_field = 0
@@ -229,7 +262,10 @@ class MessageParser(object):
         for parsingResult in parsingResults:
             result = []
             for field in fields:
-                result.append(parsingResult.getDataAssignedToField(field))
+                # assigned data can be shared with other parsing paths or
+                # be a view over the data to parse
+                result.append(
+                    parsingResult.getDataAssignedToField(field).copy())
 
             self.memory = parsingResult.memory
 
@@ -255,7 +291,7 @@ class MessageParser(object):
 
         fp = FieldParser(currentField, carnivorous_parsing)
         value_before_parsing = parsingPath.getDataAssignedToField(
-            currentField).copy()
+            currentField)
 
         for newParsingPath in fp.parse(parsingPath):
 
@@ -263,7 +299,7 @@ class MessageParser(object):
                 value_after_parsing = newParsingPath.getDataAssignedToField(
                     currentField)
                 remainingValue = value_before_parsing[len(
-                    value_after_parsing):].copy()
+                    value_after_parsing):]
 
                 if i_current_field < len(fields) - 1:
                     newParsingPath.assignDataToField(
@@ -64,7 +64,7 @@ class ParsingPath(GenericPath):
             dataAssignedToField=dataAssignedToField,
             dataAssignedToVariable=dataAssignedToVariable,
             fieldsCallbacks=fieldsCallbacks)
-        self.originalDataToParse = dataToParse.copy()
+        self.originalDataToParse = dataToParse
         if ok is None:
             self.__ok = True
         else:
@@ -90,13 +90,28 @@ class ParsingPath(GenericPath):
         return parsedMessage == bitArrayMessage
 
     def duplicate(self):
-        dField = {}
-        for key, value in list(self._dataAssignedToField.items()):
-            dField[key] = value.copy()
-
-        dVariable = {}
-        for key, value in list(self._dataAssignedToVariable.items()):
-            dVariable[key] = value.copy()
+        """Duplicates the parsing path. The assigned data and the memory are
+        shared with the new path until one of them is modified, so
+        duplicating a path does not copy any bitarray.
+
+        >>> from netzob.all import *
+        >>> from netzob.Model.Vocabulary.Domain.Parser.ParsingPath import ParsingPath
+        >>> f0 = Field(ASCII(), name="f0")
+        >>> data = TypeConverter.convert("netzob", ASCII, BitArray)
+        >>> path = ParsingPath(data, Memory())
+        >>> path.assignDataToField(data, f0)
+        >>> path2 = path.duplicate()
+        >>> path2.getDataAssignedToField(f0) is path.getDataAssignedToField(f0)
+        True
+        >>> path2.assignDataToField(data[:32], f0)
+        >>> print(TypeConverter.convert(path.getDataAssignedToField(f0), BitArray, Raw))
+        b'netzob'
+        >>> print(TypeConverter.convert(path2.getDataAssignedToField(f0), BitArray, Raw))
+        b'netz'
+
+        :rtype: :class:`netzob.Model.Vocabulary.Domain.Parser.ParsingPath.ParsingPath`
+        """
+        (dField, dVariable) = self._shareAssignedData()
 
         fCall = [x for x in self._fieldsCallbacks]
 
@@ -107,6 +122,7 @@ class ParsingPath(GenericPath):
             dataAssignedToVariable=dVariable,
             fieldsCallbacks=fCall,
             ok=self.ok())
+        result._shareAssignedData()
 
         return result
 
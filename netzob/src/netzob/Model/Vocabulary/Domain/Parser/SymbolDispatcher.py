@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+
+# +---------------------------------------------------------------------------+
+# |          01001110 01100101 01110100 01111010 01101111 01100010            |
+# |                                                                           |
+# |               Netzob : Inferring communication protocols                  |
+# +---------------------------------------------------------------------------+
+# | Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+# | This program is free software: you can redistribute it and/or modify      |
+# | it under the terms of the GNU General Public License as published by      |
+# | the Free Software Foundation, either version 3 of the License, or         |
+# | (at your option) any later version.                                       |
+# |                                                                           |
+# | This program is distributed in the hope that it will be useful,           |
+# | but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+# | MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+# | GNU General Public License for more details.                              |
+# |                                                                           |
+# | You should have received a copy of the GNU General Public License         |
+# | along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+# +---------------------------------------------------------------------------+
+# | @url      : http://www.netzob.org                                         |
+# | @contact  : contact@netzob.org                                            |
+# | @sponsors : Amossys, http://www.amossys.fr                                |
+# |             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+# |             ANSSI,   https://www.ssi.gouv.fr                              |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | File contributors :                                                       |
+# |       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+# |       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+# +---------------------------------------------------------------------------+
+
+
+# +---------------------------------------------------------------------------+
+# | Standard library imports                                                  |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | Related third party imports                                               |
+# +---------------------------------------------------------------------------+
+from bitarray import bitarray
+
+# +---------------------------------------------------------------------------+
+# | Local application imports                                                 |
+# +---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import NetzobLogger
+from netzob.Model.Vocabulary.Domain.Variables.AbstractVariable import AbstractVariable
+from netzob.Model.Vocabulary.Domain.Variables.Leafs.Data import Data
+from netzob.Model.Vocabulary.Domain.Variables.SVAS import SVAS
+from netzob.Model.Vocabulary.Types.TypeConverter import TypeConverter
+from netzob.Model.Vocabulary.Types.BitArray import BitArray
+from netzob.Model.Vocabulary.Types.Raw import Raw
+
+
+@NetzobLogger
+class SymbolDispatcher(object):
+    """This class finds the symbols (or fields) that may parse a message
+    without parsing it, so that only a few of them are tried when a
+    message is abstracted with a large vocabulary.
+
+    Each symbol is analysed once: the range of sizes of its messages and
+    the constant values of its leaf fields that are located at a fixed
+    offset. Symbols are indexed by their first constant value, hence
+    finding the candidates of a message only costs a lookup per distinct
+    (offset, size) of these values and is nearly independent of the
+    number of symbols. Candidates may not parse the message, but a symbol
+    which is not a candidate can not parse it.
+
+    The analysis is not updated if the definition of a symbol changes
+    afterwards (see :attr:`definitionVersion`).
+
+    >>> from netzob.all import *
+    >>> from netzob.Model.Vocabulary.Domain.Parser.SymbolDispatcher import SymbolDispatcher
+    >>> symbols = [Symbol([Field("CMD{0} ".format(i)), Field(ASCII(nbChars=(1, 10)))], name="S{0}".format(i)) for i in range(3)]
+    >>> symbols.append(Symbol([Field(Raw(nbBytes=2)), Field(b"\\x00\\x01")], name="Binary"))
+    >>> symbols.append(Symbol([Field(ASCII(nbChars=(1, 10)))], name="Text"))
+    >>> dispatcher = SymbolDispatcher(symbols)
+    >>> print([s.name for s in dispatcher.getCandidates(b"CMD1 hello")])
+    ['S1', 'Text']
+    >>> print([s.name for s in dispatcher.getCandidates(b"\\xff\\xff\\x00\\x01")])
+    ['Binary', 'Text']
+    >>> print([s.name for s in dispatcher.getCandidates(b"this message is too long")])
+    []
+
+    """
+
+    def __init__(self, fields):
+        """Constructor.
+
+        :param fields: the symbols (or fields) to dispatch messages to
+        :type fields: a :class:`list` of :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        """
+        self.__fields = list(fields)
+        self.__definitionVersion = AbstractVariable.definitionVersion
+        # first constant value of each (offset, size) -> indexes of the fields
+        self.__index = dict()
+        # indexes of the fields without constant value
+        self.__unindexed = []
+        # other constant values of each field, and its range of sizes in bits
+        self.__constants = []
+        self.__sizes = []
+        # fields whose layout changes if a variable has a value in memory
+        self.__memoryVariables = dict()
+
+        for (iField, field) in enumerate(self.__fields):
+            (constants, sizes, memoryVariables) = self.__analyse(field)
+            self.__sizes.append(sizes)
+            if len(constants) > 0:
+                ((offset, value), constants) = (constants[0], constants[1:])
+                values = self.__index.setdefault((offset, len(value)), dict())
+                values.setdefault(value, []).append(iField)
+            else:
+                self.__unindexed.append(iField)
+            self.__constants.append(constants)
+            for variable in memoryVariables:
+                self.__memoryVariables.setdefault(variable, []).append(iField)
+
+    def __analyse(self, field):
+        """Computes the constant values (with their offset, both in bytes)
+        and the range of sizes (in bits) of the messages of a field. It
+        also returns the variables with a value in memory would change
+        them."""
+        constants = []
+        memoryVariables = []
+        (minSize, maxSize) = (0, 0)
+        offset = 0
+        # data is parsed with the leaf fields of the root of the field
+        root = field
+        while root.hasParent():
+            root = root.parent
+        for leaf in root.getLeafFields():
+            domain = leaf.domain
+            (minLeaf, maxLeaf) = (0, None)
+            if type(domain) is Data and domain.svas is not None:
+                (minLeaf, maxLeaf) = domain.dataType.size
+                if domain.svas == SVAS.CONSTANT or domain.svas == SVAS.PERSISTENT:
+                    # a memorized value takes precedence over the current one
+                    memoryVariables.append(domain)
+                    value = domain.currentValue
+                    if value is not None:
+                        (minLeaf, maxLeaf) = (len(value), len(value))
+                        if offset is not None and offset % 8 == 0 and len(
+                                value) % 8 == 0 and len(value) > 0:
+                            constants.append((offset // 8,
+                                              self.__toBytes(value)))
+                    elif domain.svas == SVAS.CONSTANT:
+                        (minLeaf, maxLeaf) = (0, None)
+            if minLeaf is None:
+                minLeaf = 0
+
+            minSize += minLeaf
+            if maxSize is not None and maxLeaf is not None:
+                maxSize += maxLeaf
+            else:
+                maxSize = None
+            if offset is not None and minLeaf == maxLeaf:
+                offset += minLeaf
+            else:
+                offset = None
+
+        return (constants, (minSize, maxSize), memoryVariables)
+
+    def getCandidates(self, data, memory=None):
+        """Returns the symbols (or fields) that may parse the data, in the
+        order they were provided.
+
+        :param data: the data to dispatch
+        :type data: :class:`bytes`
+        :param memory: the memory used to parse the data (if any)
+        :type memory: :class:`netzob.Model.Vocabulary.Domain.Variables.Memory.Memory`
+        :rtype: a :class:`list` of :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        """
+        return [
+            self.__fields[iField]
+            for iField in self.getCandidateIndexes(data, memory)
+        ]
+
+    def getCandidateIndexes(self, data, memory=None):
+        """Returns the position of the symbols (or fields) that may parse
+        the data (see :meth:`getCandidates`).
+
+        :rtype: a :class:`list` of :class:`int`
+        """
+        data = self.__toBytes(TypeConverter.convert(data, Raw, BitArray))
+        nbBits = len(data) * 8
+
+        candidates = list(self.__unindexed)
+        for ((offset, size), values) in self.__index.items():
+            candidates.extend(values.get(data[offset:offset + size], []))
+        candidates = set(iField for iField in candidates
+                         if self.__fits(iField, data, nbBits))
+
+        # memorized values are not known by the index
+        if memory is not None:
+            for variable in self.__memorizedVariables(memory):
+                candidates.update(self.__memoryVariables[variable])
+
+        return sorted(candidates)
+
+    def __fits(self, iField, data, nbBits):
+        """Checks the size and the constant values of the field."""
+        (minSize, maxSize) = self.__sizes[iField]
+        if nbBits < minSize or (maxSize is not None and nbBits > maxSize):
+            return False
+        for (offset, value) in self.__constants[iField]:
+            if data[offset:offset + len(value)] != value:
+                return False
+        return True
+
+    def __memorizedVariables(self, memory):
+        """Returns the indexed variables which have a value in memory."""
+        memorized = memory.memory
+        if len(memorized) == 0:
+            return []
+        if len(memorized) < len(self.__memoryVariables):
+            try:
+                return [
+                    variable for variable in memorized
+                    if variable in self.__memoryVariables
+                ]
+            except TypeError:
+                # the hash of some variables cannot be computed
+                pass
+        return [
+            variable for variable in self.__memoryVariables
+            if memory.hasValue(variable)
+        ]
+
+    def __toBytes(self, value):
+        """Returns the bytes of a bitarray, following its order of bits."""
+        if value.endian() != "big":
+            value = bitarray(value.to01(), endian="big")
+        return value.tobytes()
+
+    @property
+    def definitionVersion(self):
+        """The version of the definitions the symbols were analysed with
+        (Read-only). The dispatcher must be rebuilt when it differs from
+        :attr:`netzob.Model.Vocabulary.Domain.Variables.AbstractVariable.AbstractVariable.definitionVersion`.
+
+        >>> from netzob.all import *
+        >>> from netzob.Model.Vocabulary.Domain.Parser.SymbolDispatcher import SymbolDispatcher
+        >>> from netzob.Model.Vocabulary.Domain.Variables.AbstractVariable import AbstractVariable
+        >>> f = Field("HELLO")
+        >>> dispatcher = SymbolDispatcher([Symbol([f])])
+        >>> dispatcher.definitionVersion == AbstractVariable.definitionVersion
+        True
+        >>> f.domain = "WORLD"
+        >>> dispatcher.definitionVersion == AbstractVariable.definitionVersion
+        False
+
+        :type: :class:`int`
+        """
+        return self.__definitionVersion
+
+    @property
+    def fields(self):
+        """The symbols (or fields) to dispatch messages to.
+
+        :type: a :class:`list` of :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        """
+        return list(self.__fields)
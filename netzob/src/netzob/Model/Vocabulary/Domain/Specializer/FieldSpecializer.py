@@ -125,6 +125,22 @@ class FieldSpecializer(object):
     def specialize(self, specializingPath=None):
         """Execute the specialize operation"""
 
+        return list(self.iterSpecialize(specializingPath))
+
+    @typeCheck(SpecializingPath)
+    def iterSpecialize(self, specializingPath=None):
+        """Lazily execute the specialize operation: each specializing path
+        is only computed when it is consumed.
+
+        >>> from netzob.all import *
+        >>> f = Field(Repeat(Alt([ASCII("a"), ASCII("b")]), nbRepeat=(1, 50)))
+        >>> fs = FieldSpecializer(f)
+        >>> value = TypeConverter.convert(next(fs.iterSpecialize()).getDataAssignedToField(f), BitArray, ASCII)
+        >>> 1 <= len(value) < 50 and set(value) <= set("ab")
+        True
+
+        """
+
         if specializingPath is None:
             specializingPath = SpecializingPath(memory=Memory())
 
@@ -134,7 +150,7 @@ class FieldSpecializer(object):
         if self.arbitraryValue is not None:
             specializingPath.addResult(self.field.domain, self.arbitraryValue)
             specializingPath.addResultToField(self.field, self.arbitraryValue)
-            return [specializingPath]
+            return iter([specializingPath])
 
         # does current field has children
         if len(self.field.fields) > 0:
@@ -142,22 +158,51 @@ class FieldSpecializer(object):
         else:
             return self._specializeField(specializingPath)
 
+    @staticmethod
+    def iterSpecializeFields(fields, specializingPath, presets=None):
+        """Lazily specializes the fields one after the other. Each path
+        produced by a field is completed with the following fields before
+        the next one is computed.
+
+        :parameter fields: the fields to specialize
+        :type fields: a :class:`list` of :class:`netzob.Model.Vocabulary.Field.Field`
+        :parameter specializingPath: the initial specializing path
+        :type specializingPath: :class:`netzob.Model.Vocabulary.Domain.Specializer.SpecializingPath.SpecializingPath`
+        :keyword presets: the values some of the fields should take
+        :type presets: :class:`dict`
+        :return: an iterator over the paths in which all the fields are specialized
+        """
+        fieldSpecializers = [
+            FieldSpecializer(field, presets=presets) for field in fields
+        ]
+
+        if len(fieldSpecializers) == 0:
+            yield specializingPath
+            return
+
+        # one iterator per field, kept in an explicit stack so that
+        # symbols with many fields do not exhaust the recursion limit
+        iterators = [fieldSpecializers[0].iterSpecialize(specializingPath)]
+        while len(iterators) > 0:
+            path = next(iterators[-1], None)
+            if path is None:
+                iterators.pop()
+                continue
+
+            if len(iterators) == len(fieldSpecializers):
+                yield path
+            else:
+                iterators.append(
+                    fieldSpecializers[len(iterators)].iterSpecialize(path))
+
     @typeCheck(SpecializingPath)
     def _specializeFieldWithChildren(self, specializingPath=None):
 
         if specializingPath is None:
             specializingPath = SpecializingPath(memory=Memory())
 
-        resultPaths = [specializingPath]
-        for child in self.field.fields:
-            fs = FieldSpecializer(child, presets=self.presets)
-
-            tmpResultPaths = []
-            for path in resultPaths:
-                tmpResultPaths.extend(fs.specialize(path))
-            resultPaths = tmpResultPaths
-
-        for resultPath in resultPaths:
+        for resultPath in FieldSpecializer.iterSpecializeFields(
+                self.field.fields, specializingPath, presets=self.presets):
             value = None
             for child in self.field.fields:
                 childResult = resultPath.getDataAssignedToVariable(
@@ -170,7 +215,7 @@ class FieldSpecializer(object):
             resultPath.addResult(self.field.domain, value)
             resultPath.addResultToField(self.field, value)
 
-        return resultPaths
+            yield resultPath
 
     @typeCheck(SpecializingPath)
     def _specializeField(self, specializingPath=None):
@@ -189,10 +234,9 @@ class FieldSpecializer(object):
 
         # we create a first VariableParser and uses it to parse the domain
         variableSpecializer = VariableSpecializer(domain)
-        resultSpecializingPaths = variableSpecializer.specialize(
-            specializingPath)
 
-        for resultSpecializingPath in resultSpecializingPaths:
+        for resultSpecializingPath in variableSpecializer.iterSpecialize(
+                specializingPath):
 
             assignedData = bitarray('')
             if resultSpecializingPath.isDataAvailableForVariable(
@@ -207,7 +251,7 @@ class FieldSpecializer(object):
                 "FieldSpecializer Result: {0}".format(assignedData))
             resultSpecializingPath.addResultToField(self.field, assignedData)
 
-        return resultSpecializingPaths
+            yield resultSpecializingPath
 
     @property
     def arbitraryValue(self):
@@ -0,0 +1,459 @@
+# -*- coding: utf-8 -*-
+
+# +---------------------------------------------------------------------------+
+# |          01001110 01100101 01110100 01111010 01101111 01100010            |
+# |                                                                           |
+# |               Netzob : Inferring communication protocols                  |
+# +---------------------------------------------------------------------------+
+# | Copyright (C) 2011-2017 Georges Bossert and Frédéric Guihéry              |
+# | This program is free software: you can redistribute it and/or modify      |
+# | it under the terms of the GNU General Public License as published by      |
+# | the Free Software Foundation, either version 3 of the License, or         |
+# | (at your option) any later version.                                       |
+# |                                                                           |
+# | This program is distributed in the hope that it will be useful,           |
+# | but WITHOUT ANY WARRANTY; without even the implied warranty of            |
+# | MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the              |
+# | GNU General Public License for more details.                              |
+# |                                                                           |
+# | You should have received a copy of the GNU General Public License         |
+# | along with this program. If not, see <http://www.gnu.org/licenses/>.      |
+# +---------------------------------------------------------------------------+
+# | @url      : http://www.netzob.org                                         |
+# | @contact  : contact@netzob.org                                            |
+# | @sponsors : Amossys, http://www.amossys.fr                                |
+# |             Supélec, http://www.rennes.supelec.fr/ren/rd/cidre/           |
+# |             ANSSI,   https://www.ssi.gouv.fr                              |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | File contributors :                                                       |
+# |       - Georges Bossert <georges.bossert (a) supelec.fr>                  |
+# |       - Frédéric Guihéry <frederic.guihery (a) amossys.fr>                |
+# +---------------------------------------------------------------------------+
+
+# +---------------------------------------------------------------------------+
+# | Standard library imports                                                  |
+# +---------------------------------------------------------------------------+
+import math
+import multiprocessing
+import random
+
+# +---------------------------------------------------------------------------+
+# | Related third party imports                                               |
+# +---------------------------------------------------------------------------+
+from bitarray import bitarray
+
+# +---------------------------------------------------------------------------+
+# | Local application imports                                                 |
+# +---------------------------------------------------------------------------+
+from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
+from netzob.Model.Vocabulary.Domain.GenericPath import GenericPath
+from netzob.Model.Vocabulary.Domain.Variables.Memory import Memory
+from netzob.Model.Vocabulary.Domain.Variables.SVAS import SVAS
+from netzob.Model.Vocabulary.Domain.Variables.Leafs.Data import Data
+from netzob.Model.Vocabulary.Domain.Variables.Leafs.AbstractRelationVariableLeaf import AbstractRelationVariableLeaf
+from netzob.Model.Vocabulary.Domain.Variables.Nodes.AbstractVariableNode import AbstractVariableNode
+from netzob.Model.Vocabulary.Domain.Specializer.FieldSpecializer import FieldSpecializer
+from netzob.Model.Vocabulary.Domain.Specializer.MessageSpecializer import MessageSpecializer
+from netzob.Model.Vocabulary.Domain.Specializer.SpecializingPath import SpecializingPath
+
+_workerPlan = None
+
+
+def _initializeWorker(plan):
+    """Initializer of the worker processes: the plan is received once per
+    worker, and the random generator is reseeded so that workers do not
+    produce the same messages."""
+    global _workerPlan
+    _workerPlan = plan
+    random.seed()
+
+
+def _generateShard(count):
+    """Wrapper used to parallelize the generation of messages in the
+    worker processes."""
+    return _workerPlan.generate(count)
+
+
+class _UnsupportedDefinition(Exception):
+    """Raised while compiling a plan when the symbol definition requires
+    the generic specializer."""
+
+
+@NetzobLogger
+class GenerationPlan(object):
+    """Generates many messages from a symbol, as successive calls to
+    :meth:`netzob.Model.Vocabulary.Symbol.Symbol.specialize` would.
+
+    The symbol is analysed once. Fields with a constant value (or a
+    preset one) are rendered once and for all, the other fields are
+    generated for all the messages at once, field after field, and the
+    relations (:class:`Size`, :class:`Value`, :class:`InternetChecksum`)
+    are computed in a single pass, in an order in which each relation only
+    depends on values already computed. Messages can be generated by a
+    pool of processes.
+
+    Definitions that cannot be compiled (relations nested in Alt, Agg or
+    Repeat domains, mutually dependent relations, fields nested on more
+    than one level, ...) are specialized with the
+    :class:`netzob.Model.Vocabulary.Domain.Specializer.MessageSpecializer.MessageSpecializer`,
+    message after message.
+
+    >>> from netzob.all import *
+    >>> from netzob.Model.Vocabulary.Domain.Specializer.GenerationPlan import GenerationPlan
+    >>> f0 = Field(ASCII("CMD "), name="cmd")
+    >>> f2 = Field(Raw(nbBytes=(2, 20)), name="payload")
+    >>> f1 = Field(Size(f2), name="size")
+    >>> f3 = Field(Alt([ASCII("OK"), ASCII("KO")]), name="status")
+    >>> s = Symbol([f0, f1, f2, f3])
+    >>> plan = GenerationPlan(s)
+    >>> plan.isCompiled
+    True
+    >>> messages = plan.generate(100)
+    >>> len(messages)
+    100
+    >>> all(m[4] == len(m) - 7 and m[:4] == b"CMD " and m[-2:] in [b"OK", b"KO"] for m in messages)
+    True
+    >>> len(set(messages)) > 90
+    True
+
+    Messages can also be generated by several processes.
+
+    >>> messages = plan.generate(1000, nbThread=2)
+    >>> len(messages), len(set(messages)) > 990
+    (1000, True)
+
+    Fields nested on more than one level require the generic specializer.
+
+    >>> inner = Field(name="inner")
+    >>> inner.fields = [Field("a"), Field(ASCII(nbChars=3))]
+    >>> outer = Field(name="outer")
+    >>> outer.fields = [inner, Field("!")]
+    >>> s = Symbol([Field(">"), outer])
+    >>> plan = GenerationPlan(s)
+    >>> plan.isCompiled
+    False
+    >>> all(len(m) == 6 and m[:2] == b">a" and m[-1:] == b"!" for m in plan.generate(10))
+    True
+
+    """
+
+    def __init__(self, symbol, memory=None, presets=None):
+        """Constructor.
+
+        :param symbol: the symbol from which messages are generated
+        :type symbol: :class:`netzob.Model.Vocabulary.Symbol.Symbol`
+        :keyword memory: the memory shared by the generated messages, if None each message is generated with an empty memory
+        :type memory: :class:`netzob.Model.Vocabulary.Domain.Variables.Memory.Memory`
+        :keyword presets: the values some fields should take (see :meth:`netzob.Model.Vocabulary.Symbol.Symbol.specialize`)
+        :type presets: :class:`dict`
+        """
+        if symbol is None:
+            raise TypeError("Symbol cannot be None")
+        self.__symbol = symbol
+        self.__memory = memory
+
+        # presets are normalized once, as the specializer does
+        specializer = MessageSpecializer(presets=presets)
+        specializer._update_presets(symbol)
+        self.__presets = specializer.presets
+
+        try:
+            self.__compile()
+            self.__isCompiled = True
+        except _UnsupportedDefinition as e:
+            self._logger.debug(
+                "Symbol '{0}' is generated with the generic specializer: {1}".
+                format(symbol.name, e))
+            self.__isCompiled = False
+
+    def __compile(self):
+        """Analyses the symbol: computes the leaf fields and how their value
+        is produced, the order of the relations and the segments that make
+        the content of a message."""
+        symbol = self.__symbol
+
+        if len(symbol.fields) == 0:
+            raise _UnsupportedDefinition("the symbol has no field")
+
+        # the content of a message is made of the fields of the symbol,
+        # and of their children for fields with children
+        contentFields = []
+        for field in symbol.fields:
+            if len(field.fields) == 0:
+                contentFields.append(field)
+                continue
+            if field in self.__presets:
+                raise _UnsupportedDefinition(
+                    "field '{0}' with children has a preset value".format(
+                        field.name))
+            for child in field.fields:
+                if len(child.fields) > 0:
+                    raise _UnsupportedDefinition(
+                        "field '{0}' has more than one level of children".
+                        format(field.name))
+                contentFields.append(child)
+        leafFields = symbol.getLeafFields(includePseudoFields=True)
+        for field in leafFields:
+            if field.domain is None:
+                raise _UnsupportedDefinition(
+                    "field '{0}' has no domain".format(field.name))
+
+        # how the value of each leaf field is produced
+        self.__staticValues = dict()  # field -> value
+        self.__dataFields = []  # fields generated with their data type
+        self.__memorizedFields = []  # fields whose last value is memorized
+        self.__nodeFields = []  # fields generated with a field specializer
+        relationFields = []
+        for field in leafFields:
+            domain = field.domain
+            if field in self.__presets:
+                self.__staticValues[field] = self.__presets[field]
+            elif isinstance(domain, AbstractRelationVariableLeaf):
+                relationFields.append(field)
+            elif isinstance(domain, Data):
+                self.__compileData(field)
+            elif isinstance(domain, AbstractVariableNode):
+                self.__checkNode(domain)
+                self.__nodeFields.append(field)
+            else:
+                raise _UnsupportedDefinition(
+                    "domain of field '{0}' is not supported".format(
+                        field.name))
+
+        self.__relationFields = self.__sortRelations(relationFields,
+                                                     leafFields)
+
+        # consecutive static values are rendered once, a segment is
+        # either a rendered value or a field
+        self.__segments = []
+        for field in contentFields:
+            if field.isPseudoField is True:
+                continue
+            if field in self.__staticValues:
+                value = self.__staticValues[field]
+                if len(self.__segments) > 0 and isinstance(
+                        self.__segments[-1], bitarray):
+                    self.__segments[-1] = self.__segments[-1] + value
+                else:
+                    self.__segments.append(value.copy())
+            else:
+                self.__segments.append(field)
+
+        if len(self.__segments) == 0:
+            raise _UnsupportedDefinition("the symbol produces no content")
+
+    def __compileData(self, field):
+        """Registers how a field with a Data domain is produced, following
+        the specialization rules of its SVAS."""
+        domain = field.domain
+        memory = self.__memory
+
+        # value available without generating one (memory is priority)
+        value = None
+        if memory is not None and memory.hasValue(domain):
+            value = memory.getValue(domain)
+        elif domain.currentValue is not None:
+            value = domain.currentValue
+
+        if domain.svas == SVAS.CONSTANT:
+            if value is None:
+                raise _UnsupportedDefinition(
+                    "constant field '{0}' has no value".format(field.name))
+            self.__staticValues[field] = value
+        elif domain.svas == SVAS.PERSISTENT:
+            if value is None and memory is not None:
+                # the value generated for the first message is memorized
+                value = domain.dataType.generate()
+                memory.memorize(domain, value)
+            if value is None:
+                self.__dataFields.append(field)
+            else:
+                self.__staticValues[field] = value
+        elif domain.svas == SVAS.EPHEMERAL:
+            self.__dataFields.append(field)
+            if memory is not None:
+                self.__memorizedFields.append(field)
+        elif domain.svas == SVAS.VOLATILE:
+            self.__dataFields.append(field)
+        else:
+            raise _UnsupportedDefinition("unknown SVAS {0}".format(
+                domain.svas))
+
+    def __checkNode(self, variable):
+        """Checks a node domain can be specialized independently from the
+        other fields of the symbol."""
+        if isinstance(variable, AbstractRelationVariableLeaf):
+            raise _UnsupportedDefinition(
+                "relation {0} is nested in a node".format(variable))
+        if isinstance(variable, AbstractVariableNode):
+            for child in variable.children:
+                self.__checkNode(child)
+        elif self.__memory is not None and variable.svas != SVAS.VOLATILE:
+            raise _UnsupportedDefinition(
+                "variable {0} nested in a node depends on the memory".format(
+                    variable))
+
+    def __sortRelations(self, relationFields, leafFields):
+        """Returns the relation fields ordered so that each relation only
+        depends on values of fields computed before it."""
+        dependencies = dict()
+        for field in relationFields:
+            relation = field.domain
+            dependencies[field] = []
+            for dep in relation.requiredFields:
+                if dep not in leafFields:
+                    raise _UnsupportedDefinition(
+                        "relation {0} depends on a field out of the symbol".
+                        format(relation))
+                if dep in relationFields:
+                    dependencies[field].append(dep)
+
+        orderedFields = []
+        while len(orderedFields) < len(relationFields):
+            readyFields = [
+                field for field in relationFields
+                if field not in orderedFields and all(
+                    dep in orderedFields for dep in dependencies[field])
+            ]
+            if len(readyFields) == 0:
+                raise _UnsupportedDefinition("relations depend on each other")
+            orderedFields.extend(readyFields)
+        return orderedFields
+
+    @typeCheck(int)
+    def generate(self, count, nbThread=1):
+        """Generates messages.
+
+        :param count: the number of messages to generate
+        :type count: :class:`int`
+        :keyword nbThread: the number of processes generating the messages (use None for the number of cpu)
+        :type nbThread: :class:`int`
+        :return: the generated messages
+        :rtype: a :class:`list` of :class:`bytes`
+        """
+        if count is None or count < 0:
+            raise ValueError("Count must be a positive integer")
+        if nbThread is None:
+            nbThread = multiprocessing.cpu_count()
+        if nbThread < 1:
+            raise ValueError(
+                "NbThread cannot be <1, use None to use all the available cpus.")
+
+        if nbThread == 1 or count < 2:
+            if self.__isCompiled:
+                return self.__generateCompiled(count)
+            return self.__generateGeneric(count)
+
+        if self.__memory is not None:
+            raise ValueError(
+                "A memory cannot be shared by messages generated in several processes")
+
+        # a few shards per worker balance the load without too many exchanges
+        shardSize = int(math.ceil(count / (nbThread * 4)))
+        shards = [
+            min(shardSize, count - i) for i in range(0, count, shardSize)
+        ]
+        messages = []
+        pool = multiprocessing.Pool(
+            nbThread, initializer=_initializeWorker, initargs=(self, ))
+        try:
+            for shardMessages in pool.imap(_generateShard, shards):
+                messages.extend(shardMessages)
+        finally:
+            pool.terminate()
+            pool.join()
+        return messages
+
+    def __generateGeneric(self, count):
+        """Generates the messages with the generic specializer."""
+        messages = []
+        for i in range(count):
+            specializer = MessageSpecializer(
+                memory=self.__memory, presets=self.__presets)
+            path = specializer.specializeSymbol(self.__symbol)
+            messages.append(path.generatedContent.tobytes())
+        return messages
+
+    def __generateCompiled(self, count):
+        """Generates the messages following the compiled plan."""
+        values = dict()
+
+        # dynamic fields are generated field after field
+        for field in self.__dataFields:
+            dataType = field.domain.dataType
+            values[field] = [dataType.generate() for i in range(count)]
+
+        for field in self.__nodeFields:
+            fieldSpecializer = FieldSpecializer(field)
+            fieldValues = []
+            for i in range(count):
+                path = next(
+                    fieldSpecializer.iterSpecialize(
+                        SpecializingPath(memory=Memory())), None)
+                if path is None:
+                    raise Exception("Cannot specialize this symbol.")
+                fieldValues.append(path.getDataAssignedToField(field))
+            values[field] = fieldValues
+
+        # relations are computed in a single pass, message after message,
+        # with a path in which the values of the message replace the
+        # values of the previous one
+        if len(self.__relationFields) > 0:
+            path = GenericPath()
+            for field, value in self.__staticValues.items():
+                path.assignDataToField(value, field)
+                path.assignDataToVariable(value, field.domain)
+            dynamicValues = list(values.items())
+            for field in self.__relationFields:
+                values[field] = []
+            for i in range(count):
+                for field, fieldValues in dynamicValues:
+                    path.assignDataToField(fieldValues[i], field)
+                    path.assignDataToVariable(fieldValues[i], field.domain)
+                for field in self.__relationFields:
+                    value = field.domain._computeExpectedValue(path)
+                    path.assignDataToField(value, field)
+                    path.assignDataToVariable(value, field.domain)
+                    values[field].append(value)
+
+        for field in self.__memorizedFields:
+            if count > 0:
+                self.__memory.memorize(field.domain, values[field][-1])
+
+        # the content of each message
+        segments = [
+            segment if isinstance(segment, bitarray) else values[segment]
+            for segment in self.__segments
+        ]
+        messages = []
+        for i in range(count):
+            content = None
+            for segment in segments:
+                value = segment if isinstance(segment, bitarray) else segment[i]
+                if content is None:
+                    content = value.copy()
+                else:
+                    content += value
+            messages.append(content.tobytes())
+        return messages
+
+    # Properties
+
+    @property
+    def symbol(self):
+        """The symbol from which messages are generated.
+
+        :type: :class:`netzob.Model.Vocabulary.Symbol.Symbol`
+        """
+        return self.__symbol
+
+    @property
+    def isCompiled(self):
+        """True if the messages are generated following the compiled plan,
+        False if the symbol definition requires the generic specializer.
+
+        :type: :class:`bool`
+        """
+        return self.__isCompiled
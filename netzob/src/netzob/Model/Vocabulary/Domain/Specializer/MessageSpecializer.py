@@ -107,7 +107,11 @@ class MessageSpecializer(object):
 
     @typeCheck(Symbol)
     def specializeSymbol(self, symbol):
-        """This method generates a message based on the provided symbol definition."""
+        """This method generates a message based on the provided symbol definition.
+
+        Specializing paths are computed lazily and the first valid one is
+        retained, so alternatives are never enumerated.
+        """
         if symbol is None:
             raise Exception("Specified symbol is None")
 
@@ -115,35 +119,83 @@ class MessageSpecializer(object):
 
         self._update_presets(symbol)
 
-        # this variable host all the specialization path
-        specializingPaths = [SpecializingPath(memory=self.memory)]
+        retainedPath = next(
+            self.__iterSpecializingPaths(
+                symbol, SpecializingPath(memory=self.memory)), None)
 
-        for field in symbol.fields:
-            self._logger.debug("Specializing field {0}".format(field.name))
+        if retainedPath is None:
+            raise Exception("Cannot specialize this symbol.")
 
-            fieldDomain = field.domain
-            if fieldDomain is None:
-                raise Exception(
-                    "Cannot specialize field '{0}' since it defines no domain".
-                    format(fieldDomain))
+        self.__generateContent(symbol, retainedPath)
 
-            fs = FieldSpecializer(field, presets=self.presets)
+        self._logger.debug("Specialized message: {0}".format(
+            TypeConverter.convert(retainedPath.generatedContent, BitArray,
+                                  ASCII)))
+        self.memory = retainedPath.memory
 
-            newSpecializingPaths = []
-            for specializingPath in specializingPaths:
-                newSpecializingPaths.extend(fs.specialize(specializingPath))
+        return retainedPath
 
-            specializingPaths = newSpecializingPaths
+    @typeCheck(Symbol)
+    def iterSpecializeSymbol(self, symbol):
+        """Enumerates the valid specializations of the provided symbol
+        definition. Each specializing path is only computed when it is
+        consumed, and relies on its own copy of the memory: the memory of
+        the specializer is left untouched.
+
+        >>> from netzob.all import *
+        >>> f1 = Field(Alt([ASCII("hello"), ASCII("hi")]), name="f1")
+        >>> f2 = Field(ASCII(" "), name="f2")
+        >>> f3 = Field(Alt([ASCII("netzob"), ASCII("zoby"), ASCII("world")]), name="f3")
+        >>> s = Symbol(fields=[f1, f2, f3])
+        >>> ms = MessageSpecializer()
+        >>> messages = [TypeConverter.convert(path.generatedContent, BitArray, ASCII) for path in ms.iterSpecializeSymbol(s)]
+        >>> len(messages)
+        6
+        >>> sorted(messages)
+        ['hello netzob', 'hello world', 'hello zoby', 'hi netzob', 'hi world', 'hi zoby']
+
+        >>> import itertools
+        >>> s = Symbol(fields=[Field(Repeat(ASCII(nbChars=(1, 100)), nbRepeat=(1, 100)))])
+        >>> paths = list(itertools.islice(ms.iterSpecializeSymbol(s), 3))
+        >>> len(paths)
+        3
+
+        :parameter symbol: the symbol to specialize
+        :type symbol: :class:`netzob.Model.Vocabulary.Symbol.Symbol`
+        :return: an iterator over the specializing paths, their generated content is set
+        """
+        if symbol is None:
+            raise Exception("Specified symbol is None")
 
-        if len(specializingPaths) > 1:
-            self._logger.info(
-                "TODO: multiple valid paths found when specializing this message."
-            )
+        self._logger.debug("Enumerates specializations of symbol '{0}'.".
+                           format(symbol.name))
 
-        if len(specializingPaths) == 0:
-            raise Exception("Cannot specialize this symbol.")
+        self._update_presets(symbol)
+
+        return self.__iterSpecializeSymbol(symbol)
+
+    def __iterSpecializeSymbol(self, symbol):
+        specializingPath = SpecializingPath(memory=self.memory.duplicate())
+        for path in self.__iterSpecializingPaths(symbol, specializingPath):
+            self.__generateContent(symbol, path)
+            yield path
+
+    def __iterSpecializingPaths(self, symbol, specializingPath):
+        """Returns an iterator over the paths that specialize all the fields
+        of the symbol."""
+
+        for field in symbol.fields:
+            if field.domain is None:
+                raise Exception(
+                    "Cannot specialize field '{0}' since it defines no domain".
+                    format(field.name))
 
-        retainedPath = specializingPaths[0]
+        return FieldSpecializer.iterSpecializeFields(
+            symbol.fields, specializingPath, presets=self.presets)
+
+    def __generateContent(self, symbol, retainedPath):
+        """Computes the content generated by a specializing path from the
+        data assigned to the fields of the symbol."""
 
         generatedContent = None
         # let's configure the generated content
@@ -179,13 +231,6 @@ class MessageSpecializer(object):
 
         retainedPath.generatedContent = generatedContent
 
-        self._logger.debug("Specialized message: {0}".format(
-            TypeConverter.convert(retainedPath.generatedContent, BitArray,
-                                  ASCII)))
-        self.memory = retainedPath.memory
-
-        return retainedPath
-
     @property
     def memory(self):
         """Memory used while specializing current symbol.
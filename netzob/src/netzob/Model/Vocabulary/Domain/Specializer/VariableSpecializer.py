@@ -71,3 +71,14 @@ class VariableSpecializer():
                 self.variable, len(variableSpecializingPaths)))
 
         return variableSpecializingPaths
+
+    @typeCheck(SpecializingPath)
+    def iterSpecialize(self, specializingPath):
+        """Lazily execute the specialize operation"""
+
+        if specializingPath is None:
+            raise Exception("SpecializingPath path cannot be None")
+        if self.variable is None:
+            raise Exception("Variable cannot be None")
+
+        return self.variable.iterSpecialize(specializingPath)
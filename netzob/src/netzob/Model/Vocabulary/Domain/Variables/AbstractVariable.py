@@ -54,6 +54,17 @@ class AbstractVariable(object):
     This class is abstract and so should not be instanciated directly.
     """
 
+    # Incremented each time a definition domain is modified (the domain of
+    # a field, the children of a node, the fields of a relation or the
+    # current value of a data), so that analyses of the definitions know
+    # when they must be recomputed
+    definitionVersion = 0
+
+    @staticmethod
+    def notifyDefinitionChange():
+        """Invalidates the analyses made on the current definition domains."""
+        AbstractVariable.definitionVersion += 1
+
     def __init__(self, varType, varId=None, name=None, svas=None):
         """Constructor
 
@@ -107,6 +118,19 @@ class AbstractVariable(object):
     #     """Returns a string which denotes
     #     the current domain definition using a tree display"""
 
+    def iterSpecialize(self, specializingPath):
+        """Returns an iterator over the specializing paths of the variable.
+
+        Variables that can produce many alternatives (nodes) override this
+        method so that a path is only computed when it is consumed. Others
+        simply iterate over the paths returned by `specialize()`.
+
+        :parameter specializingPath: the path to specialize
+        :type specializingPath: :class:`netzob.Model.Vocabulary.Domain.Specializer.SpecializingPath.SpecializingPath`
+        :return: an iterator over the valid specializing paths
+        """
+        return iter(self.specialize(specializingPath))
+
     #+---------------------------------------------------------------------------+
     #| Properties                                                                |
     #+---------------------------------------------------------------------------+
@@ -44,6 +44,7 @@
 #| Local application imports                                                 |
 #+---------------------------------------------------------------------------+
 from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
+from netzob.Model.Vocabulary.Domain.Variables.AbstractVariable import AbstractVariable
 from netzob.Model.Vocabulary.Domain.Variables.Leafs.AbstractVariableLeaf import AbstractVariableLeaf
 from netzob.Model.Vocabulary.AbstractField import AbstractField
 from netzob.Model.Vocabulary.Domain.Variables.SVAS import SVAS
@@ -58,10 +59,141 @@ class AbstractRelationVariableLeaf(AbstractVariableLeaf):
     def __init__(self, varType, fieldDependencies=None, name=None):
         super(AbstractRelationVariableLeaf, self).__init__(
             varType, name, svas=SVAS.VOLATILE)
+        self.__analysedVersion = None
+        self.__requiredRelations = []
+        self.__dependencyRank = 0
         if fieldDependencies is None:
             fieldDependencies = []
         self.fieldDependencies = fieldDependencies
 
+    def getRequiredRelations(self):
+        """Returns the relations whose value must be computed before the
+        value of this relation, i.e. the relations found in the domain of
+        its :attr:`requiredFields`.
+
+        >>> from netzob.all import *
+        >>> f2 = Field(ASCII(nbChars=(1, 5)), name="f2")
+        >>> f1 = Field(Size(f2), name="f1")
+        >>> f0 = Field(name="f0")
+        >>> f0.domain = InternetChecksum([f0, f1, f2], dataType=Raw(nbBytes=2))
+        >>> f0.domain.getRequiredRelations() == [f1.domain]
+        True
+        >>> f1.domain.getRequiredRelations()
+        []
+
+        :return: the relations this relation depends on
+        :rtype: a :class:`list` of :class:`AbstractRelationVariableLeaf`
+        """
+        self.__analyseDependencies()
+        return list(self.__requiredRelations)
+
+    def checkDependencies(self):
+        """Checks the value of the relation does not depend on itself
+        through the other relations it depends on.
+
+        >>> from netzob.all import *
+        >>> f1 = Field(name="f1")
+        >>> f2 = Field(name="f2")
+        >>> f1.domain = Value(f2)
+        >>> f2.domain = Value(f1)
+        >>> f1.domain.checkDependencies()
+        Traceback (most recent call last):
+        ...
+        Exception: Cyclic dependencies between relations: Value(f2) -> Value(f1) -> Value(f2)
+
+        :raise: :class:`Exception` if a cycle is found
+        """
+        self.__analyseDependencies()
+
+    @property
+    def dependencyRank(self):
+        """The position of the relation in a topological order of the
+        relations: 0 if it does not depend on other relations, else one
+        more than the highest rank of the relations it depends on
+        (Read-only).
+
+        The dependencies are analysed once and kept until a definition
+        domain is modified (see
+        :meth:`netzob.Model.Vocabulary.Domain.Variables.AbstractVariable.AbstractVariable.notifyDefinitionChange`).
+
+        >>> from netzob.all import *
+        >>> f2 = Field(ASCII(nbChars=(1, 5)), name="f2")
+        >>> f1 = Field(Size(f2), name="f1")
+        >>> f0 = Field(Value(f1), name="f0")
+        >>> f1.domain.dependencyRank, f0.domain.dependencyRank
+        (0, 1)
+
+        :type: :class:`int`
+        :raise: :class:`Exception` if the relation depends on a cycle of relations
+        """
+        self.__analyseDependencies()
+        return self.__dependencyRank
+
+    def __analyseDependencies(self):
+        """Computes the required relations and the rank of this relation,
+        and of all the relations it depends on, with a depth first search
+        of the relation graph."""
+        version = AbstractVariable.definitionVersion
+        if self.__analysedVersion == version:
+            return
+
+        requiredRelations = dict()
+
+        def required(relation):
+            if id(relation) not in requiredRelations:
+                requiredRelations[id(relation)] = relation.__findRequiredRelations()
+            return requiredRelations[id(relation)]
+
+        ranks = dict()
+        path = [self]
+        iterators = [iter(required(self))]
+        while len(iterators) > 0:
+            relation = next(iterators[-1], None)
+            if relation is None:
+                # all the relations it depends on are ranked
+                done = path.pop()
+                iterators.pop()
+                ranks[id(done)] = 1 + max(
+                    [ranks[id(r)] for r in required(done)], default=-1)
+                done.__requiredRelations = required(done)
+                done.__dependencyRank = ranks[id(done)]
+                done.__analysedVersion = version
+            elif any(relation is r for r in path):
+                cycle = path[[id(r) for r in path].index(id(relation)):]
+                raise Exception(
+                    "Cyclic dependencies between relations: {0}".format(
+                        " -> ".join(str(r) for r in cycle + [relation])))
+            elif id(relation) not in ranks:
+                path.append(relation)
+                iterators.append(iter(required(relation)))
+
+    def __findRequiredRelations(self):
+        relations = []
+        for field in self.requiredFields:
+            variables = [field.domain]
+            while len(variables) > 0:
+                variable = variables.pop()
+                if isinstance(variable, AbstractRelationVariableLeaf):
+                    if variable is not self and not any(
+                            variable is r for r in relations):
+                        relations.append(variable)
+                elif hasattr(variable, "children"):
+                    variables.extend(variable.children)
+        return relations
+
+    @property
+    def requiredFields(self):
+        """The fields whose value is read to compute the value of this
+        relation. It is :attr:`fieldDependencies`, minus the field of
+        the relation itself.
+
+        :type: a list of :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        """
+        return [
+            field for field in self.fieldDependencies
+            if field.domain is not self
+        ]
+
     @property
     def fieldDependencies(self):
         """A list of fields that are required before computing the value of this relation
@@ -81,3 +213,4 @@ class AbstractRelationVariableLeaf(AbstractVariableLeaf):
         self.__fieldDependencies = []
         for f in fields:
             self.__fieldDependencies.extend(f.getLeafFields())
+        AbstractVariable.notifyDefinitionChange()
@@ -44,6 +44,7 @@ from bitarray import bitarray
 # | Local application imports                                                 |
 # +---------------------------------------------------------------------------+
 from netzob.Common.Utils.Decorators import typeCheck, NetzobLogger
+from netzob.Model.Vocabulary.Domain.Variables.AbstractVariable import AbstractVariable
 from netzob.Model.Vocabulary.Domain.Variables.Leafs.AbstractVariableLeaf import AbstractVariableLeaf
 from netzob.Model.Vocabulary.Domain.Specializer.SpecializingPath import SpecializingPath
 from netzob.Model.Vocabulary.Domain.Parser.ParsingPath import ParsingPath
@@ -309,7 +310,7 @@ class Data(AbstractVariableLeaf):
             self.__class__.__name__, name=name, svas=svas)
 
         self.dataType = dataType
-        self.currentValue = originalValue
+        self.__setCurrentValue(originalValue)
 
     def __str__(self):
         return "Data ({0})".format(self.dataType)
@@ -399,12 +400,13 @@ class Data(AbstractVariableLeaf):
             #         yield newParsingPath
 
             for size in range(min(maxSize, len(content)), minSize - 1, -1):
+                value = content[:size]
                 # size == 0 : deals with 'optional' data
-                if size == 0 or self.dataType.canParse(content[:size]):
+                if size == 0 or self.dataType.canParse(value):
                     # we create a new parsing path and returns it
                     newParsingPath = parsingPath.duplicate()
 
-                    newParsingPath.addResult(self, content[:size].copy())
+                    newParsingPath.addResult(self, value)
                     yield newParsingPath
 
     @typeCheck(ParsingPath)
@@ -434,7 +436,7 @@ class Data(AbstractVariableLeaf):
         results = []
         if len(content) >= len(expectedValue) and content[:len(
                 expectedValue)] == expectedValue:
-            parsingPath.addResult(self, expectedValue.copy())
+            parsingPath.addResult(self, expectedValue)
             results.append(parsingPath)
         else:
             self._logger.debug("{0} cannot be parsed with variable {1}".format(
@@ -467,12 +469,13 @@ class Data(AbstractVariableLeaf):
             #            maxSize = len(content)
 
             for size in range(min(maxSize, len(content)), minSize - 1, -1):
+                value = content[:size]
                 # size == 0 : deals with 'optional' data
-                if size == 0 or self.dataType.canParse(content[:size]):
+                if size == 0 or self.dataType.canParse(value):
                     # we create a new parsing path and returns it
                     newParsingPath = parsingPath.duplicate()
-                    newParsingPath.addResult(self, content[:size].copy())
-                    newParsingPath.memory.memorize(self, content[:size].copy())
+                    newParsingPath.addResult(self, value)
+                    newParsingPath.memory.memorize(self, value)
                     yield newParsingPath
 
     @typeCheck(SpecializingPath)
@@ -546,6 +549,11 @@ class Data(AbstractVariableLeaf):
     @currentValue.setter
     @typeCheck(bitarray)
     def currentValue(self, currentValue):
+        self.__setCurrentValue(currentValue)
+        AbstractVariable.notifyDefinitionChange()
+
+    @typeCheck(bitarray)
+    def __setCurrentValue(self, currentValue):
         if currentValue is not None:
             cv = currentValue.copy()
         else:
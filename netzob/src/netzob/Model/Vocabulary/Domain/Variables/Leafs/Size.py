@@ -428,3 +428,20 @@ class Size(AbstractRelationVariableLeaf):
             raise TypeError(
                 "Offset cannot be None, use 0 if no offset should be applied.")
         self.__offset = offset
+
+    @property
+    def requiredFields(self):
+        """The fields whose value is read to compute the size. Fields with
+        a fixed size are not part of it, as their size is known without
+        their value.
+
+        :type: a list of :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        """
+        requiredFields = []
+        for field in super(Size, self).requiredFields:
+            if hasattr(field.domain, "dataType"):
+                minSize, maxSize = field.domain.dataType.size
+                if maxSize is not None and minSize == maxSize:
+                    continue
+            requiredFields.append(field)
+        return requiredFields
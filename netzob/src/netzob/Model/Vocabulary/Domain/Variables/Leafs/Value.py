@@ -186,7 +186,7 @@ class Value(AbstractRelationVariableLeaf):
                     min(maxSizeDep, len(content)), minSizeDep - 1, -1):
                 # we create a new parsing path and returns it
                 newParsingPath = parsingPath.duplicate()
-                newParsingPath.addResult(self, content[:size].copy())
+                newParsingPath.addResult(self, content[:size])
                 self._addCallBacksOnUndefinedFields(newParsingPath)
                 results.append(newParsingPath)
         else:
@@ -230,6 +230,11 @@ class Value(AbstractRelationVariableLeaf):
 
         if not parsingPath.isDataAvailableForField(fieldDep):
             return None
+        elif isinstance(fieldDep.domain, AbstractRelationVariableLeaf):
+            # the value of a relation is updated by its callback while the
+            # data of its field keeps the pending value
+            return self._applyOperation(
+                parsingPath.getDataAssignedToVariable(fieldDep.domain))
         else:
             return self._applyOperation(parsingPath.getDataAssignedToField(fieldDep))
 
@@ -366,3 +371,15 @@ class Value(AbstractRelationVariableLeaf):
         if operation is not None and not callable(operation):
             raise TypeError("Operation must be a function")
         self.__operation = operation
+
+    @property
+    def requiredFields(self):
+        """The field whose value is read to compute the value, i.e. the
+        first field dependency.
+
+        :type: a list of :class:`netzob.Model.Vocabulary.AbstractField.AbstractField`
+        """
+        return [
+            field for field in self.fieldDependencies[:1]
+            if field.domain is not self
+        ]
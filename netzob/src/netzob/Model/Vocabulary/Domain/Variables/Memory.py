@@ -55,6 +55,12 @@ class Memory(object):
         self.memory = dict()
         self.__memoryAccessCB = None
 
+    def __ownMemory(self):
+        """Copies the memorized entries if they are shared with a duplicated memory."""
+        if self.__shared:
+            self.__memory = dict(self.__memory)
+            self.__shared = False
+
     @typeCheck(AbstractVariable, bitarray)
     def memorize(self, variable, value):
         """Memorizes the provided variable value.
@@ -67,7 +73,8 @@ class Memory(object):
         Data (ASCII=None ((0, None))): b'hello'
         
         """
-        self.memory[variable] = value
+        self.__ownMemory()
+        self.__memory[variable] = value
 
     @typeCheck(AbstractVariable)
     def hasValue(self, variable):
@@ -84,7 +91,11 @@ class Memory(object):
         False
 
         """
-        return variable in list(self.memory.keys())
+        try:
+            return variable in self.__memory
+        except TypeError:
+            # the hash of some variables cannot be computed
+            return variable in list(self.__memory.keys())
 
     @typeCheck(AbstractVariable)
     def getValue(self, variable):
@@ -98,7 +109,8 @@ class Memory(object):
         b'hello'
 
         """
-        return self.memory[variable]
+        # memorized values are shared between duplicated memories
+        return self.__memory[variable].copy()
 
     @typeCheck(AbstractVariable)
     def forget(self, variable):
@@ -114,11 +126,14 @@ class Memory(object):
         >>> memory.hasValue(variable)
         False
         """
-        if variable in list(self.memory.keys()):
-            self.memory.pop(variable, None)
+        if self.hasValue(variable):
+            self.__ownMemory()
+            self.__memory.pop(variable, None)
 
     def duplicate(self):
-        """Duplicates in a new memory
+        """Duplicates in a new memory. The entries are shared by both
+        memories until one of them is modified (copy-on-write), so a
+        duplication does not copy any memorized value.
 
         >>> from netzob.all import *
         >>> d1 = Data(Integer)
@@ -133,21 +148,28 @@ class Memory(object):
         bitarray('01100100')
         >>> m.getValue(d1).bytereverse()
         >>> m.getValue(d1)
-        bitarray('00100110')
+        bitarray('01100100')
         >>> m2.getValue(d1)
         bitarray('01100100')
+        >>> m2.memorize(d1, TypeConverter.convert(42, Integer, BitArray))
+        >>> m.getValue(d1)
+        bitarray('01100100')
+        >>> m2.forget(d2)
+        >>> m.hasValue(d2), m2.hasValue(d2)
+        (True, False)
 
         :return: a new memory containing the same entries than current one
         :rtype: :class:`netzob.Model.Vocabulary.Domain.Variables.Memory`
         """
         duplicatedMemory = Memory()
-        for k in list(self.memory.keys()):
-            duplicatedMemory.memory[k] = self.memory[k].copy()
+        duplicatedMemory.__memory = self.__memory
+        duplicatedMemory.__shared = True
+        self.__shared = True
         return duplicatedMemory
 
     def __str__(self):
         result = []
-        for var, value in list(self.memory.items()):
+        for var, value in list(self.__memory.items()):
             result.append("{0}: {1}".format(
                 var, TypeConverter.convert(value, BitArray, Raw)))
         return '\n'.join(result)
@@ -155,6 +177,7 @@ class Memory(object):
     @property
     def memory(self):
         """The content of the memory is stored in this dict().
+        It may be shared with duplicated memories and must not be modified directly.
 
         :type: :class:`dict`
         """
@@ -163,6 +186,7 @@ class Memory(object):
     @memory.setter
     def memory(self, memory):
         self.__memory = dict()
+        self.__shared = False
         for k, v in list(memory.items()):
             self.__memory[k] = v
 
@@ -78,6 +78,7 @@ class AbstractVariableNode(AbstractVariable):
         for child in children:
             normalizedChild = DomainFactory.normalizeDomain(child)
             self._children.append(normalizedChild)
+        AbstractVariable.notifyDefinitionChange()
 
     def _str_debug(self, deepness=0):
         """Returns a string which denotes
@@ -119,12 +119,12 @@ class Agg(AbstractVariableNode):
     def parse(self, parsingPath, carnivorous=False):
         """Parse the content with the definition domain of the aggregate.
         """
-        dataToParse = parsingPath.getDataAssignedToVariable(self).copy()
+        dataToParse = parsingPath.getDataAssignedToVariable(self)
         self._logger.debug("Parse '{0}' as {1} with parser path '{2}'".format(
             dataToParse, self, parsingPath))
 
         # initialy, there is a unique path to test (the provided one)
-        parsingPath.assignDataToVariable(dataToParse.copy(), self.children[0])
+        parsingPath.assignDataToVariable(dataToParse, self.children[0])
         parsingPaths = [parsingPath]
 
         # we parse all the children with the parserPaths produced by previous children
@@ -141,16 +141,16 @@ class Agg(AbstractVariableNode):
                 self._logger.debug(
                     "Parse {0} with {1}".format(current_child.id, parsingPath))
                 value_before_parsing = parsingPath.getDataAssignedToVariable(
-                    current_child).copy()
+                    current_child)
                 childParsingPaths = current_child.parse(
                     parsingPath, carnivorous=carnivorous)
 
                 for childParsingPath in childParsingPaths:
                     if childParsingPath.ok():
                         value_after_parsing = childParsingPath.getDataAssignedToVariable(
-                            current_child).copy()
+                            current_child)
                         remainingValue = value_before_parsing[len(
-                            value_after_parsing):].copy()
+                            value_after_parsing):]
                         if next_child is not None:
                             childParsingPath.assignDataToVariable(
                                 remainingValue, next_child)
@@ -178,7 +178,7 @@ class Agg(AbstractVariableNode):
                         child).copy()
                 else:
                     parsedData += parsingPath.getDataAssignedToVariable(
-                        child).copy()
+                        child)
 
             parsingPath.addResult(self, parsedData)
         return parsingPaths
@@ -187,47 +187,67 @@ class Agg(AbstractVariableNode):
     def specialize(self, originalSpecializingPath):
         """Specializes an Agg"""
 
-        # initialy, there is a unique path to specialize (the provided one)
-        specializingPaths = [originalSpecializingPath]
+        specializingPaths = list(self.iterSpecialize(originalSpecializingPath))
 
-        # we parse all the children with the specializerPaths produced by previous children
-        for child in self.children:
-            newSpecializingPaths = []
+        self._logger.debug("Specializing AGG has produced {0} paths".format(
+            len(specializingPaths)))
+
+        return specializingPaths
 
-            self._logger.debug("Specializing AGG child with {0} paths".format(
-                len(specializingPaths)))
+    @typeCheck(SpecializingPath)
+    def iterSpecialize(self, originalSpecializingPath):
+        """Lazily specializes an Agg. Each path produced by a child is
+        completed with the following children before the next one is
+        computed, so the first valid path is found without enumerating
+        the alternatives of every child.
+
+        >>> from netzob.all import *
+        >>> from netzob.Model.Vocabulary.Domain.Specializer.SpecializingPath import SpecializingPath
+        >>> domain = Agg([ASCII("hello "), Alt([ASCII("netzob"), ASCII("zoby")])])
+        >>> paths = domain.iterSpecialize(SpecializingPath(memory=Memory()))
+        >>> first = next(paths)
+        >>> TypeConverter.convert(first.getDataAssignedToVariable(domain), BitArray, ASCII) in ["hello netzob", "hello zoby"]
+        True
 
-            for specializingPath in specializingPaths:
+        """
+        if originalSpecializingPath is None:
+            raise Exception("Specializing path cannot be None")
+
+        return self.__iterSpecialize(originalSpecializingPath)
+
+    def __iterSpecialize(self, originalSpecializingPath):
+        if len(self.children) == 0:
+            yield self.__assignValue(originalSpecializingPath)
+            return
+
+        # one iterator per child, the paths it produces are completed by
+        # the following children before the next one is computed
+        iterators = [self.children[0].iterSpecialize(originalSpecializingPath)]
+        while len(iterators) > 0:
+            specializingPath = next(iterators[-1], None)
+            if specializingPath is None:
+                iterators.pop()
+                continue
+
+            if len(iterators) < len(self.children):
+                child = self.children[len(iterators)]
                 self._logger.debug(
                     "Spcialize {0} with {1}".format(child, specializingPath))
+                iterators.append(child.iterSpecialize(specializingPath))
+                continue
 
-                childSpecializingPaths = child.specialize(specializingPath)
-
-                if len(childSpecializingPaths) > 0:
-                    # at least one child path managed to specialize, we save the valid paths it produced
-                    for childSpecializingPath in childSpecializingPaths:
-                        newSpecializingPaths.append(childSpecializingPath)
-
-            specializingPaths = newSpecializingPaths
+            # all the children are specialized
+            yield self.__assignValue(specializingPath)
 
-        self._logger.debug("Specializing AGG child has produced {0} paths".
-                           format(len(specializingPaths)))
-
-        if len(specializingPaths) == 0:
-            self._logger.debug(
-                "Children {0} didn't apply to any of the specializer path we have, we stop Agg specializer".
-                format(child))
-            return []  # return no valid paths
-
-        for specializingPath in specializingPaths:
-            value = None
-            for child in self.children:
-                if value is None:
-                    value = specializingPath.getDataAssignedToVariable(child)
-                else:
-                    value += specializingPath.getDataAssignedToVariable(child)
-
-            specializingPath.addResult(self, value)
+    def __assignValue(self, specializingPath):
+        """Assigns to the Agg the concatenation of the values of its children."""
+        value = None
+        for child in self.children:
+            if value is None:
+                value = specializingPath.getDataAssignedToVariable(
+                    child).copy()
+            else:
+                value += specializingPath.getDataAssignedToVariable(child)
 
-        # ok we managed to parse all the children, and it produced some valid specializer paths. We return them
-        return specializingPaths
+        specializingPath.addResult(self, value)
+        return specializingPath
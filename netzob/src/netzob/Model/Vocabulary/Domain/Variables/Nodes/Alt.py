@@ -118,13 +118,13 @@ class Alt(AbstractVariableNode):
         self._logger.debug("Parse '{0}' with '{1}'".format(dataToParse, self))
 
         parserPaths = [parsingPath]
-        parsingPath.assignDataToVariable(dataToParse.copy(), self.children[0])
+        parsingPath.assignDataToVariable(dataToParse, self.children[0])
 
         # create a path for each child
         if len(self.children) > 1:
             for child in self.children[1:]:
                 newParsingPath = parsingPath.duplicate()
-                newParsingPath.assignDataToVariable(dataToParse.copy(), child)
+                newParsingPath.assignDataToVariable(dataToParse, child)
                 parserPaths.append(newParsingPath)
 
         # parse each child according to its definition
@@ -145,38 +145,55 @@ class Alt(AbstractVariableNode):
     def specialize(self, specializingPath):
         """Specializes an Alt"""
 
+        specializingPaths = list(self.iterSpecialize(specializingPath))
+
+        if len(specializingPaths) == 0:
+            self._logger.debug(
+                "No children of {0} successfuly specialized".format(self))
+
+        return specializingPaths
+
+    @typeCheck(SpecializingPath)
+    def iterSpecialize(self, specializingPath):
+        """Lazily specializes an Alt. Children are tried in a random order
+        and the paths of a child are only computed once the paths of the
+        previous children have been consumed.
+
+        >>> from netzob.all import *
+        >>> from netzob.Model.Vocabulary.Domain.Specializer.SpecializingPath import SpecializingPath
+        >>> domain = Alt([ASCII("netzob"), ASCII("zoby")])
+        >>> paths = domain.iterSpecialize(SpecializingPath(memory=Memory()))
+        >>> first = next(paths)
+        >>> TypeConverter.convert(first.getDataAssignedToVariable(domain), BitArray, ASCII) in ["netzob", "zoby"]
+        True
+        >>> len(list(paths))
+        1
+
+        """
+
         if specializingPath is None:
             raise Exception("SpecializingPath cannot be None")
 
         if len(self.children) == 0:
             raise Exception("Cannot specialize ALT if its has no children")
 
-        specializingPaths = []
+        return self.__iterSpecialize(specializingPath)
 
-        # parse each child according to its definition
-        for i_child, child in enumerate(self.children):
+    def __iterSpecialize(self, specializingPath):
+        # by default we only consider the first valid path, so children
+        # are mixed to pick a random one
+        children = list(enumerate(self.children))
+        random.shuffle(children)
+
+        # specialize each child according to its definition
+        for i_child, child in children:
             newSpecializingPath = specializingPath.duplicate()
             self._logger.debug("ALT Specialize of {0}/{1} with {2}".format(
                 i_child + 1, len(self.children), newSpecializingPath))
 
-            childSpecializingPaths = child.specialize(newSpecializingPath)
-            if len(childSpecializingPaths) == 0:
-                self._logger.debug("Path {0} on child {1} didn't succeed.".
-                                   format(newSpecializingPath, child))
-            else:
-                self._logger.debug("Path {0} on child {1} succeed.".format(
-                    newSpecializingPath, child))
-                for childSpecializingPath in childSpecializingPaths:
-                    childSpecializingPath.addResult(
-                        self,
-                        childSpecializingPath.getDataAssignedToVariable(child))
-
-                specializingPaths.extend(childSpecializingPaths)
-
-        if len(specializingPaths) == 0:
-            self._logger.debug(
-                "No children of {0} successfuly specialized".format(self))
-
-        # lets shuffle this ( :) ) >>> by default we only consider the first valid parsing path.
-        random.shuffle(specializingPaths)
-        return specializingPaths
+            for childSpecializingPath in child.iterSpecialize(
+                    newSpecializingPath):
+                childSpecializingPath.addResult(
+                    self,
+                    childSpecializingPath.getDataAssignedToVariable(child))
+                yield childSpecializingPath
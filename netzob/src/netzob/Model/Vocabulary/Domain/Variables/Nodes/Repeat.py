@@ -131,7 +131,7 @@ class Repeat(AbstractVariableNode):
             raise Exception("Parsing path cannot be None")
 
         # retrieve the data to parse
-        dataToParse = parsingPath.getDataAssignedToVariable(self).copy()
+        dataToParse = parsingPath.getDataAssignedToVariable(self)
 
         # remove any data assigned to this variable
         parsingPath.removeAssignedDataToVariable(self)
@@ -143,7 +143,7 @@ class Repeat(AbstractVariableNode):
 
             # initiate a new parsing path based on the current one
             newParsingPath = parsingPath.duplicate()
-            newParsingPath.assignDataToVariable(dataToParse.copy(),
+            newParsingPath.assignDataToVariable(dataToParse,
                                                 self.children[0])
             newParsingPaths = [newParsingPath]
 
@@ -170,22 +170,21 @@ class Repeat(AbstractVariableNode):
 
                         childParsingPath.addResult(self, newResult)
                         childParsingPath.assignDataToVariable(
-                            dataToParse.copy()[len(newResult):],
-                            self.children[0])
+                            dataToParse[len(newResult):], self.children[0])
 
                         # apply delimitor
                         if self.delimitor is not None:
                             if i_repeat < nb_repeat - 1:
                                 # check the delimitor is available
                                 toParse = childParsingPath.getDataAssignedToVariable(
-                                    self.children[0]).copy()
+                                    self.children[0])
                                 if toParse[:len(
                                         self.delimitor)] == self.delimitor:
                                     newResult = childParsingPath.getDataAssignedToVariable(
                                         self).copy() + self.delimitor
                                     childParsingPath.addResult(self, newResult)
                                     childParsingPath.assignDataToVariable(
-                                        dataToParse.copy()[len(newResult):],
+                                        dataToParse[len(newResult):],
                                         self.children[0])
                                     tmp_result.append(childParsingPath)
                             else:
@@ -202,40 +201,66 @@ class Repeat(AbstractVariableNode):
     def specialize(self, originalSpecializingPath):
         """Specializes a Repeat"""
 
-        if originalSpecializingPath is None:
-            raise Exception("Specializing path cannot be None")
-
-        # initialy, there is a unique path to specialize (the provided one)
-        specializingPaths = []
+        return list(self.iterSpecialize(originalSpecializingPath))
 
-        for i_repeat in range(self.nbRepeat[0], self.nbRepeat[1]):
-            newSpecializingPaths = [originalSpecializingPath.duplicate()]
-
-            for i in range(i_repeat):
-                childSpecializingPaths = []
-                for newSpecializingPath in newSpecializingPaths:
-                    for path in self.children[0].specialize(
-                            newSpecializingPath):
-                        if path.isDataAvailableForVariable(self):
-                            newResult = path.getDataAssignedToVariable(
-                                self).copy()
-                            if self.delimitor is not None:
-                                newResult += self.delimitor
-                            newResult += path.getDataAssignedToVariable(
-                                self.children[0])
-                        else:
-                            newResult = path.getDataAssignedToVariable(
-                                self.children[0])
-                        path.addResult(self, newResult)
-                        childSpecializingPaths.append(path)
+    @typeCheck(SpecializingPath)
+    def iterSpecialize(self, originalSpecializingPath):
+        """Lazily specializes a Repeat. The numbers of repetitions are tried
+        in a random order and the paths of a number of repetitions are only
+        computed once the previous ones have been consumed.
+
+        >>> from netzob.all import *
+        >>> from netzob.Model.Vocabulary.Domain.Specializer.SpecializingPath import SpecializingPath
+        >>> domain = Repeat(ASCII("a"), nbRepeat=(1, 1000))
+        >>> paths = domain.iterSpecialize(SpecializingPath(memory=Memory()))
+        >>> value = TypeConverter.convert(next(paths).getDataAssignedToVariable(domain), BitArray, ASCII)
+        >>> 1 <= len(value) < 1000 and value == "a" * len(value)
+        True
 
-                newSpecializingPaths = childSpecializingPaths
-            specializingPaths.extend(newSpecializingPaths)
+        """
 
-        # lets shuffle this ( :) ) >>> by default we only consider the first valid parsing path.
-        random.shuffle(specializingPaths)
+        if originalSpecializingPath is None:
+            raise Exception("Specializing path cannot be None")
 
-        return specializingPaths
+        return self.__iterSpecialize(originalSpecializingPath)
+
+    def __iterSpecialize(self, originalSpecializingPath):
+        # by default we only consider the first valid path, so the numbers
+        # of repetitions are mixed to pick a random one
+        nbRepeats = list(range(self.nbRepeat[0], self.nbRepeat[1]))
+        random.shuffle(nbRepeats)
+
+        for i_repeat in nbRepeats:
+            yield from self.__iterRepeat(originalSpecializingPath.duplicate(),
+                                         i_repeat)
+
+    def __iterRepeat(self, specializingPath, nbRepeat):
+        if nbRepeat == 0:
+            yield specializingPath
+            return
+
+        # one iterator per repetition, kept in an explicit stack so that
+        # many repetitions do not exhaust the recursion limit
+        iterators = [self.children[0].iterSpecialize(specializingPath)]
+        while len(iterators) > 0:
+            path = next(iterators[-1], None)
+            if path is None:
+                iterators.pop()
+                continue
+
+            if path.isDataAvailableForVariable(self):
+                newResult = path.getDataAssignedToVariable(self).copy()
+                if self.delimitor is not None:
+                    newResult += self.delimitor
+                newResult += path.getDataAssignedToVariable(self.children[0])
+            else:
+                newResult = path.getDataAssignedToVariable(self.children[0])
+            path.addResult(self, newResult)
+
+            if len(iterators) == nbRepeat:
+                yield path
+            else:
+                iterators.append(self.children[0].iterSpecialize(path))
 
     @property
     def nbRepeat(self):
@@ -49,6 +49,7 @@ from netzob.Model.Vocabulary.Types.Raw import Raw
 from netzob.Model.Vocabulary.Types.BitArray import BitArray
 from netzob.Model.Vocabulary.Types.TypeConverter import TypeConverter
 from netzob.Model.Vocabulary.Domain.DomainFactory import DomainFactory
+from netzob.Model.Vocabulary.Domain.Variables.AbstractVariable import AbstractVariable
 from netzob.Model.Vocabulary.Domain.Variables.Memory import Memory
 
 
@@ -134,6 +135,7 @@ class Field(AbstractField):
         super(Field, self).__init__(name)
         if domain is None:
             domain = Raw(None)
+        self.__domain = None
         self.domain = domain
         self.isPseudoField = isPseudoField
 
@@ -170,13 +172,11 @@ class Field(AbstractField):
 
         from netzob.Model.Vocabulary.Domain.Specializer.FieldSpecializer import FieldSpecializer
         fs = FieldSpecializer(self)
-        specializingPaths = fs.specialize()
+        specializingPath = next(fs.iterSpecialize(), None)
 
-        if len(specializingPaths) < 1:
+        if specializingPath is None:
             raise Exception("Cannot specialize this field")
 
-        specializingPath = specializingPaths[0]
-
         self._logger.debug(
             "field specializing done: {0}".format(specializingPath))
         if specializingPath is None:
@@ -204,7 +204,11 @@ class Field(AbstractField):
     @domain.setter
     def domain(self, domain):
         normalizedDomain = DomainFactory.normalizeDomain(domain)
+        previousDomain = self.__domain
         self.__domain = normalizedDomain
+        # the first domain of a new field is not used by any analysis yet
+        if previousDomain is not None:
+            AbstractVariable.notifyDefinitionChange()
 
     @property
     def messages(self):
@@ -60,6 +60,17 @@ class EncodingFunction(SortableObject):
         from netzob.Model.Vocabulary.Functions.EncodingFunctions.DomainEncodingFunction import DomainEncodingFunction
         return DomainEncodingFunction()
 
+    def encodeMany(self, datas):
+        """Encodes a list of data, for instance all the values of a field.
+        Functions that can process many values at once override this method.
+
+        :param datas: the data to encode
+        :type datas: a :class:`list`
+        :return: the encoded data, in the same order
+        :rtype: a :class:`list`
+        """
+        return [self.encode(data) for data in datas]
+
     @abc.abstractmethod
     def priority(self):
         """Returns the priority of the current encoding filter."""
@@ -131,6 +131,27 @@ class TypeEncodingFunction(EncodingFunction):
             dst_endianness=self.endianness,
             dst_sign=self.sign)
 
+    def encodeMany(self, datas):
+        """Encodes a list of data with a single call to
+        :meth:`netzob.Model.Vocabulary.Types.TypeConverter.TypeConverter.convertMany`.
+
+        >>> from netzob.all import *
+        >>> f = TypeEncodingFunction(Integer, unitSize=AbstractType.UNITSIZE_16, sign=AbstractType.SIGN_UNSIGNED)
+        >>> f.encodeMany([TypeConverter.convert(b"\\x01\\x00", Raw, BitArray), TypeConverter.convert(b"\\xff\\xff", Raw, BitArray)])
+        [256, 65535]
+
+        :param datas: the data to encode
+        :type datas: a :class:`list` of :class:`bitarray.bitarray`
+        :rtype: a :class:`list`
+        """
+        return TypeConverter.convertMany(
+            datas,
+            BitArray,
+            self.type,
+            dst_unitSize=self.unitSize,
+            dst_endianness=self.endianness,
+            dst_sign=self.sign)
+
     def priority(self):
         """Returns the priority of the current encoding filter."""
         return 100
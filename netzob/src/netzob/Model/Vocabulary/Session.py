@@ -289,10 +289,12 @@ class Session(object):
             return False
 
     @typeCheck(list)
-    def abstract(self, symbolList):
+    def abstract(self, symbolList, nbThread=1):
         """This method abstract each message of the current session
         into symbols according to a list of symbols given as
-        parameter.
+        parameter. Messages are abstracted at once (see
+        :meth:`netzob.Model.Vocabulary.AbstractField.AbstractField.abstractMany`),
+        by `nbThread` processes.
 
         >>> from netzob.all import *
         >>> symbolSYN = Symbol([Field(ASCII("SYN"))], name="Symbol_SYN")
@@ -323,7 +325,14 @@ class Session(object):
                 "The current session cannot be abstracted as it not a true session (i.e. it may contain inner true sessions)."
             )
             return abstractSession
-        for message in list(self.messages.values()):
-            (symbol, structured_message) = AbstractField.abstract(message.data, symbolList)
+        from netzob.Model.Vocabulary.UnknownSymbol import UnknownSymbol
+        from netzob.Model.Vocabulary.Messages.RawMessage import RawMessage
+        messages = list(self.messages.values())
+        result = AbstractField.abstractMany(messages, symbolList, nbThread=nbThread)
+        for (iMessage, message) in enumerate(messages):
+            symbol = result.getSymbol(iMessage)
+            if symbol is None:
+                symbol = UnknownSymbol(RawMessage(message.data))
+                self._logger.error("Impossible to abstract the message in one of the specified symbols, we create an unknown symbol for it: '{0}'".format(symbol))
             abstractSession.append((message.source, message.destination, symbol))
         return abstractSession
@@ -54,6 +54,7 @@ from netzob.Model.Vocabulary.Domain.Variables.Memory import Memory
 from netzob.Model.Vocabulary.Types.Raw import Raw
 from netzob.Model.Vocabulary.Types.BitArray import BitArray
 from netzob.Model.Vocabulary.Types.TypeConverter import TypeConverter
+from netzob.Common.Utils.DataAlignment.AlignmentCache import AlignmentCache
 
 
 class Symbol(AbstractField):
@@ -96,6 +97,7 @@ class Symbol(AbstractField):
         :type name: :class:`str`
         """
         super(Symbol, self).__init__(name)
+        self.__alignmentCache = AlignmentCache()
         self.__messages = TypedList(AbstractMessage)
         if messages is None:
             messages = []
@@ -179,6 +181,38 @@ class Symbol(AbstractField):
             return TypeConverter.convert(spePath.generatedContent, BitArray,
                                          Raw)
 
+    @typeCheck(int)
+    def specializeMany(self, count, memory=None, presets=None, nbThread=1):
+        """Generates several messages following the fields definitions of
+        the symbol, as `count` calls to :meth:`specialize` would, but the
+        symbol is only analysed once (see
+        :class:`netzob.Model.Vocabulary.Domain.Specializer.GenerationPlan.GenerationPlan`).
+
+        >>> from netzob.all import *
+        >>> f1 = Field(domain=ASCII(nbChars=(1, 10)))
+        >>> f0 = Field(domain=Size(f1))
+        >>> s = Symbol(fields=[Field("hello"), f0, f1])
+        >>> messages = s.specializeMany(1000)
+        >>> len(messages)
+        1000
+        >>> all(m[:5] == b"hello" and m[5] == len(m) - 6 for m in messages)
+        True
+
+        :param count: the number of messages to generate
+        :type count: :class:`int`
+        :keyword memory: the memory shared by the generated messages, if None each message is generated with an empty memory
+        :type memory: :class:`netzob.Model.Vocabulary.Domain.Variables.Memory.Memory`
+        :keyword presets: the values some fields should take (see :meth:`specialize`)
+        :type presets: :class:`dict`
+        :keyword nbThread: the number of processes generating the messages (use None for the number of cpu)
+        :type nbThread: :class:`int`
+        :return: the generated contents represented as Raw
+        :rtype: a :class:`list` of :class:`bytes`
+        """
+        from netzob.Model.Vocabulary.Domain.Specializer.GenerationPlan import GenerationPlan
+        plan = GenerationPlan(self, memory=memory, presets=presets)
+        return plan.generate(count, nbThread=nbThread)
+
     def clearMessages(self):
         """Delete all the messages attached to the current symbol"""
         while (len(self.__messages) > 0):
@@ -186,6 +220,14 @@ class Symbol(AbstractField):
 
     # Properties
 
+    @property
+    def alignmentCache(self):
+        """The cache that stores the alignment of the messages of the symbol (Read-only).
+
+        :type: :class:`netzob.Common.Utils.DataAlignment.AlignmentCache.AlignmentCache`
+        """
+        return self.__alignmentCache
+
     @property
     def messages(self):
         """A list containing all the messages that this symbol represent.
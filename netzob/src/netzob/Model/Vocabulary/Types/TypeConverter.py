@@ -32,6 +32,7 @@
 # +---------------------------------------------------------------------------+
 # | Related third party imports                                               |
 # +---------------------------------------------------------------------------+
+import numpy
 
 # +---------------------------------------------------------------------------+
 # | Local application imports                                                 |
@@ -52,12 +53,77 @@ class TypeConverter(object):
         """
         return AbstractType.supportedTypes()
 
+    # Conversion functions indexed by (sourceType, destinationType),
+    # built on first use as the types import this module
+    __conversions = None
+
     @staticmethod
     def __directEncoding():
         return {
             # (ASCII,bitarray):TypeConverter.__encodeASCIIToBitarray,
         }
 
+    @staticmethod
+    def __conversionTable():
+        if TypeConverter.__conversions is None:
+            directEncoding = TypeConverter.__directEncoding()
+            conversions = dict()
+            for sourceType in AbstractType.supportedTypes():
+                for destinationType in AbstractType.supportedTypes():
+                    key = (sourceType, destinationType)
+                    if key in directEncoding:
+                        conversions[key] = directEncoding[key]
+                    else:
+                        conversions[key] = TypeConverter.__buildConversion(
+                            sourceType, destinationType)
+            TypeConverter.__conversions = conversions
+        return TypeConverter.__conversions
+
+    @staticmethod
+    def __buildConversion(sourceType, destinationType):
+        """Returns a function converting from source to raw and then from
+        raw to destination."""
+        if sourceType is Raw:
+            decode = None
+        else:
+            decode = sourceType.decode
+        if destinationType is Raw:
+            encode = None
+        else:
+            encode = destinationType.encode
+
+        def conversion(data, src_unitSize, src_endianness, src_sign,
+                       dst_unitSize, dst_endianness, dst_sign):
+            if decode is not None:
+                data = decode(
+                    data,
+                    unitSize=src_unitSize,
+                    endianness=src_endianness,
+                    sign=src_sign)
+            if encode is not None:
+                data = encode(
+                    data,
+                    unitSize=dst_unitSize,
+                    endianness=dst_endianness,
+                    sign=dst_sign)
+            return data
+
+        return conversion
+
+    @staticmethod
+    def __getConversion(sourceType, destinationType):
+        try:
+            return TypeConverter.__conversionTable()[(sourceType,
+                                                      destinationType)]
+        except (KeyError, TypeError):
+            pass
+        # is the two formats supported ?
+        if sourceType not in AbstractType.supportedTypes():
+            raise TypeError(
+                "The source type ({0}) is not supported".format(sourceType))
+        raise TypeError("The destination type ({0}) is not supported".format(
+            destinationType))
+
     @staticmethod
     def convert(data,
                 sourceType,
@@ -127,42 +193,151 @@ class TypeConverter(object):
         :raise: TypeError if parameter not valid
 
         """
-        # is the two formats supported ?
-        if sourceType not in TypeConverter.supportedTypes():
-            raise TypeError(
-                "The source type ({0}) is not supported".format(sourceType))
-        if destinationType not in TypeConverter.supportedTypes():
-            raise TypeError("The destination type ({0}) is not supported".
-                            format(destinationType))
+        conversion = TypeConverter.__getConversion(sourceType,
+                                                   destinationType)
         if data is None:
             raise TypeError("Data cannot be None")
 
-        # Do we have a specific source to destination encoding function
-        if (sourceType, destinationType
-            ) in list(TypeConverter.__directEncoding().keys()):
-            func = TypeConverter.__directEncoding()[(sourceType,
-                                                     destinationType)]
-            return func(data, src_unitSize, src_endianness, src_sign,
-                        dst_unitSize, dst_endianness, dst_sign)
-        else:
-            # Convert from source to raw
-            if sourceType is not Raw:
-                binData = sourceType.decode(
-                    data,
-                    unitSize=src_unitSize,
-                    endianness=src_endianness,
-                    sign=src_sign)
-            else:
-                binData = data
+        return conversion(data, src_unitSize, src_endianness, src_sign,
+                          dst_unitSize, dst_endianness, dst_sign)
 
-            # Convert from raw to Destination
-            if destinationType is not Raw:
-                outputData = destinationType.encode(
-                    binData,
-                    unitSize=dst_unitSize,
-                    endianness=dst_endianness,
-                    sign=dst_sign)
+    @staticmethod
+    def convertMany(datas,
+                    sourceType,
+                    destinationType,
+                    src_unitSize=AbstractType.defaultUnitSize(),
+                    src_endianness=AbstractType.defaultEndianness(),
+                    src_sign=AbstractType.defaultSign(),
+                    dst_unitSize=AbstractType.defaultUnitSize(),
+                    dst_endianness=AbstractType.defaultEndianness(),
+                    dst_sign=AbstractType.defaultSign()):
+        """Encode a list of data provided as a sourceType to a
+        destinationType. The result is the same as calling :meth:`convert`
+        on each data, but conversions between Integer and Raw (or
+        BitArray) values of exactly one unit are made with a single NumPy
+        operation for the whole list.
+
+        >>> from netzob.all import *
+        >>> raws = TypeConverter.convertMany([1, 256, 65535], Integer, Raw, src_unitSize=AbstractType.UNITSIZE_16, src_sign=AbstractType.SIGN_UNSIGNED)
+        >>> raws
+        [b'\\x00\\x01', b'\\x01\\x00', b'\\xff\\xff']
+        >>> TypeConverter.convertMany(raws, Raw, Integer, dst_unitSize=AbstractType.UNITSIZE_16, dst_endianness=AbstractType.ENDIAN_LITTLE)
+        [256, 1, -1]
+        >>> TypeConverter.convertMany(["netzob", "!"], ASCII, BitArray)
+        [bitarray('011011100110010101110100011110100110111101100010'), bitarray('00100001')]
+
+        Values that do not fit the unit size raise the same error as :meth:`convert`.
+
+        >>> TypeConverter.convertMany([1, 256], Integer, Raw, src_sign=AbstractType.SIGN_UNSIGNED)
+        Traceback (most recent call last):
+        ...
+        struct.error: ubyte format requires 0 <= number <= 255
+
+        :param datas: the data to convert
+        :type datas: a :class:`list`
+        :return: the converted data, in the same order
+        :rtype: a :class:`list`
+
+        Other parameters are the ones of :meth:`convert`.
+
+        :raise: TypeError if parameter not valid
+        """
+        from netzob.Model.Vocabulary.Types.BitArray import BitArray
+        from netzob.Model.Vocabulary.Types.Integer import Integer
+
+        conversion = TypeConverter.__getConversion(sourceType,
+                                                   destinationType)
+        if datas is None:
+            raise TypeError("Datas cannot be None")
+        datas = list(datas)
+
+        results = None
+        if sourceType is Integer and destinationType in (Raw, BitArray):
+            raws = TypeConverter.__packIntegers(datas, src_unitSize,
+                                                src_endianness, src_sign)
+            if raws is not None and destinationType is BitArray:
+                results = [
+                    BitArray.encode(
+                        raw,
+                        unitSize=dst_unitSize,
+                        endianness=dst_endianness,
+                        sign=dst_sign) for raw in raws
+                ]
             else:
-                outputData = binData
+                results = raws
+        elif destinationType is Integer and sourceType in (Raw, BitArray):
+            if sourceType is BitArray:
+                raws = [
+                    None if data is None else data.tobytes()
+                    for data in datas
+                ]
+            else:
+                raws = datas
+            results = TypeConverter.__unpackIntegers(raws, dst_unitSize,
+                                                     dst_endianness, dst_sign)
+
+        if results is None:
+            results = []
+            for data in datas:
+                if data is None:
+                    raise TypeError("Data cannot be None")
+                results.append(
+                    conversion(data, src_unitSize, src_endianness, src_sign,
+                               dst_unitSize, dst_endianness, dst_sign))
+        return results
 
-            return outputData
+    @staticmethod
+    def __integerDtype(unitSize, endianness, sign):
+        """Returns the NumPy dtype of an Integer, None if not applicable."""
+        nbBytes = {
+            AbstractType.UNITSIZE_8: 1,
+            AbstractType.UNITSIZE_16: 2,
+            AbstractType.UNITSIZE_32: 4,
+            AbstractType.UNITSIZE_64: 8
+        }.get(unitSize)
+        if nbBytes is None:
+            return None
+        if endianness == AbstractType.ENDIAN_BIG:
+            byteOrder = '>'
+        elif endianness == AbstractType.ENDIAN_LITTLE:
+            byteOrder = '<'
+        else:
+            return None
+        if sign == AbstractType.SIGN_UNSIGNED:
+            kind = 'u'
+        else:
+            kind = 'i'
+        return numpy.dtype("{0}{1}{2}".format(byteOrder, kind, nbBytes))
+
+    @staticmethod
+    def __packIntegers(values, unitSize, endianness, sign):
+        """Returns the raw encoding of integers on one unit each, None if
+        the values cannot be packed at once."""
+        dtype = TypeConverter.__integerDtype(unitSize, endianness, sign)
+        if dtype is None or len(values) == 0:
+            return None
+        array = numpy.array(values)
+        if array.ndim != 1 or array.dtype.kind not in 'iu':
+            return None
+        # out of range values are converted one by one to raise the usual error
+        limits = numpy.iinfo(dtype)
+        if array.min() < limits.min or array.max() > limits.max:
+            return None
+        packed = array.astype(dtype).tobytes()
+        nbBytes = dtype.itemsize
+        return [
+            packed[i:i + nbBytes] for i in range(0, len(packed), nbBytes)
+        ]
+
+    @staticmethod
+    def __unpackIntegers(raws, unitSize, endianness, sign):
+        """Returns the integers encoded in raws of exactly one unit, None
+        if the raws cannot be unpacked at once."""
+        dtype = TypeConverter.__integerDtype(unitSize, endianness, sign)
+        if dtype is None or len(raws) == 0:
+            return None
+        nbBytes = dtype.itemsize
+        for raw in raws:
+            if not isinstance(raw, bytes) or len(raw) != nbBytes:
+                return None
+        return numpy.frombuffer(b''.join(raws), dtype=dtype).tolist()
@@ -49,9 +49,11 @@ from netzob.Model.Vocabulary.Symbol import Symbol
 from netzob.Model.Vocabulary.EmptySymbol import EmptySymbol
 from netzob.Model.Vocabulary.AbstractField import AbstractField
 from netzob.Model.Vocabulary.Domain.Variables.Memory import Memory
+from netzob.Model.Vocabulary.Domain.Variables.AbstractVariable import AbstractVariable
 from netzob.Model.Vocabulary.Domain.Specializer.MessageSpecializer import MessageSpecializer
 from netzob.Model.Vocabulary.Domain.Parser.MessageParser import MessageParser
 from netzob.Model.Vocabulary.Domain.Parser.FlowParser import FlowParser
+from netzob.Model.Vocabulary.Domain.Parser.SymbolDispatcher import SymbolDispatcher
 from netzob.Model.Vocabulary.Types.TypeConverter import TypeConverter
 from netzob.Model.Vocabulary.Types.BitArray import BitArray
 from netzob.Model.Vocabulary.Types.Raw import Raw
@@ -108,6 +110,7 @@ class AbstractionLayer(object):
         self.specializer = MessageSpecializer(memory=self.memory)
         self.parser = MessageParser(memory=self.memory)
         self.flow_parser = FlowParser(memory=self.memory)
+        self.__dispatcher = None
 
     @typeCheck(Symbol)
     def writeSymbol(self, symbol, rate=None, duration=None, presets=None):
@@ -249,7 +252,10 @@ class AbstractionLayer(object):
     @typeCheck(int)
     def readSymbol(self, timeout=EmptySymbol.defaultReceptionTimeout()):
         """Read from the abstraction layer a message and abstract it
-        into a message.
+        into a message. Only the symbols that may parse the message are tried
+        (see :class:`netzob.Model.Vocabulary.Domain.Parser.SymbolDispatcher.SymbolDispatcher`),
+        symbols are analysed again when the list of symbols or their
+        definitions change, or when the layer is reset.
         The timeout parameter represents the amount of time (in millisecond) above which
         no reception of a message triggers the reception of an  :class:`netzob.Model.Vocabulary.EmptySymbol.EmptySymbol`. If timeout set to None
         or to a negative value means it always wait for the reception of a message.
@@ -257,6 +263,27 @@ class AbstractionLayer(object):
         :keyword timeout: the time above which no reception of message triggers the reception of an :class:`netzob.Model.Vocabulary.EmptySymbol.EmptySymbol`
         :type timeout: :class:`int`
         :raise TypeError if the parameter is not valid and Exception if an error occurs.
+
+        >>> from netzob.all import *
+        >>> f = Field("HELLO")
+        >>> symbol = Symbol([f], name="Symbol_Greeting")
+        >>> channelIn = UDPServer(localIP="127.0.0.1", localPort=8890)
+        >>> abstractionLayerIn = AbstractionLayer(channelIn, [symbol])
+        >>> abstractionLayerIn.openChannel()
+        >>> channelOut = UDPClient(remoteIP="127.0.0.1", remotePort=8890)
+        >>> abstractionLayerOut = AbstractionLayer(channelOut, [symbol])
+        >>> abstractionLayerOut.openChannel()
+        >>> abstractionLayerOut.writeSymbol(symbol)
+        5
+        >>> print(abstractionLayerIn.readSymbol())
+        (Symbol_Greeting, b'HELLO')
+        >>> f.domain = "WORLD"
+        >>> abstractionLayerOut.writeSymbol(symbol)
+        5
+        >>> print(abstractionLayerIn.readSymbol())
+        (Symbol_Greeting, b'WORLD')
+        >>> abstractionLayerIn.closeChannel()
+        >>> abstractionLayerOut.closeChannel()
         """
 
         self._logger.debug("Reading data from communication channel...")
@@ -267,7 +294,9 @@ class AbstractionLayer(object):
 
         # if we read some bytes, we try to abstract them
         if len(data) > 0:
-            for potential in self.symbols:
+            candidates = self.__getDispatcher().getCandidates(
+                data, self.parser.memory)
+            for potential in candidates:
                 try:
                     self.parser.parseMessage(RawMessage(data), potential)
                     symbol = potential
@@ -285,6 +314,16 @@ class AbstractionLayer(object):
 
         return (symbol, data)
 
+    def __getDispatcher(self):
+        """Returns the dispatcher of the current symbols, it is rebuilt
+        when the symbols or their definitions have changed."""
+        symbols = list(self.symbols)
+        if (self.__dispatcher is None or self.__dispatcher.fields != symbols
+                or self.__dispatcher.definitionVersion !=
+                AbstractVariable.definitionVersion):
+            self.__dispatcher = SymbolDispatcher(symbols)
+        return self.__dispatcher
+
     def openChannel(self):
         self.channel.open()
         self._logger.debug("Communication channel opened.")
@@ -299,3 +338,4 @@ class AbstractionLayer(object):
         self.specializer = MessageSpecializer(memory=self.memory)
         self.parser = MessageParser(memory=self.memory)
         self.flow_parser = FlowParser(memory=self.memory)
+        self.__dispatcher = None
@@ -38,6 +38,7 @@ import doctest
 from netzob.all import *
 from netzob.Common.Utils.DataAlignment import ParallelDataAlignment
 from netzob.Common.Utils.DataAlignment import DataAlignment
+from netzob.Common.Utils.DataAlignment import AlignmentCache
 from netzob.Model.Vocabulary import AbstractField
 from netzob.Model.Vocabulary.Domain.Variables import AbstractVariable
 from netzob.Model.Vocabulary.Messages import AbstractMessage
@@ -48,23 +49,38 @@ from netzob.Inference.Vocabulary.FormatOperations.FieldSplitStatic.ParallelField
 from netzob.Inference.Vocabulary.FormatOperations import ClusterByKeyField
 from netzob.Inference.Vocabulary.FormatOperations import ClusterByApplicativeData
 from netzob.Inference.Vocabulary.FormatOperations import ClusterByAlignment
+from netzob.Inference.Vocabulary.FormatOperations import MinHashLSH
+from netzob.Inference.Vocabulary.FormatOperations import SimilarityCache
 from netzob.Inference.Vocabulary.FormatOperations import ClusterBySize
 from netzob.Inference.Vocabulary.FormatOperations import FindKeyFields
 from netzob.Common.Utils import SortedTypedList
+from netzob.Common.Utils import ColumnarMatrixList
+from netzob.Common.Utils import Deduplicator
+from netzob.Import.PCAPImporter import PCAPReader
+from netzob.Import.PCAPImporter import TCPReassembler
 
 from netzob.Inference.Vocabulary.Search import SearchTask
 from netzob.Inference.Vocabulary.Search import SearchResult
+from netzob.Inference.Vocabulary.Search import PatternAutomaton
 from netzob.Inference.Vocabulary.FormatOperations.FieldSplitAligned import FieldSplitAligned
 from netzob.Inference.Vocabulary.FormatOperations import FieldSplitDelimiter
 
 from netzob.Inference.Vocabulary.FormatOperations import FieldOperations
 from netzob.Model.Vocabulary.Domain.GenericPath import GenericPath
+from netzob.Model.Vocabulary.Domain.Parser.ParsingPath import ParsingPath
+from netzob.Model.Vocabulary.Domain.Parser.BitArrayView import BitArrayView
 from netzob.Model.Vocabulary.Domain.Specializer.FieldSpecializer import FieldSpecializer
 from netzob.Model.Vocabulary.Domain.Specializer.VariableSpecializer import VariableSpecializer
 from netzob.Model.Vocabulary.Domain.Variables.SVAS import SVAS
+from netzob.Model.Vocabulary.Domain.Variables.Leafs.AbstractRelationVariableLeaf import AbstractRelationVariableLeaf
 
 from netzob.Model.Vocabulary.Domain.Parser.MessageParser import MessageParser
+from netzob.Model.Vocabulary.Domain.Parser.FixedLayoutParser import FixedLayoutParser
+from netzob.Model.Vocabulary.Domain.Parser.SymbolDispatcher import SymbolDispatcher
+from netzob.Model.Vocabulary.Domain.Parser.BatchAbstractor import BatchAbstractor
+from netzob.Model.Vocabulary.Domain.Parser.AbstractionResult import AbstractionResult
 from netzob.Model.Vocabulary.Domain.Specializer.MessageSpecializer import MessageSpecializer
+from netzob.Model.Vocabulary.Domain.Specializer.GenerationPlan import GenerationPlan
 from netzob.Model.Vocabulary.Domain.Parser.FlowParser import FlowParser
 
 from netzob.Simulator.AbstractionLayer import AbstractionLayer
@@ -95,6 +111,7 @@ def getSuite():
         Field.__module__,
         DataAlignment, 
         ParallelDataAlignment,        
+        AlignmentCache,
         AbstractField,
         Symbol.__module__,
         EmptySymbol.__module__,
@@ -125,6 +142,8 @@ def getSuite():
         Format.__module__,
         Session.__module__,
         SortedTypedList,
+        ColumnarMatrixList,
+        Deduplicator,
         ApplicativeData.__module__,
         DomainEncodingFunction.__module__,
         TypeEncodingFunction.__module__,
@@ -133,24 +152,35 @@ def getSuite():
         SearchEngine.__module__,
         SearchTask,
         SearchResult,
+        PatternAutomaton,
         ClusterByApplicativeData,
         ClusterByAlignment,
+        MinHashLSH,
+        SimilarityCache,
         ClusterBySize,
         AbstractType.__module__,
         Memory.__module__,
         TypeConverter.__module__,
         AbstractVariable,
         Size.__module__,
+        AbstractRelationVariableLeaf.__module__,
         Value.__module__,        
         InternetChecksum.__module__,
         FieldParser.__module__,
         GenericPath.__module__,
+        ParsingPath.__module__,
         VariableSpecializer.__module__,
         FieldSpecializer.__module__,
         SVAS.__module__,
 
         MessageParser.__module__,
+        BitArrayView.__module__,
+        FixedLayoutParser.__module__,
+        SymbolDispatcher.__module__,
+        BatchAbstractor.__module__,
+        AbstractionResult.__module__,
         MessageSpecializer.__module__,
+        GenerationPlan.__module__,
 
         FlowParser.__module__,
         AbstractionLayer.__module__,
@@ -177,6 +207,8 @@ def getSuite():
         # Modules related to the import
         # -----------------------------
         PCAPImporter.__module__,
+        PCAPReader,
+        TCPReassembler,
         FileImporter.__module__
 
         # Other